@@ -0,0 +1,291 @@
+"""RF candidate generation for AIS gaps over a time-sliced lat/lon grid."""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from algorithms.gap_fill import CANDIDATE_WINDOW_MS, KNOTS_TO_KMH, GapFillConfig
+from entity_resolution.spatiotemporal_index import KM_PER_DEGREE_LAT, MAX_PAIRS_PER_CHUNK
+from utils.arrow import numeric_view
+from utils.geo import haversine_km
+from utils.logging import get_logger
+from utils.ranges import chunk_bounds, expand_ranges
+from utils.time import epoch_ms_array
+
+
+logger = get_logger(__name__)
+
+CANDIDATE_COLUMNS = [
+    "gap_id",
+    "mmsi",
+    "rf_row",
+    "rf_id",
+    "ts_utc",
+    "est_lat",
+    "est_lon",
+    "geo_uncertainty_m",
+    "start_ts",
+    "end_ts",
+    "start_lat",
+    "start_lon",
+    "end_lat",
+    "end_lon",
+]
+
+
+@dataclass
+class RFGrid:
+    """RF detections bucketed by ``(time slice, lat row, lon column)`` with CSR offsets.
+
+    Cells are ``cell_deg`` degrees tall and ``col_deg`` wide, the nearest
+    width at or below ``cell_deg`` that divides 360 so columns wrap evenly
+    at the antimeridian. Keys are
+    ``((slice - slice_min) * n_rows + row) * n_cols + col``; rows for
+    ``keys[i]`` are ``order[offsets[i]:offsets[i + 1]]``.
+    """
+
+    lat: np.ndarray
+    lon: np.ndarray
+    ts: np.ndarray
+    slice_ms: int
+    cell_deg: float
+    col_deg: float
+    n_rows: int
+    n_cols: int
+    slice_min: int
+    slice_span: int
+    occupied_slices: np.ndarray
+    keys: np.ndarray
+    offsets: np.ndarray
+    order: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def build(cls, rf_df: pd.DataFrame, slice_ms: int, cell_km: float) -> "RFGrid":
+        """Index ``rf_df`` (``est_lat``, ``est_lon``, ``ts_utc``) by time slice and cell."""
+        lat = np.ascontiguousarray(numeric_view(rf_df["est_lat"]))
+        lon = np.ascontiguousarray(numeric_view(rf_df["est_lon"]))
+        ts = epoch_ms_array(rf_df["ts_utc"]) if len(rf_df) else np.empty(0, dtype=np.int64)
+        cell_deg = float(cell_km) / KM_PER_DEGREE_LAT
+        n_rows = int(math.ceil(180.0 / cell_deg)) + 1
+        n_cols = int(math.ceil(360.0 / cell_deg))
+        col_deg = 360.0 / n_cols
+
+        slices = ts // slice_ms
+        slice_min = int(slices.min()) if len(slices) else 0
+        slice_span = int(slices.max()) - slice_min + 1 if len(slices) else 1
+        occupied = np.zeros(slice_span, dtype=bool)
+        occupied[slices - slice_min] = True
+        rows = np.clip(np.floor((lat + 90.0) / cell_deg).astype(np.int64), 0, n_rows - 1)
+        cols = np.floor((lon + 180.0) / col_deg).astype(np.int64) % n_cols
+        composite = ((slices - slice_min) * n_rows + rows) * n_cols + cols
+        order = np.argsort(composite, kind="stable")
+        keys, counts = np.unique(composite[order], return_counts=True)
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            lat=lat,
+            lon=lon,
+            ts=ts,
+            slice_ms=int(slice_ms),
+            cell_deg=cell_deg,
+            col_deg=col_deg,
+            n_rows=n_rows,
+            n_cols=n_cols,
+            slice_min=slice_min,
+            slice_span=slice_span,
+            occupied_slices=occupied,
+            keys=keys,
+            offsets=offsets,
+            order=order,
+        )
+
+    def covering_ranges(
+        self,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        radius_km: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(row_lo, row_count, col_lo, col_count)`` of grid cells covering each disk."""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        row_lo = np.clip(np.floor((lat - dlat + 90.0) / self.cell_deg), 0, self.n_rows - 1).astype(np.int64)
+        row_hi = np.clip(np.floor((lat + dlat + 90.0) / self.cell_deg), 0, self.n_rows - 1).astype(np.int64)
+        # Widen longitude by the disk's highest latitude; near the poles take every column.
+        dlon = dlat / np.maximum(np.cos(np.radians(np.minimum(np.abs(lat) + dlat, 90.0))), 1e-9)
+        col_lo = np.floor((lon - dlon + 180.0) / self.col_deg)
+        col_hi = np.floor((lon + dlon + 180.0) / self.col_deg)
+        col_count = np.minimum(col_hi - col_lo + 1, self.n_cols).astype(np.int64)
+        col_lo = np.where(col_count >= self.n_cols, 0, col_lo).astype(np.int64) % self.n_cols
+        return row_lo, row_hi - row_lo + 1, col_lo, col_count
+
+    def lookup(self, slices: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(pair_idx, rf_rows)`` for every detection stored under each ``(slice, row, col)``."""
+        if len(self.keys) == 0 or len(slices) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        composite = ((slices - self.slice_min) * self.n_rows + rows) * self.n_cols + cols
+        pos = np.minimum(np.searchsorted(self.keys, composite), len(self.keys) - 1)
+        pair_idx = np.flatnonzero(self.keys[pos] == composite)
+        pos = pos[pair_idx]
+        starts = self.offsets[pos]
+        counts = self.offsets[pos + 1] - starts
+        return np.repeat(pair_idx, counts), self.order[expand_ranges(starts, counts)]
+
+
+def generate_candidates(
+    gaps: pd.DataFrame,
+    rf_df: pd.DataFrame,
+    config: GapFillConfig,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Return RF detections that could lie on each gap's unobserved track.
+
+    A detection at time ``t`` is a candidate for a gap from ``(start, t0)``
+    to ``(end, t1)`` when ``t`` is within ``CANDIDATE_WINDOW_MS`` of ``[t0, t1]``
+    and the vessel could have reached it from both ends: it is within
+    ``max_speed * (t - t0) + candidate_radius_km`` of the start and
+    ``max_speed * (t1 - t) + candidate_radius_km`` of the end. All gaps are
+    answered together: each ``(gap, time slice)`` pair expands to the grid
+    cells covering the smaller of those two disks at the slice's bounds, the
+    cells are looked up in an ``RFGrid`` of ``candidate_slice_minutes`` by
+    ``candidate_cell_km`` and the survivors are checked exactly.
+
+    Returns:
+        Tuple of the flat candidate table (``CANDIDATE_COLUMNS``, ordered by
+        gap and time; ``rf_row`` is the position in ``rf_df``) and pruning
+        metrics: pairs a time-only join would produce, pairs read from grid
+        cells, final candidates and ``candidate_pruning_rate`` relative to
+        the time-only join.
+    """
+    metrics: Dict[str, Any] = {
+        "candidate_pairs_time_window": 0,
+        "candidate_pairs_grid": 0,
+        "candidate_pairs": 0,
+        "candidate_pruning_rate": None,
+    }
+    if gaps.empty or rf_df.empty:
+        return _empty_candidates(), metrics
+
+    slice_ms = max(1, int(float(config.candidate_slice_minutes) * 60_000))
+    grid = RFGrid.build(rf_df, slice_ms, float(config.candidate_cell_km))
+    speed_km_per_ms = float(config.max_speed_knots) * KNOTS_TO_KMH / 3_600_000
+    radius_km = float(config.candidate_radius_km)
+
+    t0 = gaps["start_ts"].to_numpy(dtype=np.int64)
+    t1 = gaps["end_ts"].to_numpy(dtype=np.int64)
+    lat0 = gaps["start_lat"].to_numpy(dtype=np.float64)
+    lon0 = gaps["start_lon"].to_numpy(dtype=np.float64)
+    lat1 = gaps["end_lat"].to_numpy(dtype=np.float64)
+    lon1 = gaps["end_lon"].to_numpy(dtype=np.float64)
+    q_start = t0 - CANDIDATE_WINDOW_MS
+    q_end = t1 + CANDIDATE_WINDOW_MS
+
+    sorted_ts = np.sort(grid.ts)
+    metrics["candidate_pairs_time_window"] = int(
+        (np.searchsorted(sorted_ts, q_end, side="right") - np.searchsorted(sorted_ts, q_start)).sum()
+    )
+
+    # (gap, slice) pairs over occupied slices only.
+    first_slice = np.maximum(q_start // slice_ms, grid.slice_min)
+    last_slice = np.minimum(q_end // slice_ms, grid.slice_min + grid.slice_span - 1)
+    slice_counts = np.maximum(last_slice - first_slice + 1, 0)
+    pair_gap = np.repeat(np.arange(len(gaps), dtype=np.int64), slice_counts)
+    pair_slice = first_slice[pair_gap] + expand_ranges(np.zeros(len(gaps), dtype=np.int64), slice_counts)
+    occupied = grid.occupied_slices[pair_slice - grid.slice_min]
+    pair_gap = pair_gap[occupied]
+    pair_slice = pair_slice[occupied]
+
+    # Smallest reach disk over each slice's time bounds, as a range of grid rows and columns.
+    slice_lo = np.maximum(pair_slice * slice_ms, q_start[pair_gap])
+    slice_hi = np.minimum((pair_slice + 1) * slice_ms - 1, q_end[pair_gap])
+    reach_start = speed_km_per_ms * np.maximum(slice_hi - t0[pair_gap], 0) + radius_km
+    reach_end = speed_km_per_ms * np.maximum(t1[pair_gap] - slice_lo, 0) + radius_km
+    from_start = reach_start <= reach_end
+    centre_lat = np.where(from_start, lat0[pair_gap], lat1[pair_gap])
+    centre_lon = np.where(from_start, lon0[pair_gap], lon1[pair_gap])
+    reach = np.minimum(reach_start, reach_end)
+    row_lo, row_count, col_lo, col_count = grid.covering_ranges(centre_lat, centre_lon, reach)
+
+    cell_counts = row_count * col_count
+    matched_gaps = []
+    matched_rows = []
+    for lo, hi in chunk_bounds(cell_counts, MAX_PAIRS_PER_CHUNK):
+        counts = cell_counts[lo:hi]
+        pair = lo + np.repeat(np.arange(hi - lo, dtype=np.int64), counts)
+        within = expand_ranges(np.zeros(hi - lo, dtype=np.int64), counts)
+        rows = row_lo[pair] + within // col_count[pair]
+        cols = (col_lo[pair] + within % col_count[pair]) % grid.n_cols
+        owners, rf_rows = grid.lookup(pair_slice[pair], rows, cols)
+        metrics["candidate_pairs_grid"] += len(rf_rows)
+
+        gap = pair_gap[pair[owners]]
+        ts = grid.ts[rf_rows]
+        lat = grid.lat[rf_rows]
+        lon = grid.lon[rf_rows]
+        keep = (ts >= q_start[gap]) & (ts <= q_end[gap])
+        max_from_start = speed_km_per_ms * np.maximum(ts - t0[gap], 0) + radius_km
+        max_from_end = speed_km_per_ms * np.maximum(t1[gap] - ts, 0) + radius_km
+        keep &= haversine_km(lat0[gap], lon0[gap], lat, lon) <= max_from_start
+        keep &= haversine_km(lat1[gap], lon1[gap], lat, lon) <= max_from_end
+        matched_gaps.append(gap[keep])
+        matched_rows.append(rf_rows[keep])
+
+    gap = np.concatenate(matched_gaps) if matched_gaps else np.empty(0, dtype=np.int64)
+    rf_rows = np.concatenate(matched_rows) if matched_rows else np.empty(0, dtype=np.int64)
+    ordering = np.lexsort((rf_rows, grid.ts[rf_rows], gap))
+    gap = gap[ordering]
+    rf_rows = rf_rows[ordering]
+
+    metrics["candidate_pairs"] = len(rf_rows)
+    if metrics["candidate_pairs_time_window"]:
+        metrics["candidate_pruning_rate"] = 1.0 - len(rf_rows) / metrics["candidate_pairs_time_window"]
+    logger.info(
+        "Generated %s RF candidates for %s gaps (time-window join %s pairs, grid cells %s; %.1f%% pruned)",
+        len(rf_rows),
+        len(gaps),
+        metrics["candidate_pairs_time_window"],
+        metrics["candidate_pairs_grid"],
+        100 * (metrics["candidate_pruning_rate"] or 0.0),
+    )
+    return _candidate_table(gaps, rf_df, grid, gap, rf_rows), metrics
+
+
+def _candidate_table(
+    gaps: pd.DataFrame,
+    rf_df: pd.DataFrame,
+    grid: RFGrid,
+    gap: np.ndarray,
+    rf_rows: np.ndarray,
+) -> pd.DataFrame:
+    """Assemble the flat candidate table from gap positions and RF row positions."""
+    if "geo_uncertainty_m" in rf_df.columns:
+        uncertainty = numeric_view(pd.to_numeric(rf_df["geo_uncertainty_m"], errors="coerce"))[rf_rows]
+    else:
+        uncertainty = np.full(len(rf_rows), np.nan)
+    rf_id = rf_df["rf_id"].to_numpy()[rf_rows] if "rf_id" in rf_df.columns else rf_rows
+    columns = {
+        "gap_id": gaps["gap_id"].to_numpy(dtype=np.int64)[gap],
+        "mmsi": gaps["mmsi"].to_numpy(dtype=np.int64)[gap],
+        "rf_row": rf_rows,
+        "rf_id": rf_id,
+        "ts_utc": grid.ts[rf_rows],
+        "est_lat": grid.lat[rf_rows],
+        "est_lon": grid.lon[rf_rows],
+        "geo_uncertainty_m": uncertainty,
+    }
+    for column in CANDIDATE_COLUMNS[8:]:
+        columns[column] = gaps[column].to_numpy()[gap]
+    return pd.DataFrame(columns)
+
+
+def _empty_candidates() -> pd.DataFrame:
+    """Return an empty candidate table with typed columns."""
+    frame = pd.DataFrame({column: pd.Series(dtype=np.float64) for column in CANDIDATE_COLUMNS})
+    for column in ("gap_id", "mmsi", "rf_row", "ts_utc", "start_ts", "end_ts"):
+        frame[column] = frame[column].astype(np.int64)
+    frame["rf_id"] = frame["rf_id"].astype(object)
+    return frame
@@ -1,60 +1,736 @@
 """AIS gap filling using RF detections."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterator, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
+from algorithms.scoring import apply_threshold, compute_candidate_scores
+from schemas.components import GapFillConfig
+from utils.arrow import numeric_view
+from utils.geo import great_circle_interpolate, haversine_km, initial_bearing_deg
 from utils.logging import get_logger
+from utils.time import epoch_ms_array
 
 
 logger = get_logger(__name__)
 
+KNOTS_TO_KMH = 1.852
+# RF detections are fetched within this window of a gap (README §5.1 step 2).
+CANDIDATE_WINDOW_MS = 6 * 60_000
+# Weights of the per-candidate scores combined by ``score_candidates``.
+CANDIDATE_SCORE_WEIGHTS = {"time": 0.3, "spatial": 0.5, "quality": 0.2}
+# Upper bound on the lattice and transition memory of one Viterbi decode batch.
+VITERBI_BATCH_BYTES = 256 * 1024 * 1024
+# Labels of merged rows (README §5.1 step 6); ``source_tag`` maps to the N6 ``source``.
+FILL_METHOD_RF = "RF"
+FILL_METHOD_INTERPOLATED = "RF_interpolated"
+FILL_METHODS = (FILL_METHOD_RF, FILL_METHOD_INTERPOLATED)
+SOURCE_TAGS = ("AIS", "RF", "fused")
 
-@dataclass
-class GapFillConfig:
-    """Configuration for gap fill algorithm."""
-
-    gap_threshold_minutes: int
-    candidate_radius_km: float
-    viterbi_transition_penalty: float
-    min_candidate_score: float
+GAP_TABLE_COLUMNS = [
+    "gap_id",
+    "mmsi",
+    "start_idx",
+    "end_idx",
+    "start_ts",
+    "end_ts",
+    "start_lat",
+    "start_lon",
+    "end_lat",
+    "end_lon",
+    "gap_minutes",
+]
 
 
 def detect_gaps(ais_df: pd.DataFrame, config: GapFillConfig) -> pd.DataFrame:
-    """Identify AIS track gaps exceeding the configured threshold."""
-    # TODO: Compute time deltas per MMSI and flag segments > gap_threshold_minutes.
+    """Identify AIS track gaps exceeding the configured threshold.
+
+    The frame is ordered by ``(mmsi, ts_utc)`` once and gaps are found with
+    array comparisons on adjacent rows, so there is no per-vessel loop.
+
+    Args:
+        ais_df: AIS observations with ``mmsi``, ``ts_utc`` (epoch ms), ``lat`` and ``lon``.
+        config: Gap fill configuration providing ``gap_threshold_minutes``.
+
+    Returns:
+        Gap table with one row per gap. ``start_idx``/``end_idx`` are positional
+        indices into ``ais_df`` of the last ping before and first ping after the gap.
+    """
     logger.debug("Detecting AIS gaps using config: %s", config)
-    return pd.DataFrame()
+    if ais_df.empty:
+        return _empty_gap_table()
+
+    mmsi = np.ascontiguousarray(numeric_view(ais_df["mmsi"], np.int64))
+    ts = epoch_ms_array(ais_df["ts_utc"])
+    order = _track_order(mmsi, ts)
+    if order is not None:
+        mmsi = mmsi[order]
+        ts = ts[order]
+
+    threshold_ms = int(config.gap_threshold_minutes * 60_000)
+    delta_t = np.diff(ts)
+    is_gap = (mmsi[1:] == mmsi[:-1]) & (delta_t > threshold_ms)
+    before = np.flatnonzero(is_gap)
+    after = before + 1
+
+    start_idx = before if order is None else order[before]
+    end_idx = after if order is None else order[after]
+    lat = numeric_view(ais_df["lat"])
+    lon = numeric_view(ais_df["lon"])
+
+    gaps = pd.DataFrame(
+        {
+            "gap_id": np.arange(len(before), dtype=np.int64),
+            "mmsi": mmsi[before],
+            "start_idx": start_idx.astype(np.int64, copy=False),
+            "end_idx": end_idx.astype(np.int64, copy=False),
+            "start_ts": ts[before],
+            "end_ts": ts[after],
+            "start_lat": lat[start_idx],
+            "start_lon": lon[start_idx],
+            "end_lat": lat[end_idx],
+            "end_lon": lon[end_idx],
+            "gap_minutes": delta_t[before] / 60_000.0,
+        }
+    )
+    logger.info("Detected %s AIS gaps across %s pings", len(gaps), len(ais_df))
+    return gaps
 
 
 def score_candidates(
-    gap_segments: pd.DataFrame,
-    rf_df: pd.DataFrame,
+    candidates: pd.DataFrame,
     config: GapFillConfig,
 ) -> pd.DataFrame:
-    """Score RF detections as candidate fills for AIS gaps."""
-    # TODO: Implement scoring combining spatial, temporal, and signal strength metrics.
-    logger.debug("Scoring RF candidates for %s gaps", len(gap_segments))
-    return pd.DataFrame()
+    """Score RF candidates as fills for their gaps (README §5.1 step 3).
+
+    Candidates come from ``algorithms.candidates.generate_candidates``, so
+    only spatially and kinematically plausible pairs are scored. Scores in
+    ``[0, 1]``, combined with ``CANDIDATE_SCORE_WEIGHTS``:
+
+    * ``time_score``: 1 inside the gap, decaying by ``exp(-dt / 6 min)`` in the
+      fetch margins before and after it.
+    * ``spatial_score``: ``exp(-0.5 * (d / sigma) ** 2)`` for the distance to
+      the straight-line track at the detection time, with ``sigma`` the
+      candidate radius plus the RF uncertainty.
+    * ``quality_score``: ``exp(-uncertainty / candidate_radius_km)``.
+
+    Candidates below ``min_candidate_score`` are dropped.
+    """
+    logger.debug("Scoring %s RF candidates", len(candidates))
+    if candidates.empty:
+        return candidates.assign(time_score=0.0, spatial_score=0.0, quality_score=0.0, score=0.0)
+
+    ts = epoch_ms_array(candidates["ts_utc"])
+    t0 = candidates["start_ts"].to_numpy(dtype=np.int64)
+    t1 = candidates["end_ts"].to_numpy(dtype=np.int64)
+    radius_km = float(config.candidate_radius_km)
+    uncertainty_km = candidates["geo_uncertainty_m"].to_numpy(dtype=np.float64) / 1_000
+    uncertainty_km = np.where(np.isfinite(uncertainty_km), uncertainty_km, 0.0)
+
+    outside_ms = np.maximum(t0 - ts, 0) + np.maximum(ts - t1, 0)
+    fraction = np.clip((ts - t0) / np.maximum(t1 - t0, 1), 0.0, 1.0)
+    lat0 = candidates["start_lat"].to_numpy(dtype=np.float64)
+    lon0 = candidates["start_lon"].to_numpy(dtype=np.float64)
+    dlon = (candidates["end_lon"].to_numpy(dtype=np.float64) - lon0 + 180.0) % 360.0 - 180.0
+    expected_lat = lat0 + fraction * (candidates["end_lat"].to_numpy(dtype=np.float64) - lat0)
+    expected_lon = (lon0 + fraction * dlon + 180.0) % 360.0 - 180.0
+    distance = haversine_km(
+        expected_lat,
+        expected_lon,
+        candidates["est_lat"].to_numpy(dtype=np.float64),
+        candidates["est_lon"].to_numpy(dtype=np.float64),
+    )
+
+    scored = candidates.assign(
+        time_score=np.exp(-outside_ms / float(CANDIDATE_WINDOW_MS)),
+        spatial_score=np.exp(-0.5 * (distance / (radius_km + uncertainty_km)) ** 2),
+        quality_score=np.exp(-uncertainty_km / radius_km),
+    )
+    scored = compute_candidate_scores(scored, CANDIDATE_SCORE_WEIGHTS)
+    return apply_threshold(scored, "score", float(config.min_candidate_score))
 
 
 def viterbi_reconstruct(
     scored_candidates: pd.DataFrame,
     config: GapFillConfig,
 ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    """Apply Viterbi decoding to build most probable AIS path through RF points."""
-    # TODO: Construct state transition graph and decode optimal path.
+    """Apply Viterbi decoding to build most probable AIS path through RF points.
+
+    Candidates are grouped per gap into time steps of ``viterbi_step_minutes``;
+    each non-empty step contributes one state per candidate (optionally pruned
+    to the ``beam_width`` best scores). Gaps whose step and state counts round
+    to the same bins (powers of two and 1.5x powers of two) are padded to the
+    batch's largest shape, stacked into ``(gaps, steps, states)`` tensors and
+    decoded together in log space, so padding stays within a third per axis.
+    Emissions are ``log(score)`` and transitions are
+    ``-viterbi_transition_penalty * (distance / reachable_distance) ** 2``,
+    where the reachable distance follows from ``max_speed_knots``.
+
+    Args:
+        scored_candidates: Candidate table with ``gap_id``, ``ts_utc``,
+            ``est_lat``, ``est_lon`` and ``score``.
+        config: Gap fill configuration.
+
+    Returns:
+        Tuple of the selected path (one candidate row per gap step, with
+        ``step`` and ``path_confidence`` columns) and metrics including the
+        per-gap ``path_confidence``.
+    """
     logger.debug("Running Viterbi reconstruction with %s candidates", len(scored_candidates))
-    return pd.DataFrame(), {}
+    if scored_candidates.empty:
+        return scored_candidates.assign(step=np.int64(0), path_confidence=np.float64(0.0)), {
+            "gaps_decoded": 0,
+            "path_points": 0,
+            "mean_path_confidence": None,
+            "path_confidence": {},
+        }
+
+    layout = _lattice_layout(scored_candidates, config)
+    n_gaps = len(layout["gap_id"])
+    penalty = float(config.viterbi_transition_penalty)
+    speed_kmh = float(config.max_speed_knots) * KNOTS_TO_KMH
+
+    selected_rows = []
+    selected_steps = []
+    selected_gaps = []
+    log_scores = np.empty(n_gaps, dtype=np.float64)
+    for gaps in _shape_batches(layout):
+        batch = _build_lattice(layout, gaps)
+        states, best = _decode_batch(batch, penalty, speed_kmh)
+        log_scores[gaps] = best
+        rows = np.take_along_axis(batch["row"], states[:, :, None], axis=2)[:, :, 0]
+        step = np.broadcast_to(np.arange(rows.shape[1]), rows.shape)
+        real = step < batch["n_steps"][:, None]
+        selected_rows.append(rows[real])
+        selected_steps.append(step[real])
+        selected_gaps.append(np.broadcast_to(gaps[:, None], rows.shape)[real])
+
+    steps = np.concatenate(selected_steps)
+    gaps = np.concatenate(selected_gaps)
+    path_order = np.lexsort((steps, gaps))
+    rows = np.concatenate(selected_rows)[path_order]
+    steps = steps[path_order]
+    gaps = gaps[path_order]
+    confidence = np.exp(log_scores / np.maximum(layout["n_steps"], 1))
+
+    paths = scored_candidates.take(rows).reset_index(drop=True)
+    paths["step"] = steps.astype(np.int64)
+    paths["path_confidence"] = confidence[gaps]
+    gap_ids = layout["gap_id"]
+    metrics: Dict[str, Any] = {
+        "gaps_decoded": int(n_gaps),
+        "path_points": int(len(paths)),
+        "mean_path_confidence": float(confidence.mean()),
+        "path_confidence": {int(g): float(c) for g, c in zip(gap_ids.tolist(), confidence.tolist())},
+    }
+    logger.info(
+        "Decoded %s gaps (%s steps x %s states max) into %s path points",
+        n_gaps,
+        int(layout["n_steps"].max()),
+        int(layout["n_states"].max()),
+        len(paths),
+    )
+    return paths, metrics
+
+
+def synthesize_gap_points(viterbi_paths: pd.DataFrame, config: GapFillConfig) -> pd.DataFrame:
+    """Build fill points for every decoded gap in one vectorized pass (README §5.1 steps 5-6).
+
+    Each gap's nodes are its two AIS endpoints and the Viterbi-selected RF
+    anchors strictly inside it. Anchors are emitted as ``fill_method="RF"``
+    points with their candidate ``score`` as confidence. Between consecutive
+    nodes, points every ``fill_interval_minutes`` from the gap start are placed
+    on the great circle (slerp) at their interpolated timestamps, as
+    ``fill_method="RF_interpolated"`` with the confidence of the two nodes
+    interpolated in time (AIS endpoints count as 1). ``sog``/``cog`` follow
+    the leg each point lies on.
+
+    Returns:
+        One row per fill point, ordered by ``(gap_id, ts_utc)``, with ``gap_id``,
+        ``mmsi``, ``ts_utc``, ``lat``, ``lon``, ``sog``, ``cog``, ``source_tag``,
+        ``fill_method``, ``fill_confidence`` and ``rf_id``.
+    """
+    columns = {
+        "gap_id": "int64",
+        "mmsi": "int64",
+        "ts_utc": "int64",
+        "lat": "float64",
+        "lon": "float64",
+        "sog": "float64",
+        "cog": "float64",
+        "source_tag": "object",
+        "fill_method": "object",
+        "fill_confidence": "float64",
+        "rf_id": "object",
+    }
+    ts = epoch_ms_array(viterbi_paths["ts_utc"]) if len(viterbi_paths) else np.empty(0, dtype=np.int64)
+    start_ts = viterbi_paths["start_ts"].to_numpy(dtype=np.int64)
+    end_ts = viterbi_paths["end_ts"].to_numpy(dtype=np.int64)
+    anchors = viterbi_paths.loc[(ts > start_ts) & (ts < end_ts)]
+    if anchors.empty:
+        return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in columns.items()})
+
+    # One row per filled gap, in gap_id order.
+    gap_first = anchors.drop_duplicates("gap_id").sort_values("gap_id")
+    gap_id = gap_first["gap_id"].to_numpy(dtype=np.int64)
+    gap_mmsi = gap_first["mmsi"].to_numpy(dtype=np.int64)
+    gap_start = gap_first["start_ts"].to_numpy(dtype=np.int64)
+    gap_end = gap_first["end_ts"].to_numpy(dtype=np.int64)
+    n_gaps = len(gap_id)
+    anchor_gap = np.searchsorted(gap_id, anchors["gap_id"].to_numpy(dtype=np.int64))
+    anchor_ts = epoch_ms_array(anchors["ts_utc"])
+
+    # Nodes of all gaps sorted by (gap, time offset): endpoints plus anchors.
+    node_gap = np.concatenate([np.arange(n_gaps), anchor_gap, np.arange(n_gaps)])
+    node_ts = np.concatenate([gap_start, anchor_ts, gap_end])
+    node_lat = np.concatenate(
+        [
+            gap_first["start_lat"].to_numpy(np.float64),
+            anchors["est_lat"].to_numpy(np.float64),
+            gap_first["end_lat"].to_numpy(np.float64),
+        ]
+    )
+    node_lon = np.concatenate(
+        [
+            gap_first["start_lon"].to_numpy(np.float64),
+            anchors["est_lon"].to_numpy(np.float64),
+            gap_first["end_lon"].to_numpy(np.float64),
+        ]
+    )
+    node_conf = np.concatenate([np.ones(n_gaps), anchors["score"].to_numpy(np.float64), np.ones(n_gaps)])
+    span = int((gap_end - gap_start).max()) + 1
+    node_key = node_gap * span + (node_ts - gap_start[node_gap])
+    node_order = np.argsort(node_key, kind="stable")
+    node_key = node_key[node_order]
+    node_ts, node_lat, node_lon, node_conf = (
+        node_ts[node_order],
+        node_lat[node_order],
+        node_lon[node_order],
+        node_conf[node_order],
+    )
+
+    # Interpolated timestamps every fill interval from each gap's start, skipping anchor times.
+    interval_ms = int(float(config.fill_interval_minutes) * 60_000)
+    if interval_ms > 0:
+        counts = np.maximum((gap_end - gap_start - 1) // interval_ms, 0)
+        point_gap = np.repeat(np.arange(n_gaps), counts)
+        step = np.arange(len(point_gap)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        point_ts = gap_start[point_gap] + step * interval_ms
+        point_key = point_gap * span + (point_ts - gap_start[point_gap])
+        on_node = node_key[np.minimum(np.searchsorted(node_key, point_key), len(node_key) - 1)] == point_key
+        point_gap, point_ts, point_key = point_gap[~on_node], point_ts[~on_node], point_key[~on_node]
+    else:
+        point_gap = point_ts = point_key = np.empty(0, dtype=np.int64)
+
+    # Every fill point lies on the leg from node ``left`` to node ``left + 1``;
+    # an anchor is the left node of its own outgoing leg.
+    anchor_key = anchor_gap * span + (anchor_ts - gap_start[anchor_gap])
+    fill_key = np.concatenate([anchor_key, point_key])
+    left = np.searchsorted(node_key, fill_key, side="right") - 1
+    right = left + 1
+    leg_ms = np.maximum(node_ts[right] - node_ts[left], 1)
+    fraction = (np.concatenate([anchor_ts, point_ts]) - node_ts[left]) / leg_ms
+    n_anchors = len(anchors)
+    lat = np.empty(len(fill_key))
+    lon = np.empty(len(fill_key))
+    lat[:n_anchors] = anchors["est_lat"].to_numpy(np.float64)
+    lon[:n_anchors] = anchors["est_lon"].to_numpy(np.float64)
+    lat[n_anchors:], lon[n_anchors:] = great_circle_interpolate(
+        node_lat[left[n_anchors:]],
+        node_lon[left[n_anchors:]],
+        node_lat[right[n_anchors:]],
+        node_lon[right[n_anchors:]],
+        fraction[n_anchors:],
+    )
+    leg_km = haversine_km(node_lat[left], node_lon[left], node_lat[right], node_lon[right])
+    confidence = node_conf[left] + fraction * (node_conf[right] - node_conf[left])
+    confidence[:n_anchors] = node_conf[left[:n_anchors]]
+
+    fill_gap = np.concatenate([anchor_gap, point_gap])
+    is_anchor = np.arange(len(fill_key)) < n_anchors
+    rf_id = np.full(len(fill_key), None, dtype=object)
+    if "rf_id" in anchors.columns:
+        rf_id[:n_anchors] = anchors["rf_id"].to_numpy(dtype=object)
+    fills = pd.DataFrame(
+        {
+            "gap_id": gap_id[fill_gap],
+            "mmsi": gap_mmsi[fill_gap],
+            "ts_utc": np.concatenate([anchor_ts, point_ts]),
+            "lat": lat,
+            "lon": lon,
+            "sog": leg_km / (leg_ms / 3_600_000.0) / KNOTS_TO_KMH,
+            "cog": initial_bearing_deg(lat, lon, node_lat[right], node_lon[right]),
+            "source_tag": np.where(is_anchor, "RF", "fused").astype(object),
+            "fill_method": np.where(is_anchor, FILL_METHOD_RF, FILL_METHOD_INTERPOLATED).astype(object),
+            "fill_confidence": np.clip(confidence, 0.0, 1.0),
+            "rf_id": rf_id,
+        }
+    )
+    return fills.take(np.argsort(fill_key, kind="stable")).reset_index(drop=True)
+
+
+def drop_implausible_anchors(viterbi_paths: pd.DataFrame, config: GapFillConfig) -> Tuple[pd.DataFrame, int]:
+    """Drop Viterbi anchors on a leg faster than ``max_speed_knots`` (README §5.1 step 7).
+
+    A gap's legs join consecutive nodes: its AIS endpoints and the anchors
+    strictly inside it. Both ends of a fast leg are dropped in one vectorized
+    pass over all gaps; legs that are still too fast afterwards fail the whole
+    gap in ``merge_gap_fill_results``.
+
+    Returns:
+        Tuple of the anchors kept, ordered by ``(gap_id, ts_utc)``, and the number dropped.
+    """
+    ts = epoch_ms_array(viterbi_paths["ts_utc"]) if len(viterbi_paths) else np.empty(0, dtype=np.int64)
+    start_ts = viterbi_paths["start_ts"].to_numpy(dtype=np.int64)
+    end_ts = viterbi_paths["end_ts"].to_numpy(dtype=np.int64)
+    inside = np.flatnonzero((ts > start_ts) & (ts < end_ts))
+    if len(inside) == 0:
+        return viterbi_paths.iloc[:0], 0
+
+    gap = viterbi_paths["gap_id"].to_numpy(dtype=np.int64)
+    order = inside[np.lexsort((ts[inside], gap[inside]))]
+    anchors = viterbi_paths.take(order)
+    ts, start_ts, end_ts, gap = ts[order], start_ts[order], end_ts[order], gap[order]
+    lat = anchors["est_lat"].to_numpy(dtype=np.float64)
+    lon = anchors["est_lon"].to_numpy(dtype=np.float64)
+    first = np.r_[True, gap[1:] != gap[:-1]]
+    last = np.r_[gap[1:] != gap[:-1], True]
+    prev_lat = np.where(first, anchors["start_lat"].to_numpy(dtype=np.float64), np.roll(lat, 1))
+    prev_lon = np.where(first, anchors["start_lon"].to_numpy(dtype=np.float64), np.roll(lon, 1))
+    prev_ts = np.where(first, start_ts, np.roll(ts, 1))
+    next_lat = np.where(last, anchors["end_lat"].to_numpy(dtype=np.float64), np.roll(lat, -1))
+    next_lon = np.where(last, anchors["end_lon"].to_numpy(dtype=np.float64), np.roll(lon, -1))
+    next_ts = np.where(last, end_ts, np.roll(ts, -1))
+    max_speed = float(config.max_speed_knots)
+    fast = (_implied_knots(prev_lat, prev_lon, lat, lon, ts - prev_ts) > max_speed) | (
+        _implied_knots(lat, lon, next_lat, next_lon, next_ts - ts) > max_speed
+    )
+    return anchors.loc[~fast].reset_index(drop=True), int(np.count_nonzero(fast))
 
 
 def merge_gap_fill_results(
     ais_df: pd.DataFrame,
     viterbi_paths: pd.DataFrame,
-) -> pd.DataFrame:
-    """Merge reconstructed trajectories back into the AIS stream."""
-    # TODO: Union original AIS records with Viterbi-generated gap segments.
+    config: GapFillConfig,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Merge synthesized gap fill points into the AIS stream (README §5.1 steps 5-7).
+
+    Anchors surviving ``drop_implausible_anchors`` are expanded by
+    ``synthesize_gap_points``, appended to the AIS rows in one concatenation
+    and ordered by ``(mmsi, ts_utc)`` with a single sort. Speed continuity is
+    then checked on the merged arrays: a gap with any leg into, out of or
+    between its fill points faster than ``max_speed_knots`` loses all its
+    fill points. AIS rows get ``source_tag="AIS"`` and null fill columns;
+    NumPy integer columns become nullable so every shard has the same schema.
+    Without fill points the AIS rows keep their order.
+
+    Returns:
+        Tuple of the merged frame and fill metrics.
+    """
     logger.debug("Merging gap fill results with original AIS data")
-    return ais_df
+    anchors, dropped = drop_implausible_anchors(viterbi_paths, config)
+    fills = synthesize_gap_points(anchors, config)
+    merged = ais_df.copy(deep=False)
+    for name in merged.columns.difference(fills.columns):
+        merged[name] = merged[name].astype(_nullable_dtype(merged[name].dtype), copy=False)
+    merged["source_tag"] = pd.Categorical.from_codes(np.zeros(len(ais_df), dtype=np.int8), categories=SOURCE_TAGS)
+    merged["fill_method"] = pd.Categorical.from_codes(np.full(len(ais_df), -1, dtype=np.int8), categories=FILL_METHODS)
+    merged["fill_confidence"] = np.full(len(ais_df), np.nan)
+    merged["rf_id"] = np.full(len(ais_df), None, dtype=object)
+    metrics: Dict[str, Any] = {
+        "fill_points": 0,
+        "fill_anchors_dropped": dropped,
+        "gaps_filled": 0,
+        "gaps_failed_speed_check": 0,
+    }
+    if fills.empty:
+        return merged, metrics
+
+    mmsi = np.concatenate([numeric_view(ais_df["mmsi"], np.int64), fills["mmsi"].to_numpy()])
+    ts = np.concatenate([epoch_ms_array(ais_df["ts_utc"]), fills["ts_utc"].to_numpy()])
+    gap = np.concatenate([np.full(len(ais_df), -1, dtype=np.int64), fills["gap_id"].to_numpy()])
+    order = _track_order(mmsi, ts)
+    if order is None:
+        order = np.arange(len(mmsi))
+    mmsi, ts, gap = mmsi[order], ts[order], gap[order]
+    lat = np.concatenate([numeric_view(ais_df["lat"]), fills["lat"].to_numpy()])[order]
+    lon = np.concatenate([numeric_view(ais_df["lon"]), fills["lon"].to_numpy()])[order]
+
+    failed = _speed_violations(mmsi, ts, lat, lon, gap, float(config.max_speed_knots))
+    keep = ~np.isin(gap, failed)
+    rows = order[keep]
+    merged = pd.DataFrame(
+        {
+            name: _concat_take(
+                merged[name],
+                _column_like(column, fills[name]) if name in fills.columns else _nulls_like(column, len(fills)),
+                rows,
+            )
+            for name, column in merged.items()
+        }
+    )
+    metrics["fill_points"] = int(np.count_nonzero(gap[keep] >= 0))
+    metrics["gaps_filled"] = int(fills["gap_id"].nunique() - len(failed))
+    metrics["gaps_failed_speed_check"] = int(len(failed))
+    logger.info(
+        "Merged %s fill points for %s gaps into %s AIS rows (%s anchors dropped, %s gaps failed the speed check)",
+        metrics["fill_points"],
+        metrics["gaps_filled"],
+        len(ais_df),
+        dropped,
+        metrics["gaps_failed_speed_check"],
+    )
+    return merged, metrics
+
+
+def _speed_violations(
+    mmsi: np.ndarray,
+    ts: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    gap: np.ndarray,
+    max_speed_knots: float,
+) -> np.ndarray:
+    """Return gap ids whose fill points imply a speed above ``max_speed_knots`` on an adjacent leg.
+
+    Arrays are ordered by ``(mmsi, ts)``; ``gap`` is -1 for AIS rows.
+    """
+    legs = np.flatnonzero((mmsi[1:] == mmsi[:-1]) & ((gap[1:] >= 0) | (gap[:-1] >= 0)))
+    knots = _implied_knots(lat[legs], lon[legs], lat[legs + 1], lon[legs + 1], ts[legs + 1] - ts[legs])
+    fast = legs[knots > max_speed_knots]
+    failed = np.union1d(gap[fast], gap[fast + 1])
+    return failed[failed >= 0]
+
+
+def _implied_knots(
+    lat1: np.ndarray,
+    lon1: np.ndarray,
+    lat2: np.ndarray,
+    lon2: np.ndarray,
+    dt_ms: np.ndarray,
+) -> np.ndarray:
+    """Return the speed in knots of each leg; moving in zero or negative time is infinitely fast."""
+    distance_km = haversine_km(lat1, lon1, lat2, lon2)
+    hours = np.where(dt_ms > 0, dt_ms, 1) / 3_600_000.0
+    knots = np.where(dt_ms > 0, distance_km / hours / KNOTS_TO_KMH, np.inf)
+    return np.where(distance_km > 0, knots, 0.0)
+
+
+def _concat_take(column: pd.Series, appended: Any, rows: np.ndarray) -> Any:
+    """Return ``column`` followed by ``appended`` (same dtype), taken at ``rows``.
+
+    ``pd.concat`` checks object columns for all-NA blocks element by element,
+    which dominates the merge for the mostly-null fill columns.
+    """
+    if isinstance(column.dtype, np.dtype):
+        return np.concatenate([column.to_numpy(), np.asarray(appended)])[rows]
+    return type(column.array)._concat_same_type([column.array, appended]).take(rows)
+
+
+def _column_like(template: pd.Series, values: pd.Series) -> Any:
+    """Return ``values`` in ``template``'s dtype, so concatenation keeps the AIS dtypes."""
+    if isinstance(template.dtype, pd.CategoricalDtype):
+        return pd.Categorical(values, categories=template.cat.categories)
+    return pd.array(values.to_numpy(), dtype=template.dtype)
+
+
+def _nulls_like(template: pd.Series, n: int) -> Any:
+    """Return ``n`` nulls in ``template``'s dtype, or its nullable counterpart for NumPy ints and bools."""
+    dtype = template.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return pd.Categorical(np.full(n, None), categories=dtype.categories)
+    if isinstance(dtype, pd.ArrowDtype):
+        return pd.array(pa.nulls(n, type=dtype.pyarrow_dtype), dtype=dtype)
+    return pd.array(np.full(n, None), dtype=_nullable_dtype(dtype))
+
+
+def _nullable_dtype(dtype: Any) -> Any:
+    """Return the pandas nullable counterpart of a NumPy int or bool dtype, else ``dtype``."""
+    if not isinstance(dtype, np.dtype):
+        return dtype
+    if dtype.kind == "b":
+        return pd.BooleanDtype()
+    if dtype.kind in "iu":
+        return pd.api.types.pandas_dtype(dtype.name.capitalize())
+    return dtype
+
+
+def _track_order(mmsi: np.ndarray, ts: np.ndarray) -> np.ndarray | None:
+    """Return the permutation sorting rows by ``(mmsi, ts)``, or None if already sorted."""
+    if len(mmsi) < 2:
+        return None
+    same_vessel = mmsi[1:] == mmsi[:-1]
+    if np.all(mmsi[1:] >= mmsi[:-1]) and np.all((ts[1:] >= ts[:-1]) | ~same_vessel):
+        return None
+    # Pack both keys into one int64 when their ranges fit; a single argsort is
+    # roughly twice as fast as lexsort on two columns.
+    mmsi_span = int(mmsi.max() - mmsi.min())
+    ts_min = int(ts.min())
+    ts_bits = max(1, int(ts.max() - ts_min).bit_length())
+    if mmsi_span.bit_length() + ts_bits <= 63:
+        packed = ((mmsi - mmsi.min()) << ts_bits) | (ts - ts_min)
+        return np.argsort(packed, kind="stable")
+    return np.lexsort((ts, mmsi))
+
+
+def _empty_gap_table() -> pd.DataFrame:
+    """Return a gap table with the expected columns and no rows."""
+    columns: Dict[str, Any] = {name: np.empty(0, dtype=np.int64) for name in GAP_TABLE_COLUMNS}
+    for name in ("start_lat", "start_lon", "end_lat", "end_lon", "gap_minutes"):
+        columns[name] = np.empty(0, dtype=np.float64)
+    return pd.DataFrame(columns)
+
+
+def _lattice_layout(candidates: pd.DataFrame, config: GapFillConfig) -> Dict[str, np.ndarray]:
+    """Place candidates at ``(gap, step, state)`` positions, ordered by gap, with per-gap lattice sizes."""
+    gap_id = candidates["gap_id"].to_numpy(dtype=np.int64)
+    ts = epoch_ms_array(candidates["ts_utc"])
+    score = candidates["score"].to_numpy(dtype=np.float64)
+    step_ms = max(1, int(float(config.viterbi_step_minutes) * 60_000))
+
+    # Order by gap, time slot and descending score so beam pruning keeps a prefix.
+    gap_codes, gap_index = np.unique(gap_id, return_inverse=True)
+    gap_start = np.full(len(gap_codes), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(gap_start, gap_index, ts)
+    slot = (ts - gap_start[gap_index]) // step_ms
+    order = np.lexsort((-score, slot, gap_index))
+    gap_index = gap_index[order]
+    slot = slot[order]
+
+    new_gap = np.ones(len(order), dtype=bool)
+    new_gap[1:] = gap_index[1:] != gap_index[:-1]
+    new_step = new_gap.copy()
+    new_step[1:] |= slot[1:] != slot[:-1]
+    step_counter = np.cumsum(new_step)
+    step_index = step_counter - step_counter[np.flatnonzero(new_gap)][np.cumsum(new_gap) - 1]
+    position = np.arange(len(order))
+    state_index = position - np.maximum.accumulate(np.where(new_step, position, 0))
+
+    if config.beam_width:
+        keep = state_index < int(config.beam_width)
+        order, gap_index, step_index, state_index = (
+            order[keep],
+            gap_index[keep],
+            step_index[keep],
+            state_index[keep],
+        )
+
+    n_gaps = len(gap_codes)
+    steps_per_gap = np.zeros(n_gaps, dtype=np.int64)
+    np.maximum.at(steps_per_gap, gap_index, step_index + 1)
+    states_per_gap = np.zeros(n_gaps, dtype=np.int64)
+    np.maximum.at(states_per_gap, gap_index, state_index + 1)
+    with np.errstate(divide="ignore"):
+        log_emission = np.log(np.clip(score[order], 0.0, 1.0))
+    return {
+        "gap_id": gap_codes,
+        "gap_offset": np.searchsorted(gap_index, np.arange(n_gaps + 1)),
+        "step": step_index,
+        "state": state_index,
+        "lat": candidates["est_lat"].to_numpy(dtype=np.float64)[order],
+        "lon": candidates["est_lon"].to_numpy(dtype=np.float64)[order],
+        "ts": ts[order],
+        "log_emission": log_emission,
+        "row": order,
+        "n_steps": steps_per_gap,
+        "n_states": states_per_gap,
+    }
+
+
+def _shape_batches(layout: Dict[str, np.ndarray]) -> Iterator[np.ndarray]:
+    """Yield indices of gaps in the same lattice shape bin, in batches of at most ``VITERBI_BATCH_BYTES``.
+
+    A gap is charged ``steps * states**2 * (8 + 4)`` bytes at its bin's
+    upper bound, which bounds its padded lattice, backpointers and per-step
+    pairwise transition temporaries.
+    """
+    n_steps, n_states = layout["n_steps"], layout["n_states"]
+    step_bin, state_bin = _shape_bin(n_steps), _shape_bin(n_states)
+    # Within a bin, neighbouring gaps have similar shapes, so batches pad little.
+    by_shape = np.lexsort((n_states, n_steps, state_bin, step_bin))
+    bin_start = np.flatnonzero(
+        np.diff(step_bin[by_shape], prepend=-1) | np.diff(state_bin[by_shape], prepend=-1)
+    )
+    for lo, hi in zip(bin_start, np.append(bin_start[1:], len(by_shape))):
+        gap = by_shape[lo]
+        per_gap_bytes = max(1, int(step_bin[gap]) * int(state_bin[gap]) ** 2 * (8 + 4))
+        batch_gaps = max(1, VITERBI_BATCH_BYTES // per_gap_bytes)
+        for start in range(lo, hi, batch_gaps):
+            yield by_shape[start : min(start + batch_gaps, hi)]
+
+
+def _shape_bin(sizes: np.ndarray) -> np.ndarray:
+    """Round lattice sizes up to the next power of two or 1.5x power of two."""
+    sizes = np.maximum(sizes, 1)
+    power = np.left_shift(1, np.floor(np.log2(sizes)).astype(np.int64))
+    half = power + power // 2
+    return np.where(sizes <= power, power, np.where(sizes <= half, half, 2 * power))
+
+
+def _build_lattice(layout: Dict[str, np.ndarray], gaps: np.ndarray) -> Dict[str, np.ndarray]:
+    """Fill dense ``(gaps, steps, states)`` arrays, padded to the largest steps and states among ``gaps``.
+
+    Padded states have a ``-inf`` emission, so they are never on a best path;
+    padded steps are skipped by ``_decode_batch`` through ``n_steps``.
+    """
+    n_steps = int(layout["n_steps"][gaps].max())
+    n_states = int(layout["n_states"][gaps].max())
+    starts = layout["gap_offset"][gaps]
+    counts = layout["gap_offset"][gaps + 1] - starts
+    local_gap = np.repeat(np.arange(len(gaps)), counts)
+    entries = np.arange(int(counts.sum())) + np.repeat(starts - np.cumsum(counts) + counts, counts)
+
+    shape = (len(gaps), n_steps, n_states)
+    where = (local_gap, layout["step"][entries], layout["state"][entries])
+    lattice = {
+        "lat": np.zeros(shape, dtype=np.float64),
+        "lon": np.zeros(shape, dtype=np.float64),
+        "ts": np.zeros(shape, dtype=np.int64),
+        "log_emission": np.full(shape, -np.inf, dtype=np.float64),
+        "row": np.zeros(shape, dtype=np.int64),
+    }
+    for name, grid in lattice.items():
+        grid[where] = layout[name][entries]
+    lattice["n_steps"] = layout["n_steps"][gaps]
+    return lattice
+
+
+def _decode_batch(
+    batch: Dict[str, np.ndarray],
+    penalty: float,
+    speed_kmh: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Run log-space Viterbi over a padded batch; return best states and log scores.
+
+    Past a gap's own ``n_steps`` its scores are carried unchanged and its
+    backpointers are the identity, so backtracking from the last padded step
+    starts at the gap's own best final state.
+    """
+    lat, lon, ts = batch["lat"], batch["lon"], batch["ts"]
+    log_emission = batch["log_emission"]
+    n_gaps, n_steps, n_states = lat.shape
+    backpointer = np.zeros((n_gaps, n_steps, n_states), dtype=np.int64)
+    identity = np.broadcast_to(np.arange(n_states), (n_gaps, n_states))
+    delta = log_emission[:, 0, :].copy()
+    for t in range(1, n_steps):
+        distance = haversine_km(
+            lat[:, t - 1, :, None], lon[:, t - 1, :, None], lat[:, t, None, :], lon[:, t, None, :]
+        )
+        hours = np.abs(ts[:, t, None, :] - ts[:, t - 1, :, None]) / 3_600_000.0
+        reach = np.maximum(speed_kmh * hours, 1e-3)
+        transition = delta[:, :, None] - penalty * (distance / reach) ** 2
+        best_prev = np.argmax(transition, axis=1)
+        best = np.take_along_axis(transition, best_prev[:, None, :], axis=1)[:, 0, :]
+        active = (t < batch["n_steps"])[:, None]
+        backpointer[:, t, :] = np.where(active, best_prev, identity)
+        delta = np.where(active, best + log_emission[:, t, :], delta)
+
+    states = np.zeros((n_gaps, n_steps), dtype=np.int64)
+    states[:, -1] = np.argmax(delta, axis=1)
+    best_score = delta[np.arange(n_gaps), states[:, -1]]
+    for t in range(n_steps - 1, 0, -1):
+        states[:, t - 1] = backpointer[np.arange(n_gaps), t, states[:, t]]
+    return states, best_score
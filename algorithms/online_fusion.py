@@ -0,0 +1,604 @@
+"""Online AIS-RF fusion: incremental gap fill and spoof detection with per-vessel state.
+
+``OnlineFusionEngine`` applies the batch algorithms' rules record by record
+so fused output is available seconds after an RF detection arrives:
+
+* Records are released in event-time order from a reorder buffer once the
+  watermark (newest ``ts_utc`` seen minus ``allowed_lateness_ms``) passes
+  them; records already behind the watermark when they arrive are late and
+  dropped.
+* Gap fill (README §5.1): a vessel silent for more than
+  ``gap_threshold_minutes`` has an open gap. An RF detection it could have
+  reached from its last node (last fix or accepted anchor) at
+  ``max_speed_knots`` is scored like a batch candidate; the best vessel
+  above ``min_candidate_score`` takes it as an anchor, and the anchor plus
+  great-circle points every ``fill_interval_minutes`` back to the previous
+  node are emitted immediately. The closing AIS fix adds the last leg.
+* Spoof detection (README §5.2): RF detections naming the vessel (``mmsi``,
+  or ``imo``/``call_sign`` seen in its AIS) give a residual against the
+  AIS track. A residual is flagged above ``residual_threshold_km`` and
+  beyond ``gate_sigma`` RF uncertainties. ``spoof_score`` is the flagged
+  share of the last ``smoothing_window`` residuals times
+  ``1 - exp(-residual / residual_threshold_km)`` of the latest one. While it
+  is at least ``spoof_score_threshold``, AIS fixes with a named detection
+  within ``time_bucket_minutes`` are replaced by the RF position, keeping
+  ``orig_lat``/``orig_lon``.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from algorithms.gap_fill import (
+    CANDIDATE_SCORE_WEIGHTS,
+    FILL_METHOD_INTERPOLATED,
+    FILL_METHOD_RF,
+    KNOTS_TO_KMH,
+    GapFillConfig,
+)
+from algorithms.spoof_detection import SpoofDetectionConfig
+from entity_resolution.resolver import KM_PER_DEG_LAT, EntityResolutionConfig
+from ingest.stream_sources import StreamMessage
+from schemas.components import OnlineFusionConfig
+from utils.geo import EARTH_RADIUS_KM, great_circle_interpolate, initial_bearing_deg
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+MS_PER_HOUR = 3_600_000
+
+
+@dataclass(slots=True)
+class VesselState:
+    """Compact per-MMSI state: last fix, open-gap node and rolling residuals."""
+
+    last_ts: int
+    last_lat: float
+    last_lon: float
+    last_sog_kn: float
+    cell: Tuple[int, int]
+    # Last node of the open gap: the last fix, or the latest accepted anchor.
+    node_ts: Optional[int] = None
+    node_lat: float = 0.0
+    node_lon: float = 0.0
+    node_confidence: float = 1.0
+    gap_anchors: int = 0
+    residuals: Deque[Tuple[bool, float]] = field(default_factory=deque)
+    spoof_score: float = 0.0
+    rf_ts: Optional[int] = None  # latest detection naming this vessel
+    rf_lat: float = 0.0
+    rf_lon: float = 0.0
+    rf_id: Optional[str] = None
+
+
+class OnlineFusionEngine:
+    """Incremental fusion of an AIS/RF record stream; see the module docstring.
+
+    ``process`` takes one message and returns the fused records it released,
+    ``flush`` releases everything still buffered. Records are dicts with the
+    AIS fields plus ``source_tag`` (``AIS``, ``RF`` or ``fused``),
+    ``spoof_score``, and for fills ``fill_method``, ``fill_confidence`` and
+    ``rf_id``. ``on_event`` receives ``spoof_alert`` and ``gap_closed``
+    events as they happen.
+    """
+
+    def __init__(
+        self,
+        gap_config: GapFillConfig,
+        spoof_config: SpoofDetectionConfig,
+        resolver_config: EntityResolutionConfig,
+        config: OnlineFusionConfig,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> None:
+        self.gap_config = gap_config
+        self.spoof_config = spoof_config
+        self.resolver_config = resolver_config
+        self.config = config
+        self.on_event = on_event
+        self.watermark: Optional[int] = None
+        self.vessels: Dict[int, VesselState] = {}
+        self.metrics: Dict[str, int] = dict.fromkeys(
+            (
+                "messages",
+                "released",
+                "late",
+                "duplicates",
+                "invalid",
+                "ais_records",
+                "rf_unlinked",
+                "fill_anchors",
+                "fill_points",
+                "fill_legs_rejected",
+                "gaps_filled",
+                "spoof_alerts",
+                "spoof_corrections",
+                "vessels_evicted",
+            ),
+            0,
+        )
+        self.latencies_ms: Deque[float] = deque(maxlen=max(1, int(config.latency_samples)))
+        self._buffer: List[Tuple[int, int, StreamMessage]] = []
+        self._sequence = itertools.count()
+        self._max_ts: Optional[int] = None
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._identifiers: Dict[Tuple[str, str], int] = {}
+        self._released_rf: Dict[str, int] = {}
+        self._next_prune_ts: Optional[int] = None
+        self._started_s: Optional[float] = None
+
+        self._cell_km = float(gap_config.candidate_cell_km)
+        self._gap_ms = float(gap_config.gap_threshold_minutes) * 60_000
+        self._max_gap_ms = float(config.max_gap_minutes) * 60_000
+        self._max_speed_kn = float(gap_config.max_speed_knots)
+        self._max_speed_km_per_ms = self._max_speed_kn * KNOTS_TO_KMH / MS_PER_HOUR
+        self._radius_km = float(gap_config.candidate_radius_km)
+        self._fill_interval_ms = int(float(gap_config.fill_interval_minutes) * 60_000)
+        # Grid rings searched for vessels in open gaps: as far as one can sail in ``max_gap_minutes``.
+        reach_km = self._max_speed_km_per_ms * self._max_gap_ms + self._radius_km
+        self._rings = max(1, math.ceil(reach_km / self._cell_km))
+        self._tolerance_ms = float(resolver_config.time_bucket_minutes) * 60_000
+
+    def process(self, message: StreamMessage) -> List[Dict[str, Any]]:
+        """Buffer ``message`` and return the fused records the advanced watermark releases."""
+        if self._started_s is None:
+            self._started_s = message.received_s
+        self.metrics["messages"] += 1
+        ts = message.record["ts_utc"]
+        if self.watermark is not None and ts < self.watermark:
+            self.metrics["late"] += 1
+            return []
+        heapq.heappush(self._buffer, (ts, next(self._sequence), message))
+        if self._max_ts is None or ts > self._max_ts:
+            self._max_ts = ts
+            self.watermark = ts - int(self.config.allowed_lateness_ms)
+        return self._release(self.watermark)
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Release every buffered record, e.g. when the source is idle or closing.
+
+        The watermark moves to the newest event time, so records older than
+        that arriving afterwards are late.
+        """
+        if self._max_ts is None:
+            return []
+        self.watermark = max(self.watermark or self._max_ts, self._max_ts)
+        return self._release(self._max_ts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters, state sizes, latency percentiles and throughput so far."""
+        latencies = np.fromiter(self.latencies_ms, dtype=np.float64, count=len(self.latencies_ms))
+        elapsed = time.perf_counter() - self._started_s if self._started_s is not None else 0.0
+        return {
+            **self.metrics,
+            "buffered": len(self._buffer),
+            "vessels": len(self.vessels),
+            "watermark": self.watermark,
+            "latency_p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "latency_p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            "messages_per_s": self.metrics["messages"] / elapsed if elapsed > 0 else None,
+        }
+
+    def _release(self, watermark: int) -> List[Dict[str, Any]]:
+        """Process buffered records up to ``watermark`` in event-time order."""
+        out: List[Dict[str, Any]] = []
+        buffer = self._buffer
+        while buffer and buffer[0][0] <= watermark:
+            _, _, message = heapq.heappop(buffer)
+            if message.kind == "ais":
+                self._on_ais(message.record, out)
+            else:
+                self._on_rf(message.record, out)
+            self.metrics["released"] += 1
+            self.latencies_ms.append((time.perf_counter() - message.received_s) * 1_000)
+        if self._next_prune_ts is None or watermark >= self._next_prune_ts:
+            self._prune(watermark)
+        return out
+
+    def _on_ais(self, record: Dict[str, Any], out: List[Dict[str, Any]]) -> None:
+        """Update the vessel with a fix; close its open gap and emit the (corrected) fix."""
+        try:
+            mmsi = int(record["mmsi"])
+            lat = float(record["lat"])
+            lon = float(record["lon"])
+        except (KeyError, TypeError, ValueError):
+            self.metrics["invalid"] += 1
+            return
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+            self.metrics["invalid"] += 1
+            return
+        ts = record["ts_utc"]
+        for kind in ("imo", "call_sign"):
+            value = record.get(kind)
+            if value is not None and value != "":
+                self._identifiers[(kind, _identifier_key(kind, value))] = mmsi
+
+        sog = _finite(record.get("sog"))
+        sog_kn = min(max(sog, 0.0), self._max_speed_kn) if sog is not None else self._max_speed_kn
+        vessel = self.vessels.get(mmsi)
+        if vessel is None:
+            vessel = self.vessels[mmsi] = VesselState(ts, lat, lon, sog_kn, self._cell(lat, lon))
+            self._cells.setdefault(vessel.cell, set()).add(mmsi)
+        elif ts <= vessel.last_ts:
+            self.metrics["duplicates"] += 1
+            return
+        else:
+            if vessel.gap_anchors:
+                self._close_gap(mmsi, vessel, ts, lat, lon, out)
+            vessel.node_ts = None
+            vessel.gap_anchors = 0
+            vessel.last_ts, vessel.last_lat, vessel.last_lon, vessel.last_sog_kn = ts, lat, lon, sog_kn
+            cell = self._cell(lat, lon)
+            if cell != vessel.cell:
+                self._move(mmsi, vessel.cell, cell)
+                vessel.cell = cell
+
+        fused = {**record, "source_tag": "AIS", "spoof_score": vessel.spoof_score}
+        threshold = float(self.spoof_config.spoof_score_threshold)
+        if (
+            vessel.spoof_score >= threshold
+            and vessel.rf_ts is not None
+            and abs(ts - vessel.rf_ts) <= self._tolerance_ms
+        ):
+            fused.update(
+                lat=vessel.rf_lat,
+                lon=vessel.rf_lon,
+                orig_lat=lat,
+                orig_lon=lon,
+                source_tag="fused",
+                rf_id=vessel.rf_id,
+            )
+            self.metrics["spoof_corrections"] += 1
+        self.metrics["ais_records"] += 1
+        out.append(fused)
+
+    def _on_rf(self, record: Dict[str, Any], out: List[Dict[str, Any]]) -> None:
+        """Attribute a detection to a vessel, then use it as a gap anchor or a spoof residual."""
+        try:
+            lat = float(record["est_lat"])
+            lon = float(record["est_lon"])
+        except (KeyError, TypeError, ValueError):
+            self.metrics["invalid"] += 1
+            return
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+            self.metrics["invalid"] += 1
+            return
+        ts = record["ts_utc"]
+        rf_id = str(record.get("rf_id"))
+        if rf_id in self._released_rf:
+            self.metrics["duplicates"] += 1
+            return
+        self._released_rf[rf_id] = ts
+        uncertainty = _finite(record.get("geo_uncertainty_m"))
+        sigma_km = (
+            uncertainty if uncertainty is not None and uncertainty > 0 else self.resolver_config.default_uncertainty_m
+        ) / 1_000
+
+        mmsi = self._named_vessel(record)
+        if mmsi is not None:
+            vessel = self.vessels.get(mmsi)
+            if vessel is None:
+                self.metrics["rf_unlinked"] += 1
+            elif self._in_gap(vessel, ts):
+                score = self._anchor_score(vessel, ts, lat, lon, sigma_km)
+                if score is not None and score >= float(self.gap_config.min_candidate_score):
+                    self._add_anchor(mmsi, vessel, ts, lat, lon, score, rf_id, out)
+                else:
+                    self.metrics["rf_unlinked"] += 1
+            else:
+                self._add_residual(mmsi, vessel, ts, lat, lon, sigma_km, rf_id)
+            return
+
+        best: Optional[Tuple[float, int]] = None
+        for candidate in self._gap_vessels_near(lat, lon, ts):
+            score = self._anchor_score(self.vessels[candidate], ts, lat, lon, sigma_km)
+            if score is not None and (best is None or score > best[0]):
+                best = (score, candidate)
+        if best is None or best[0] < float(self.gap_config.min_candidate_score):
+            self.metrics["rf_unlinked"] += 1
+            return
+        self._add_anchor(best[1], self.vessels[best[1]], ts, lat, lon, best[0], rf_id, out)
+
+    def _named_vessel(self, record: Dict[str, Any]) -> Optional[int]:
+        """Return the MMSI a detection names directly or through an identifier seen in AIS."""
+        mmsi = record.get("mmsi")
+        if mmsi is not None and mmsi != "":
+            try:
+                return int(mmsi)
+            except (TypeError, ValueError):
+                pass
+        for kind in ("imo", "call_sign"):
+            value = record.get(kind)
+            if value is not None and value != "":
+                found = self._identifiers.get((kind, _identifier_key(kind, value)))
+                if found is not None:
+                    return found
+        return None
+
+    def _in_gap(self, vessel: VesselState, ts: int) -> bool:
+        """Whether the vessel has been silent long enough at ``ts`` to have an open gap."""
+        silent_ms = ts - vessel.last_ts
+        return self._gap_ms < silent_ms <= self._max_gap_ms
+
+    def _gap_vessels_near(self, lat: float, lon: float, ts: int) -> List[int]:
+        """Return vessels with an open gap at ``ts`` whose last fix is within reach of the grid rings."""
+        row = math.floor(lat * KM_PER_DEG_LAT / self._cell_km)
+        found = []
+        for r in range(row - self._rings, row + self._rings + 1):
+            col = self._col(lon, r)
+            for c in range(col - self._rings, col + self._rings + 1):
+                members = self._cells.get((r, c))
+                if members:
+                    found.extend(m for m in members if self._in_gap(self.vessels[m], ts))
+        return found
+
+    def _anchor_score(self, vessel: VesselState, ts: int, lat: float, lon: float, sigma_km: float) -> Optional[float]:
+        """Score a detection as the vessel's next gap anchor; None when it is out of reach or too fast.
+
+        Uses the batch candidate components (README §5.1 step 3): time 1
+        inside the gap, spatial ``exp(-0.5 * (r / sigma) ** 2)`` for the
+        distance ``r`` beyond what the last reported speed covers, with
+        ``sigma`` the candidate radius plus the RF uncertainty, and quality
+        ``exp(-uncertainty / candidate_radius_km)``.
+        """
+        node_ts = vessel.node_ts if vessel.node_ts is not None else vessel.last_ts
+        node_lat = vessel.node_lat if vessel.node_ts is not None else vessel.last_lat
+        node_lon = vessel.node_lon if vessel.node_ts is not None else vessel.last_lon
+        dt_ms = ts - node_ts
+        distance_km = _distance_km(node_lat, node_lon, lat, lon)
+        if dt_ms <= 0:
+            if distance_km > 0:
+                return None
+        elif distance_km / (dt_ms / MS_PER_HOUR) / KNOTS_TO_KMH > self._max_speed_kn:
+            return None
+        residual_km = max(distance_km - vessel.last_sog_kn * KNOTS_TO_KMH * dt_ms / MS_PER_HOUR, 0.0)
+        spatial_sigma = self._radius_km + sigma_km
+        scores = {
+            "time": 1.0,
+            "spatial": math.exp(-0.5 * (residual_km / spatial_sigma) ** 2),
+            "quality": math.exp(-sigma_km / self._radius_km),
+        }
+        total = sum(CANDIDATE_SCORE_WEIGHTS.values())
+        return sum(weight * scores[name] for name, weight in CANDIDATE_SCORE_WEIGHTS.items()) / total
+
+    def _add_anchor(
+        self,
+        mmsi: int,
+        vessel: VesselState,
+        ts: int,
+        lat: float,
+        lon: float,
+        score: float,
+        rf_id: str,
+        out: List[Dict[str, Any]],
+    ) -> None:
+        """Emit the points from the previous node to a new anchor, then the anchor itself."""
+        if vessel.node_ts is None:
+            vessel.node_ts, vessel.node_lat, vessel.node_lon, vessel.node_confidence = (
+                vessel.last_ts,
+                vessel.last_lat,
+                vessel.last_lon,
+                1.0,
+            )
+        self._emit_leg(mmsi, vessel, ts, lat, lon, score, out)
+        sog, cog = _leg_kinematics(vessel.node_ts, vessel.node_lat, vessel.node_lon, ts, lat, lon)
+        out.append(
+            {
+                "mmsi": mmsi,
+                "ts_utc": ts,
+                "lat": lat,
+                "lon": lon,
+                "sog": sog,
+                "cog": cog,
+                "source_tag": "RF",
+                "fill_method": FILL_METHOD_RF,
+                "fill_confidence": score,
+                "rf_id": rf_id,
+                "spoof_score": vessel.spoof_score,
+            }
+        )
+        vessel.node_ts, vessel.node_lat, vessel.node_lon, vessel.node_confidence = ts, lat, lon, score
+        vessel.gap_anchors += 1
+        self.metrics["fill_anchors"] += 1
+
+    def _close_gap(
+        self, mmsi: int, vessel: VesselState, ts: int, lat: float, lon: float, out: List[Dict[str, Any]]
+    ) -> None:
+        """Emit the last leg of a filled gap up to the closing fix when its speed is plausible."""
+        dt_ms = ts - vessel.node_ts
+        distance_km = _distance_km(vessel.node_lat, vessel.node_lon, lat, lon)
+        plausible = distance_km == 0 or (
+            dt_ms > 0 and distance_km / (dt_ms / MS_PER_HOUR) / KNOTS_TO_KMH <= self._max_speed_kn
+        )
+        if plausible:
+            self._emit_leg(mmsi, vessel, ts, lat, lon, 1.0, out)
+        else:
+            self.metrics["fill_legs_rejected"] += 1
+        self.metrics["gaps_filled"] += 1
+        self._event(
+            {
+                "event": "gap_closed",
+                "mmsi": mmsi,
+                "start_ts": vessel.last_ts,
+                "end_ts": ts,
+                "anchors": vessel.gap_anchors,
+                "closing_leg_plausible": plausible,
+            }
+        )
+
+    def _emit_leg(
+        self,
+        mmsi: int,
+        vessel: VesselState,
+        ts: int,
+        lat: float,
+        lon: float,
+        confidence: float,
+        out: List[Dict[str, Any]],
+    ) -> None:
+        """Emit great-circle points every fill interval from the gap start, between the node and ``ts``."""
+        interval = self._fill_interval_ms
+        if interval <= 0:
+            return
+        start = vessel.last_ts
+        first = start + (max(vessel.node_ts - start, 0) // interval + 1) * interval
+        times = np.arange(first, ts, interval, dtype=np.int64)
+        if len(times) == 0:
+            return
+        span = max(ts - vessel.node_ts, 1)
+        fraction = (times - vessel.node_ts) / span
+        lats, lons = great_circle_interpolate(vessel.node_lat, vessel.node_lon, lat, lon, fraction)
+        sog, cog = _leg_kinematics(vessel.node_ts, vessel.node_lat, vessel.node_lon, ts, lat, lon)
+        cogs = initial_bearing_deg(lats, lons, lat, lon)
+        confidences = vessel.node_confidence + fraction * (confidence - vessel.node_confidence)
+        for point_ts, point_lat, point_lon, point_cog, point_confidence in zip(
+            times.tolist(), lats.tolist(), lons.tolist(), cogs.tolist(), confidences.tolist()
+        ):
+            out.append(
+                {
+                    "mmsi": mmsi,
+                    "ts_utc": point_ts,
+                    "lat": point_lat,
+                    "lon": point_lon,
+                    "sog": sog,
+                    "cog": point_cog if cog is not None else None,
+                    "source_tag": "fused",
+                    "fill_method": FILL_METHOD_INTERPOLATED,
+                    "fill_confidence": point_confidence,
+                    "rf_id": None,
+                    "spoof_score": vessel.spoof_score,
+                }
+            )
+        self.metrics["fill_points"] += len(times)
+
+    def _add_residual(
+        self,
+        mmsi: int,
+        vessel: VesselState,
+        ts: int,
+        lat: float,
+        lon: float,
+        sigma_km: float,
+        rf_id: str,
+    ) -> None:
+        """Push a named detection's residual against the AIS track and update the spoof score."""
+        dt_ms = ts - vessel.last_ts
+        if dt_ms > self._tolerance_ms:
+            return
+        distance_km = _distance_km(vessel.last_lat, vessel.last_lon, lat, lon)
+        residual_km = max(distance_km - vessel.last_sog_kn * KNOTS_TO_KMH * abs(dt_ms) / MS_PER_HOUR, 0.0)
+        threshold_km = float(self.spoof_config.residual_threshold_km)
+        flagged = residual_km > threshold_km and residual_km > self.resolver_config.gate_sigma * sigma_km
+        window = max(1, int(self.spoof_config.smoothing_window))
+        vessel.residuals.append((flagged, residual_km))
+        while len(vessel.residuals) > window:
+            vessel.residuals.popleft()
+        share = sum(1 for was_flagged, _ in vessel.residuals if was_flagged) / len(vessel.residuals)
+        previous = vessel.spoof_score
+        vessel.spoof_score = share * (1.0 - math.exp(-residual_km / threshold_km))
+        vessel.rf_ts, vessel.rf_lat, vessel.rf_lon, vessel.rf_id = ts, lat, lon, rf_id
+        threshold = float(self.spoof_config.spoof_score_threshold)
+        if vessel.spoof_score >= threshold > previous:
+            self.metrics["spoof_alerts"] += 1
+            self._event(
+                {
+                    "event": "spoof_alert",
+                    "mmsi": mmsi,
+                    "ts_utc": ts,
+                    "spoof_score": vessel.spoof_score,
+                    "residual_km": residual_km,
+                    "ais_lat": vessel.last_lat,
+                    "ais_lon": vessel.last_lon,
+                    "rf_lat": lat,
+                    "rf_lon": lon,
+                    "rf_id": rf_id,
+                }
+            )
+
+    def _prune(self, watermark: int) -> None:
+        """Forget vessels silent for ``state_ttl_minutes`` and RF ids behind the watermark."""
+        ttl_ms = int(float(self.config.state_ttl_minutes) * 60_000)
+        cutoff = watermark - ttl_ms
+        stale = [mmsi for mmsi, vessel in self.vessels.items() if vessel.last_ts < cutoff]
+        for mmsi in stale:
+            vessel = self.vessels.pop(mmsi)
+            members = self._cells.get(vessel.cell)
+            if members is not None:
+                members.discard(mmsi)
+                if not members:
+                    del self._cells[vessel.cell]
+        self.metrics["vessels_evicted"] += len(stale)
+        # Detections behind the watermark cannot be released again: their duplicates arrive late.
+        self._released_rf = {rf_id: ts for rf_id, ts in self._released_rf.items() if ts >= watermark}
+        self._next_prune_ts = watermark + max(ttl_ms // 10, 60_000)
+
+    def _event(self, event: Dict[str, Any]) -> None:
+        """Hand an event to ``on_event`` when set."""
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        """Return the ``candidate_cell_km`` grid cell of a position."""
+        row = math.floor(lat * KM_PER_DEG_LAT / self._cell_km)
+        return row, self._col(lon, row)
+
+    def _col(self, lon: float, row: int) -> int:
+        """Return the grid column of ``lon`` in ``row``; columns narrow in degrees towards the poles."""
+        row_lat = (row + 0.5) * self._cell_km / KM_PER_DEG_LAT
+        km_per_deg_lon = KM_PER_DEG_LAT * max(math.cos(math.radians(min(abs(row_lat), 89.0))), 0.01)
+        return math.floor(lon * km_per_deg_lon / self._cell_km)
+
+    def _move(self, mmsi: int, old: Tuple[int, int], new: Tuple[int, int]) -> None:
+        """Move a vessel between grid cells."""
+        members = self._cells.get(old)
+        if members is not None:
+            members.discard(mmsi)
+            if not members:
+                del self._cells[old]
+        self._cells.setdefault(new, set()).add(mmsi)
+
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Scalar ``haversine_km`` for the per-record path, where NumPy call overhead dominates."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) * 0.5) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) * 0.5) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(max(a, 0.0), 1.0)))
+
+
+def _leg_kinematics(
+    ts1: int, lat1: float, lon1: float, ts2: int, lat2: float, lon2: float
+) -> Tuple[Optional[float], Optional[float]]:
+    """Return the speed in knots and initial bearing of a leg; None for a zero-length one."""
+    if ts2 <= ts1:
+        return None, None
+    distance_km = _distance_km(lat1, lon1, lat2, lon2)
+    bearing = float(initial_bearing_deg(lat1, lon1, lat2, lon2)) if distance_km > 0 else None
+    return distance_km / ((ts2 - ts1) / MS_PER_HOUR) / KNOTS_TO_KMH, bearing
+
+
+def _finite(value: Any) -> Optional[float]:
+    """Return ``value`` as a finite float, or None."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _identifier_key(kind: str, value: Any) -> str:
+    """Normalize an IMO or call sign for lookups."""
+    text = str(value).strip().upper()
+    if kind == "imo" and text.startswith("IMO"):
+        text = text[3:].strip()
+    return text
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from typing import Dict
 
+import numpy as np
 import pandas as pd
 
 from utils.logging import get_logger
@@ -12,14 +13,23 @@ logger = get_logger(__name__)
 
 
 def compute_candidate_scores(df: pd.DataFrame, weight_config: Dict[str, float]) -> pd.DataFrame:
-    """Compute composite scores for candidate RF detections."""
-    # TODO: Combine normalized feature weights to produce a scalar score.
+    """Compute composite scores for candidate RF detections.
+
+    ``score`` is the weighted mean of the ``<name>_score`` columns named in
+    ``weight_config``; inputs are expected in ``[0, 1]``.
+    """
     logger.debug("Computing candidate scores with weights: %s", weight_config)
-    return df
+    total = float(sum(weight_config.values()))
+    if total <= 0:
+        raise ValueError("Candidate score weights must sum to a positive value")
+    score = np.zeros(len(df), dtype=np.float64)
+    for name, weight in weight_config.items():
+        score += float(weight) * df[f"{name}_score"].to_numpy(dtype=np.float64)
+    return df.assign(score=score / total)
 
 
 def apply_threshold(df: pd.DataFrame, score_column: str, threshold: float) -> pd.DataFrame:
     """Filter DataFrame rows by a minimum score threshold."""
-    # TODO: Filter DataFrame where score_column >= threshold.
     logger.debug("Applying score threshold %.3f on column %s", threshold, score_column)
-    return df
+    keep = df[score_column].to_numpy() >= threshold
+    return df if keep.all() else df.loc[keep].reset_index(drop=True)
@@ -0,0 +1,372 @@
+"""MMSI-sharded execution of the per-vessel gap fill and spoof detection stages."""
+from __future__ import annotations
+
+import functools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from algorithms.candidates import RFGrid, generate_candidates
+from algorithms.gap_fill import (
+    GapFillConfig,
+    detect_gaps,
+    merge_gap_fill_results,
+    score_candidates,
+    viterbi_reconstruct,
+)
+from algorithms.spoof_detection import (
+    SpoofDetectionConfig,
+    compute_residuals,
+    correct_spoofed_tracks,
+    score_spoofing,
+)
+from entity_resolution.spatiotemporal_index import MAX_PAIRS_PER_CHUNK
+from schemas.components import ParallelConfig
+from utils.arrow import is_arrow_backed, numeric_view, table_to_pandas
+from utils.logging import get_logger
+from utils.ranges import chunk_bounds, expand_ranges
+from utils.time import epoch_ms_array
+
+
+logger = get_logger(__name__)
+
+
+StageResult = Tuple[pd.DataFrame, Dict[str, Any], Dict[str, Any]]
+ShardStage = Callable[..., StageResult]
+# In-process RF detections, or the path of an Arrow IPC file written by ``_shared_rf_store``.
+RFSource = Union[pd.DataFrame, str]
+
+
+def run_fusion_stages(
+    ais_df: pd.DataFrame,
+    rf_df: pd.DataFrame,
+    gap_config: GapFillConfig,
+    spoof_config: SpoofDetectionConfig,
+    shard: int = 0,
+    n_shards: int = 1,
+) -> StageResult:
+    """Run gap fill then spoof detection for one set of vessels.
+
+    Gap ids are renumbered to ``gap_id * n_shards + shard`` so they stay unique
+    when shard results are merged.
+
+    Returns:
+        Tuple of corrected AIS records, gap fill metrics and spoof metrics.
+    """
+    fused_gap_df, gap_metrics, _ = run_gap_fill_stage(ais_df, rf_df, gap_config, spoof_config, shard, n_shards)
+    residuals, _, _ = run_residual_stage(fused_gap_df, rf_df, gap_config, spoof_config)
+    corrected_df, spoof_metrics = run_spoof_stage(fused_gap_df, residuals, rf_df, spoof_config)
+    return corrected_df, gap_metrics, spoof_metrics
+
+
+def run_gap_fill_stage(
+    ais_df: pd.DataFrame,
+    rf_df: pd.DataFrame,
+    gap_config: GapFillConfig,
+    spoof_config: SpoofDetectionConfig,
+    shard: int = 0,
+    n_shards: int = 1,
+) -> StageResult:
+    """Detect gaps, score pruned RF candidates and merge Viterbi paths into the AIS track."""
+    gaps = detect_gaps(ais_df, gap_config)
+    gaps["gap_id"] = gaps["gap_id"] * n_shards + shard
+    candidates, candidate_metrics = generate_candidates(gaps, rf_df, gap_config)
+    candidate_scores = score_candidates(candidates, gap_config)
+    viterbi_paths, gap_metrics = viterbi_reconstruct(candidate_scores, gap_config)
+    fused_df, fill_metrics = merge_gap_fill_results(ais_df, viterbi_paths, gap_config)
+    return fused_df, {**gap_metrics, **candidate_metrics, **fill_metrics}, {}
+
+
+def run_residual_stage(
+    fused_gap_df: pd.DataFrame,
+    rf_df: pd.DataFrame,
+    gap_config: GapFillConfig,
+    spoof_config: SpoofDetectionConfig,
+    shard: int = 0,
+    n_shards: int = 1,
+) -> StageResult:
+    """Compute AIS-RF residuals; these do not depend on the spoof thresholds."""
+    return compute_residuals(fused_gap_df, rf_df), {}, {}
+
+
+def run_spoof_stage(
+    fused_gap_df: pd.DataFrame,
+    residuals: pd.DataFrame,
+    rf_df: pd.DataFrame,
+    spoof_config: SpoofDetectionConfig,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Score residuals and correct spoofed tracks."""
+    spoof_scores = score_spoofing(residuals, spoof_config)
+    return correct_spoofed_tracks(fused_gap_df, spoof_scores, rf_df, spoof_config)
+
+
+def shard_of(mmsi: np.ndarray, n_shards: int) -> np.ndarray:
+    """Hash-partition MMSIs into ``n_shards`` buckets, stable across processes and runs."""
+    # splitmix64 finalizer; Python's hash() is salted per process and unusable here.
+    x = np.asarray(mmsi, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    return (x % np.uint64(n_shards)).astype(np.int64)
+
+
+def run_sharded(
+    ais_df: pd.DataFrame,
+    rf_df: pd.DataFrame,
+    gap_config: GapFillConfig,
+    spoof_config: SpoofDetectionConfig,
+    parallel_config: ParallelConfig,
+    stage: ShardStage = run_fusion_stages,
+    rf_rows: Optional[Sequence[np.ndarray]] = None,
+) -> StageResult:
+    """Run ``stage`` per MMSI shard in a process pool and merge the results.
+
+    ``stage`` is a module-level function with the ``run_fusion_stages``
+    signature, such as ``run_gap_fill_stage`` or ``run_residual_stage``.
+
+    Each shard receives only its ``rf_rows`` entry: ``select_shard_rf_rows``
+    for gap fill, ``select_residual_rf_rows`` for residuals. By default both
+    selections over ``ais_df`` are combined. With several workers ``rf_df``
+    is written once as an uncompressed Arrow IPC file that workers
+    memory-map and take their rows from by position, so the RF detections
+    are held once per node rather than once per worker. Shard outputs are
+    concatenated in shard order and sorted by ``(mmsi, ts_utc)``, so the
+    merged output does not depend on worker count or completion order.
+    """
+    n_shards = parallel_config.shard_count
+    workers = max(1, parallel_config.workers)
+    logger.info("Running %s over %s MMSI shards with %s workers", stage.__name__, n_shards, workers)
+    if rf_rows is None:
+        gap_rows = select_shard_rf_rows(ais_df, rf_df, gap_config, n_shards)
+        residual_rows = select_residual_rf_rows(ais_df, rf_df, spoof_config, n_shards)
+        rf_rows = [np.union1d(a, b) for a, b in zip(gap_rows, residual_rows)]
+
+    if workers == 1:
+        tasks = _shard_tasks(stage, ais_df, rf_df, rf_rows, gap_config, spoof_config, n_shards)
+        results = [_run_shard(task) for task in tasks]
+    else:
+        with _shared_rf_store(rf_df, parallel_config.rf_store_dir) as store:
+            tasks = _shard_tasks(stage, ais_df, store, rf_rows, gap_config, spoof_config, n_shards)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_run_shard, tasks))
+
+    frames = [frame for frame, _, _ in results]
+    if not frames:
+        return ais_df.iloc[:0], {}, {}
+    merged = pd.concat(frames, ignore_index=True)
+    if {"mmsi", "ts_utc"} <= set(merged.columns):
+        merged = merged.sort_values(["mmsi", "ts_utc"], kind="stable", ignore_index=True)
+    gap_metrics = merge_metrics([gap for _, gap, _ in results])
+    spoof_metrics = merge_metrics([spoof for _, _, spoof in results])
+    return merged, gap_metrics, spoof_metrics
+
+
+def select_shard_rf_rows(
+    ais_df: pd.DataFrame,
+    rf_df: pd.DataFrame,
+    gap_config: GapFillConfig,
+    n_shards: int,
+) -> List[np.ndarray]:
+    """Return, per shard, the sorted ``rf_df`` rows its vessels' gaps can take as candidates.
+
+    Gaps are detected over all vessels and joined to the RF detections with
+    one ``generate_candidates`` call, the grid join the in-process stage
+    runs, and each candidate's row goes to its vessel's shard. A shard thus
+    scores exactly the candidates an in-process run would.
+    """
+    gaps = detect_gaps(ais_df, gap_config)
+    candidates, _ = generate_candidates(gaps, rf_df, gap_config)
+    shards = shard_of(candidates["mmsi"].to_numpy(dtype=np.int64), n_shards)
+    rows = _split_by_shard(shards, candidates["rf_row"].to_numpy(dtype=np.int64), len(rf_df), n_shards)
+    logger.info("Selected %s RF rows for %s gaps across %s shards", sum(map(len, rows)), len(gaps), n_shards)
+    return rows
+
+
+def select_residual_rf_rows(
+    ais_df: pd.DataFrame,
+    rf_df: pd.DataFrame,
+    spoof_config: SpoofDetectionConfig,
+    n_shards: int,
+) -> List[np.ndarray]:
+    """Return, per shard, the sorted ``rf_df`` rows near its vessels' pings, for the residual stage.
+
+    RF detections are bucketed in an ``RFGrid`` of ``residual_window_minutes``
+    slices and ``residual_search_km`` cells. Pings collapse to distinct
+    ``(shard, slice, cell)`` keys first, so the cost follows the area and
+    time a shard's fleet covers rather than its ping count. Each key takes
+    the neighbouring slices and the cells covering ``residual_search_km``
+    around its cell, so a shard receives every detection within the
+    residual window and radius of one of its pings along the whole track.
+    """
+    if ais_df.empty or rf_df.empty:
+        return [np.empty(0, dtype=np.int64) for _ in range(n_shards)]
+    window_ms = max(1, int(float(spoof_config.residual_window_minutes) * 60_000))
+    radius_km = float(spoof_config.residual_search_km)
+    grid = RFGrid.build(rf_df, window_ms, radius_km)
+
+    lat = numeric_view(ais_df["lat"])
+    lon = numeric_view(ais_df["lon"])
+    located = np.isfinite(lat) & np.isfinite(lon)
+    if not located.any():
+        return [np.empty(0, dtype=np.int64) for _ in range(n_shards)]
+    lat, lon = lat[located], lon[located]
+    slices = epoch_ms_array(ais_df["ts_utc"])[located] // window_ms
+    rows = np.clip(np.floor((lat + 90.0) / grid.cell_deg).astype(np.int64), 0, grid.n_rows - 1)
+    cols = np.floor((lon + 180.0) / grid.cell_deg).astype(np.int64) % grid.n_cols
+    shards = shard_of(numeric_view(ais_df["mmsi"], np.int64)[located], n_shards)
+    first_slice = int(slices.min())
+    slice_span = int(slices.max()) - first_slice + 1
+    keys = np.unique(((shards * slice_span + slices - first_slice) * grid.n_rows + rows) * grid.n_cols + cols)
+    keys, cols = np.divmod(keys, grid.n_cols)
+    keys, rows = np.divmod(keys, grid.n_rows)
+    key_shard, key_slice = np.divmod(keys, slice_span)
+    key_slice += first_slice
+
+    # Cells covering the search radius from anywhere in the key's cell: its centre plus half a diagonal.
+    centre_lat = (rows + 0.5) * grid.cell_deg - 90.0
+    centre_lon = (cols + 0.5) * grid.cell_deg - 180.0
+    reach = np.full(len(keys), radius_km * (1.0 + np.sqrt(0.5)))
+    row_lo, row_count, col_lo, col_count = grid.covering_ranges(centre_lat, centre_lon, reach)
+    cell_counts = 3 * row_count * col_count
+    selected_shards = []
+    selected_rows = []
+    for lo, hi in chunk_bounds(cell_counts, MAX_PAIRS_PER_CHUNK):
+        counts = cell_counts[lo:hi]
+        key = lo + np.repeat(np.arange(hi - lo, dtype=np.int64), counts)
+        within = expand_ranges(np.zeros(hi - lo, dtype=np.int64), counts)
+        cells = row_count[key] * col_count[key]
+        slice_offset = within // cells - 1
+        within = within % cells
+        owners, rf_rows = grid.lookup(
+            key_slice[key] + slice_offset,
+            row_lo[key] + within // col_count[key],
+            (col_lo[key] + within % col_count[key]) % grid.n_cols,
+        )
+        selected_shards.append(key_shard[key[owners]])
+        selected_rows.append(rf_rows)
+    rows = _split_by_shard(
+        np.concatenate(selected_shards) if selected_shards else np.empty(0, dtype=np.int64),
+        np.concatenate(selected_rows) if selected_rows else np.empty(0, dtype=np.int64),
+        len(rf_df),
+        n_shards,
+    )
+    logger.info("Selected %s RF rows near %s pings across %s shards", sum(map(len, rows)), len(ais_df), n_shards)
+    return rows
+
+
+def _split_by_shard(shards: np.ndarray, rf_rows: np.ndarray, n_rf: int, n_shards: int) -> List[np.ndarray]:
+    """Return the distinct sorted ``rf_rows`` of each shard from parallel ``(shard, row)`` arrays."""
+    n_rows = max(n_rf, 1)
+    keys = np.unique(shards * n_rows + rf_rows)
+    bounds = np.searchsorted(keys, np.arange(n_shards + 1) * n_rows)
+    rows = keys % n_rows
+    return [rows[bounds[shard] : bounds[shard + 1]] for shard in range(n_shards)]
+
+
+def merge_metrics(metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-shard metric dicts.
+
+    Integers are summed and dicts are unioned; ``mean_*`` values are dropped
+    and ``mean_path_confidence`` is recomputed from the merged
+    ``path_confidence`` map, as is ``candidate_pruning_rate`` from the summed
+    pair counts.
+    """
+    merged: Dict[str, Any] = {}
+    for shard_metrics in metrics:
+        for key, value in shard_metrics.items():
+            if key.startswith("mean_"):
+                continue
+            if isinstance(value, dict):
+                merged.setdefault(key, {}).update(value)
+            elif isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+                merged[key] = merged.get(key, 0) + int(value)
+            else:
+                merged.setdefault(key, value)
+    confidences = merged.get("path_confidence")
+    if confidences is not None:
+        merged["mean_path_confidence"] = float(np.mean(list(confidences.values()))) if confidences else None
+    if merged.get("candidate_pairs_time_window"):
+        merged["candidate_pruning_rate"] = 1.0 - merged["candidate_pairs"] / merged["candidate_pairs_time_window"]
+    return merged
+
+
+def _shard_tasks(
+    stage: ShardStage,
+    ais_df: pd.DataFrame,
+    rf_source: RFSource,
+    rf_rows: Sequence[np.ndarray],
+    gap_config: GapFillConfig,
+    spoof_config: SpoofDetectionConfig,
+    n_shards: int,
+) -> Iterator[Tuple[Any, ...]]:
+    """Yield one pickleable work item per non-empty shard, in shard order."""
+    shards = shard_of(numeric_view(ais_df["mmsi"], np.int64), n_shards)
+    order = np.argsort(shards, kind="stable")
+    bounds = np.searchsorted(shards[order], np.arange(n_shards + 1))
+    for shard in range(n_shards):
+        rows = order[bounds[shard] : bounds[shard + 1]]
+        if len(rows) == 0:
+            continue
+        yield (
+            stage,
+            ais_df.take(rows).reset_index(drop=True),
+            rf_source,
+            rf_rows[shard],
+            gap_config,
+            spoof_config,
+            shard,
+            n_shards,
+        )
+
+
+def _run_shard(task: Tuple[Any, ...]) -> StageResult:
+    """Process-pool entry point: take the shard's RF rows, then run its stage."""
+    stage, ais_df, rf_source, rf_rows, gap_config, spoof_config, shard, n_shards = task
+    rf_df = _take_rf_rows(_attach_rf_source(rf_source), rf_rows, ais_df)
+    logger.debug("Shard %s: %s AIS rows, %s RF rows", shard, len(ais_df), len(rf_df))
+    return stage(ais_df, rf_df, gap_config, spoof_config, shard, n_shards)
+
+
+def _take_rf_rows(rf_df: pd.DataFrame, rf_rows: np.ndarray, ais_df: pd.DataFrame) -> pd.DataFrame:
+    """Return the selected RF rows in frame order.
+
+    Rows taken from a memory-mapped store are Arrow-backed; they are
+    converted to NumPy dtypes when the AIS shard is, so a shard's frames
+    match what the in-process path would produce.
+    """
+    rf_df = rf_df.take(rf_rows).reset_index(drop=True)
+    if is_arrow_backed(rf_df) and not is_arrow_backed(ais_df):
+        rf_df = table_to_pandas(pa.Table.from_pandas(rf_df, preserve_index=False))
+    return rf_df
+
+
+def _attach_rf_source(rf_source: RFSource) -> pd.DataFrame:
+    """Return the frame itself, or this process's attachment to a stored one."""
+    if isinstance(rf_source, pd.DataFrame):
+        return rf_source
+    return _open_rf_store(rf_source)
+
+
+@functools.lru_cache(maxsize=2)
+def _open_rf_store(path: str) -> pd.DataFrame:
+    """Memory-map a stored RF frame once per worker process."""
+    return table_to_pandas(feather.read_table(path, memory_map=True), "pyarrow")
+
+
+@contextmanager
+def _shared_rf_store(rf_df: pd.DataFrame, directory: Optional[str]) -> Iterator[str]:
+    """Write ``rf_df`` to a temporary Arrow IPC file under ``directory``; yield its path and remove it after."""
+    with tempfile.TemporaryDirectory(prefix="rf-store-", dir=directory) as tmp:
+        path = Path(tmp) / "rows.arrow"
+        table = pa.Table.from_pandas(rf_df, preserve_index=False)
+        # One record batch: readers can then map each column as a single contiguous buffer.
+        feather.write_feather(table, path, compression="uncompressed", chunksize=max(table.num_rows, 1))
+        yield str(path)
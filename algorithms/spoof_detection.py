@@ -1,26 +1,17 @@
 """AIS spoof detection and correction using RF corroboration."""
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any, Dict, Tuple
 
 import pandas as pd
 
+from schemas.components import SpoofDetectionConfig
 from utils.logging import get_logger
 
 
 logger = get_logger(__name__)
 
 
-@dataclass
-class SpoofDetectionConfig:
-    """Configuration for spoof detection thresholding and correction."""
-
-    residual_threshold_km: float
-    spoof_score_threshold: float
-    smoothing_window: int
-
-
 def compute_residuals(ais_df: pd.DataFrame, rf_df: pd.DataFrame) -> pd.DataFrame:
     """Compute spatial residuals between AIS and RF estimates."""
     # TODO: Join AIS and RF data on resolved entities and compute haversine distances.
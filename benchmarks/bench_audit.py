@@ -0,0 +1,89 @@
+"""Audit event throughput: per-event file appends versus the buffered ``AuditSink``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_audit --events 100000
+
+``per_event`` reproduces the previous ``record_audit_event`` loop (mkdir,
+open/append/close and stdlib ``json`` for every event). ``sink`` and
+``sink_background`` buffer events in an ``AuditSink``, inline and on its
+writer thread. ``record_rows`` writes the same number of lineage rows to the
+parquet sidecar in one call.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from output.audit import AuditConfig, AuditSink
+
+
+def make_events(n: int) -> List[Dict[str, Any]]:
+    """Return ``n`` per-correction lineage events."""
+    rng = np.random.default_rng(7)
+    return [
+        {
+            "event": "spoof_correction",
+            "mmsi": 200_000_000 + i % 5_000,
+            "ts_utc": 1_700_000_000_000 + i * 1_000,
+            "orig_lat": float(rng.uniform(-60, 60)),
+            "orig_lon": float(rng.uniform(-180, 180)),
+            "spoof_score": float(rng.uniform(0.7, 1.0)),
+        }
+        for i in range(n)
+    ]
+
+
+def per_event(events: List[Dict[str, Any]], directory: Path) -> None:
+    """Append every event with its own mkdir and open, as before ``AuditSink``."""
+    for event in events:
+        directory.mkdir(parents=True, exist_ok=True)
+        with (directory / "audit.log").open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"timestamp": datetime.now(timezone.utc).isoformat(), **event}) + "\n")
+
+
+def sink(events: List[Dict[str, Any]], directory: Path, background: bool = False) -> None:
+    """Record every event through a buffered ``AuditSink``."""
+    with AuditSink(AuditConfig(directory=str(directory), background=background)) as audit:
+        for event in events:
+            audit.record(event)
+
+
+def rows(events: List[Dict[str, Any]], directory: Path) -> None:
+    """Write the events as one batch of parquet lineage rows."""
+    frame = pd.DataFrame(events).drop(columns="event")
+    with AuditSink(AuditConfig(directory=str(directory))) as audit:
+        audit.record_rows("spoof_corrections", frame)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    runs: Dict[str, Callable[[List[Dict[str, Any]], Path], None]] = {
+        "per_event": per_event,
+        "sink": sink,
+        "sink_background": lambda e, d: sink(e, d, background=True),
+        "record_rows": rows,
+    }
+    print(f"{'mode':<16}{'wall_s':>9}{'events/s':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, run in runs.items():
+            start = time.perf_counter()
+            run(events, Path(tmp) / name)
+            wall = time.perf_counter() - start
+            print(f"{name:<16}{wall:>9.3f}{len(events) / wall:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Throughput benchmark for algorithms.gap_fill.detect_gaps.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_gap_detection --rows 1000000 10000000 50000000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from algorithms.gap_fill import GapFillConfig, detect_gaps
+
+
+def make_ais_frame(rows: int, pings_per_vessel: int = 2_000, seed: int = 7) -> pd.DataFrame:
+    """Build a shuffled synthetic AIS frame with occasional long silences."""
+    rng = np.random.default_rng(seed)
+    vessel = np.arange(rows, dtype=np.int64) // pings_per_vessel
+    step_ms = rng.integers(10_000, 180_000, size=rows, dtype=np.int64)
+    silence = rng.random(rows) < 0.002
+    step_ms[silence] += rng.integers(15, 240, size=int(silence.sum()), dtype=np.int64) * 60_000
+    elapsed = np.cumsum(step_ms)
+    first_row = vessel * pings_per_vessel
+    ts = 1_719_792_000_000 + elapsed - elapsed[first_row] + step_ms[first_row]
+    shuffle = rng.permutation(rows)
+    return pd.DataFrame(
+        {
+            "mmsi": 200_000_000 + vessel[shuffle],
+            "ts_utc": ts[shuffle],
+            "lat": rng.uniform(-60.0, 60.0, size=rows),
+            "lon": rng.uniform(-180.0, 180.0, size=rows),
+        }
+    )
+
+
+def run(rows: int, repeats: int) -> None:
+    """Time detect_gaps on a frame of ``rows`` pings and print rows/sec."""
+    df = make_ais_frame(rows)
+    config = GapFillConfig(
+        gap_threshold_minutes=10,
+        candidate_radius_km=25.0,
+        viterbi_transition_penalty=0.15,
+        min_candidate_score=0.6,
+    )
+    best = float("inf")
+    gaps = pd.DataFrame()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        gaps = detect_gaps(df, config)
+        best = min(best, time.perf_counter() - start)
+    print(f"rows={rows:>12,d}  gaps={len(gaps):>10,d}  best={best:8.3f}s  rows/sec={rows / best:>14,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000, 50_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    for rows in args.rows:
+        run(rows, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark overlapped ingestion against serial loading with simulated latency.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ingest --vessels 300 --latency-s 1.0
+
+Local synthetic files stand in for S3 objects: each load sleeps
+``--latency-s`` before reading, and each prefetched batch sleeps
+``--batch-latency-s``, as a remote fetch would. The real AIS/RF cleaning
+functions do the processing, so the overlap measured is what
+``run_pipeline`` gets.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pandas as pd
+
+from benchmarks.synthetic import SyntheticConfig, write_dataset
+from ingest.ais_ingest import AISIngestor
+from ingest.rf_ingest import RFIngestor
+from ingest.scheduler import IngestConfig, IngestScheduler, prefetch
+from main_pipeline import _clean_ais, _clean_rf
+from preprocessing.rf_quality import RFQualityConfig
+from utils.io import DataSourceConfig
+
+
+def delayed(load: Callable[[], Any], latency_s: float) -> Callable[[], Any]:
+    """Wrap ``load`` so it waits ``latency_s`` first, like a remote download."""
+
+    def run() -> Any:
+        time.sleep(latency_s)
+        return load()
+
+    return run
+
+
+def delayed_batches(batches: Iterator[pd.DataFrame], latency_s: float) -> Iterator[pd.DataFrame]:
+    """Yield ``batches`` with ``latency_s`` of simulated fetch time before each."""
+    for batch in batches:
+        time.sleep(latency_s)
+        yield batch
+
+
+def bench_sources(data: dict, latency_s: float) -> None:
+    """Time serial versus concurrent load-and-clean of AIS and RF."""
+    ais = AISIngestor(DataSourceConfig(type="local", path=data["ais"]))
+    rf = RFIngestor(DataSourceConfig(type="local", path=data["rf"]))
+    tasks = {
+        "ais": (delayed(ais.load, latency_s), lambda df: _clean_ais(df, False)),
+        "rf": (delayed(rf.load, latency_s), lambda df: _clean_rf(df, False, RFQualityConfig())),
+    }
+    for concurrent in (False, True):
+        start = time.perf_counter()
+        IngestScheduler(IngestConfig(concurrent=concurrent)).run(tasks)
+        label = "concurrent" if concurrent else "serial"
+        print(f"sources  {label:<11} {time.perf_counter() - start:8.2f}s")
+
+
+def bench_batches(data: dict, batch_size: int, latency_s: float) -> None:
+    """Time batched AIS cleaning with and without prefetching the next batch."""
+    ais = AISIngestor(DataSourceConfig(type="local", path=data["ais"]))
+    for depth in (0, 1):
+        start = time.perf_counter()
+        rows = 0
+        for batch in prefetch(delayed_batches(ais.iter_batches(batch_size), latency_s), depth):
+            rows += len(_clean_ais(batch, False))
+        print(f"batches  prefetch={depth:<2} {time.perf_counter() - start:8.2f}s  ({rows:,d} rows)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vessels", type=int, default=300)
+    parser.add_argument("--days", type=float, default=1.0)
+    parser.add_argument("--latency-s", type=float, default=1.0)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--batch-latency-s", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = write_dataset(SyntheticConfig(vessels=args.vessels, days=args.days), Path(tmp))
+        bench_sources(data, args.latency_s)
+        bench_batches(data, args.batch_size, args.batch_latency_s)
+
+
+if __name__ == "__main__":
+    main()
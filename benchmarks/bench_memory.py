@@ -0,0 +1,112 @@
+"""Peak memory and column copies of run_pipeline per dtype backend.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory --vessels 300 --days 1
+    python -m benchmarks.bench_memory --vessels 300 --max-ratio 2.0
+
+Each backend (``numpy`` and Arrow-backed ``pyarrow``) runs the pipeline in a
+fresh interpreter so peak RSS is not inflated by the previous run. For every
+stage the report shows peak RSS above the interpreter's footprint after
+imports, as a multiple of the inputs' in-memory Arrow size, and the column
+copies counted by ``utils.arrow.COPY_COUNTER``. With ``--max-ratio`` the run
+exits non-zero when a pyarrow stage exceeds that multiple or any pyarrow
+stage copies a column.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+import pyarrow.parquet as pq
+import yaml
+
+from benchmarks.bench_pipeline import REPO_ROOT, pipeline_config
+from benchmarks.synthetic import SyntheticConfig, write_dataset
+
+BACKENDS = ("numpy", "pyarrow")
+
+
+def run_child(config_path: str) -> None:
+    """Run the pipeline in this process and print the RSS after imports and its stage metrics."""
+    from main_pipeline import run_pipeline
+    from utils.profiling import _peak_rss_mb, _reset_peak_rss
+
+    _reset_peak_rss()
+    import_rss_mb = _peak_rss_mb()
+    artifacts = run_pipeline(config_path, use_cache=False)
+    report = json.loads(Path(artifacts["stage_metrics_path"]).read_text())
+    print(json.dumps({"import_rss_mb": import_rss_mb, "stages": report["stages"]}))
+
+
+def run_backend(data: Dict[str, str], workdir: Path, backend: str) -> Dict[str, Any]:
+    """Run the pipeline with ``backend`` in a subprocess; return its parsed child report."""
+    config = pipeline_config(data, workdir)
+    config.get("pipeline", config).setdefault("preprocessing", {})["dtype_backend"] = backend
+    config_path = workdir / "config.yaml"
+    workdir.mkdir(parents=True, exist_ok=True)
+    config_path.write_text(yaml.safe_dump(config))
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_memory", "--child", str(config_path)],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_report(backend: str, report: Dict[str, Any], input_mb: float) -> None:
+    """Print per-stage peak RSS, its multiple of the input size and copies for one backend."""
+    base = report["import_rss_mb"] or 0.0
+    print(f"\n[{backend}] interpreter after imports: {base:.0f} MB")
+    print(f"{'stage':<14}{'peak_rss_mb':>13}{'x input':>9}{'copies':>8}{'copy_mb':>9}")
+    for stage in report["stages"]:
+        peak = stage["peak_rss_mb"] or 0.0
+        print(
+            f"{stage['stage']:<14}{peak:>13.1f}{(peak - base) / input_mb:>9.2f}"
+            f"{stage['column_copies']:>8d}{stage['copied_mb']:>9.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vessels", type=int, default=300)
+    parser.add_argument("--days", type=float, default=1.0)
+    parser.add_argument("--max-ratio", type=float, help="Fail when a pyarrow stage exceeds this multiple of input")
+    parser.add_argument("--workdir", type=Path, help="Keep generated data and outputs here")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.workdir or Path(tmp)
+        data = write_dataset(SyntheticConfig(vessels=args.vessels, days=args.days), root / "data")
+        input_mb = sum(pq.read_table(data[name]).nbytes for name in ("ais", "rf")) / 1024**2
+        print(f"Input: {input_mb:.0f} MB as Arrow")
+        reports = {backend: run_backend(data, root / backend, backend) for backend in BACKENDS}
+    for backend, report in reports.items():
+        print_report(backend, report, input_mb)
+
+    if args.max_ratio is None:
+        return
+    base = reports["pyarrow"]["import_rss_mb"] or 0.0
+    failures = [
+        stage["stage"]
+        for stage in reports["pyarrow"]["stages"]
+        if ((stage["peak_rss_mb"] or 0.0) - base) / input_mb > args.max_ratio or stage["column_copies"]
+    ]
+    if failures:
+        print(f"\npyarrow stages above {args.max_ratio}x input or copying columns: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Scale benchmark for run_pipeline on synthetic data, with regression checks.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --scales small medium
+    python -m benchmarks.bench_pipeline --scales small medium --update-baseline
+
+Each scale generates a synthetic AIS/RF day, runs the full pipeline without
+checkpoints and reports per-stage throughput (input rows/sec) and peak RSS
+from the pipeline's own stage metrics. The run exits non-zero when a stage is
+slower, or uses more memory, than ``benchmarks/baseline.json`` allows.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+from benchmarks.synthetic import SyntheticConfig, write_dataset
+from main_pipeline import run_pipeline
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+SCALES: Dict[str, SyntheticConfig] = {
+    "small": SyntheticConfig(vessels=50, days=0.5),
+    "medium": SyntheticConfig(vessels=300, days=1.0),
+    "large": SyntheticConfig(vessels=2_000, days=1.0),
+}
+
+
+def pipeline_config(data: Dict[str, str], workdir: Path) -> Dict[str, Any]:
+    """Return ``config.yaml`` pointed at the synthetic files, writing under ``workdir``."""
+    with open(REPO_ROOT / "config.yaml", "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    pipeline = config.get("pipeline", config)
+    pipeline["ais_source"] = {"type": "local", "path": data["ais"], "format": "parquet"}
+    pipeline["rf_source"] = {"type": "local", "path": data["rf"], "format": "parquet"}
+    pipeline["parallel"] = {"workers": 1, "shards": 0}
+    pipeline["output"]["directory"] = str(workdir / "output")
+    pipeline["audit"]["directory"] = str(workdir / "audit")
+    pipeline["profiling"] = {"directory": str(workdir / "profiles")}
+    pipeline.pop("checkpoint", None)
+    return config
+
+
+def run_scale(name: str, synthetic: SyntheticConfig, workdir: Path) -> Dict[str, Any]:
+    """Generate data for one scale, run the pipeline and collect its stage metrics."""
+    data = write_dataset(synthetic, workdir / "data")
+    config_path = workdir / "config.yaml"
+    config_path.write_text(yaml.safe_dump(pipeline_config(data, workdir)))
+
+    start = time.perf_counter()
+    artifacts = run_pipeline(config_path, use_cache=False)
+    wall_s = time.perf_counter() - start
+    report = json.loads(Path(artifacts["stage_metrics_path"]).read_text())
+
+    stages = {}
+    for stage in report["stages"]:
+        rows = stage["rows_in"] or 0
+        stages[stage["stage"]] = {
+            "rows_in": rows,
+            "wall_s": stage["wall_s"],
+            "rows_per_s": rows / stage["wall_s"] if stage["wall_s"] > 0 else None,
+            "peak_rss_mb": stage["peak_rss_mb"],
+        }
+    input_rows = stages["preprocess"]["rows_in"]
+    stages["pipeline"] = {
+        "rows_in": input_rows,
+        "wall_s": wall_s,
+        "rows_per_s": input_rows / wall_s,
+        "peak_rss_mb": max(s["peak_rss_mb"] or 0.0 for s in stages.values()),
+    }
+    return {"scale": name, "stages": stages}
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    min_wall_s: float,
+) -> List[str]:
+    """Return a description of every stage that regressed beyond ``tolerance``.
+
+    Throughput is only checked for stages taking at least ``min_wall_s``,
+    below which timer noise dominates.
+    """
+    regressions = []
+    for result in results:
+        expected = baseline.get(result["scale"], {})
+        for stage, current in result["stages"].items():
+            reference = expected.get(stage)
+            if reference is None:
+                continue
+            label = f"{result['scale']}/{stage}"
+            if (
+                current["wall_s"] >= min_wall_s
+                and reference.get("rows_per_s")
+                and current["rows_per_s"] < reference["rows_per_s"] * (1 - tolerance)
+            ):
+                regressions.append(
+                    f"{label}: {current['rows_per_s']:,.0f} rows/s < baseline {reference['rows_per_s']:,.0f}"
+                )
+            if reference.get("peak_rss_mb") and current["peak_rss_mb"] > reference["peak_rss_mb"] * (1 + tolerance):
+                regressions.append(
+                    f"{label}: peak RSS {current['peak_rss_mb']:.0f} MB > baseline {reference['peak_rss_mb']:.0f} MB"
+                )
+    return regressions
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    """Print one scale's stage throughput and memory."""
+    print(f"\n[{result['scale']}]")
+    print(f"{'stage':<14}{'rows_in':>12}{'wall_s':>10}{'rows/sec':>14}{'peak_rss_mb':>13}")
+    for stage, m in result["stages"].items():
+        rate = f"{m['rows_per_s']:,.0f}" if m["rows_per_s"] else "-"
+        print(f"{stage:<14}{m['rows_in']:>12,d}{m['wall_s']:>10.3f}{rate:>14}{m['peak_rss_mb'] or 0:>13.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=["small", "medium"], choices=sorted(SCALES))
+    parser.add_argument("--seed", type=int, default=SyntheticConfig.seed)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed fractional regression")
+    parser.add_argument("--min-wall-s", type=float, default=0.05)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--workdir", type=Path, help="Keep generated data and outputs here")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.workdir or Path(tmp)
+        for name in args.scales:
+            result = run_scale(name, replace(SCALES[name], seed=args.seed), root / name)
+            print_report(result)
+            results.append(result)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.update_baseline:
+        for result in results:
+            baseline[result["scale"]] = result["stages"]
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\nUpdated baseline {args.baseline}")
+        return
+    regressions = compare(results, baseline, args.tolerance, args.min_wall_s)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Worker memory with pickled RF frames versus the shared memory-mapped RF index.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rf_store --vessels 1000 --workers 2 8
+
+For each worker count, every worker either unpickles its own copy of the
+indexed RF frame and arrays, or attaches to one store written by
+``save_spatiotemporal_index``, then touches every column the way a shard
+scan would. Reported is the summed growth of the workers' unique set size
+(USS, pages no other process maps) from ``/proc/self/smaps_rollup``, so the
+pickled case grows with the worker count while store pages, held once in the
+page cache, are not counted per worker. Linux only.
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import SyntheticConfig, write_dataset
+from entity_resolution.spatiotemporal_index import (
+    SpatiotemporalIndex,
+    build_spatiotemporal_index,
+    open_spatiotemporal_index,
+    save_spatiotemporal_index,
+)
+from main_pipeline import _clean_rf
+from preprocessing.rf_quality import RFQualityConfig
+from utils.arrow import numeric_view
+
+INDEXING = {"type": "geohash", "resolution": 4, "time_bucket_minutes": 5}
+
+
+def _uss_mb() -> float:
+    """Return this process's unique set size (private clean + dirty pages) in MB."""
+    with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+        kb = sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean:", "Private_Dirty:")))
+    return kb / 1024
+
+
+def _touch(index: SpatiotemporalIndex) -> float:
+    """Read every indexed value once, as a full shard scan would."""
+    total = float(np.sum(index.order)) + float(np.sum(index.offsets))
+    for column in ("est_lat", "est_lon"):
+        total += float(np.sum(numeric_view(index.df[column])))
+    return total + float(np.sum(numeric_view(index.df["ts_utc"], np.int64)))
+
+
+def _worker(kind: str, inbox: Any, outbox: Any, barrier: Any) -> None:
+    """Receive the index (or its store path), scan it and report USS growth while all workers hold it."""
+    before = _uss_mb()
+    payload = inbox.get()
+    index = payload if kind == "pickled" else open_spatiotemporal_index(payload)
+    _touch(index)
+    barrier.wait()
+    outbox.put(_uss_mb() - before)
+    barrier.wait()
+
+
+def measure(workers: int, kind: str, payload: Any) -> float:
+    """Return the summed USS growth in MB of ``workers`` processes sharing (or copying) ``payload``."""
+    ctx = mp.get_context("fork")
+    inbox, outbox, barrier = ctx.Queue(), ctx.Queue(), ctx.Barrier(workers)
+    processes = [ctx.Process(target=_worker, args=(kind, inbox, outbox, barrier)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        inbox.put(payload)  # pickled through a pipe, as a process pool task would be
+    growth = sum(outbox.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return growth
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vessels", type=int, default=1_000)
+    parser.add_argument("--days", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = write_dataset(SyntheticConfig(vessels=args.vessels, days=args.days), Path(tmp) / "data")
+        rf_df, _ = _clean_rf(pd.read_parquet(data["rf"]), False, RFQualityConfig())
+        index = build_spatiotemporal_index(rf_df, INDEXING)
+        store = str(save_spatiotemporal_index(index, Path(tmp) / "store"))
+        store_mb = sum(path.stat().st_size for path in Path(store).iterdir()) / 1024**2
+        print(f"RF index: {len(index):,d} rows, store {store_mb:.0f} MB on disk (shared once)")
+        print(f"{'workers':>8}{'pickled_mb':>12}{'store_mb':>10}")
+        for workers in args.workers:
+            pickled = measure(workers, "pickled", index)
+            shared = measure(workers, "store", store)
+            print(f"{workers:>8d}{pickled:>12.1f}{shared:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
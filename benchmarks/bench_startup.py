@@ -0,0 +1,79 @@
+"""CLI startup time for config validation and plan dry-runs.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --repeats 5
+    python -m benchmarks.bench_startup --max-s 1.0
+
+Each command runs in a fresh interpreter ``--repeats`` times and the fastest
+wall time is reported, which is what an Airflow task or Batch job pays before
+doing any work. ``import pipeline modules`` is the cost ``run`` adds once it
+starts (pandas, pyarrow, h3, fsspec), for reference. With ``--max-s`` the run
+exits non-zero when ``validate`` or ``plan`` is slower than that.
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.bench_pipeline import REPO_ROOT
+
+PIPELINE_MODULES = (
+    "algorithms.sharding",
+    "entity_resolution.resolver",
+    "ingest.ais_ingest",
+    "ingest.rf_ingest",
+    "output.writer",
+    "schemas.output",
+    "utils.checkpoint",
+)
+GATED = ("validate", "plan")
+
+
+def commands(config: Path) -> Dict[str, List[str]]:
+    """Return the timed command lines by name."""
+    return {
+        "interpreter": [sys.executable, "-c", "pass"],
+        "import main_pipeline": [sys.executable, "-c", "import main_pipeline"],
+        "validate": [sys.executable, "main_pipeline.py", "validate", "--config", str(config)],
+        "plan": [sys.executable, "main_pipeline.py", "plan", "--config", str(config)],
+        "import pipeline modules": [sys.executable, "-c", f"import {', '.join(PIPELINE_MODULES)}"],
+    }
+
+
+def best_wall_s(command: List[str], repeats: int) -> float:
+    """Return the fastest of ``repeats`` wall times of ``command``."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", type=Path, default=REPO_ROOT / "config.yaml")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-s", type=float, help="Fail when validate or plan takes longer than this")
+    args = parser.parse_args()
+
+    results = {name: best_wall_s(command, args.repeats) for name, command in commands(args.config).items()}
+    print(f"{'command':<26}{'wall_s':>8}")
+    for name, wall in results.items():
+        print(f"{name:<26}{wall:>8.2f}")
+
+    if args.max_s is None:
+        return
+    slow = [name for name in GATED if results[name] > args.max_s]
+    if slow:
+        print(f"\nSlower than {args.max_s:.2f}s: {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
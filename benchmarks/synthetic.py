@@ -0,0 +1,263 @@
+"""Synthetic AIS tracks and matching RF detections for benchmarks and local runs.
+
+Run from the repository root to write a dataset:
+
+    python -m benchmarks.synthetic --vessels 500 --days 1 --out ./synthetic
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from algorithms.gap_fill import KNOTS_TO_KMH
+from utils.geo import EARTH_RADIUS_KM
+
+NAV_STATUSES = np.array(["under_way_using_engine", "at_anchor", "moored", "engaged_in_fishing"])
+SOURCE_SYSTEMS = np.array(["terrestrial", "satellite"])
+FREQ_BANDS = np.array(["VHF", "UHF", "L", "S", "X"])
+GEOLOC_METHODS = np.array(["TDOA", "FDOA", "AOA"])
+KM_PER_DEG_LAT = np.pi * EARTH_RADIUS_KM / 180.0
+
+
+@dataclass
+class SyntheticConfig:
+    """Scale and realism knobs for a synthetic AIS/RF dataset."""
+
+    vessels: int = 100
+    days: float = 1.0
+    ping_interval_s: float = 30.0
+    gap_rate: float = 0.0005  # probability per ping that an AIS silence starts
+    gap_minutes: Tuple[float, float] = (15.0, 180.0)
+    spoof_rate: float = 0.0002  # probability per ping that a spoofing episode starts
+    spoof_minutes: Tuple[float, float] = (10.0, 60.0)
+    spoof_offset_km: Tuple[float, float] = (20.0, 80.0)
+    rf_rate: float = 0.05  # probability per true position that an emission is geolocated
+    rf_cluster_size: Tuple[int, int] = (1, 3)  # detections per emission (TDOA sensor pairs)
+    uncertainty_median_m: float = 1_500.0
+    uncertainty_sigma: float = 0.8  # lognormal shape of geo_uncertainty_m
+    speed_knots: Tuple[float, float] = (4.0, 20.0)
+    bbox: Tuple[float, float, float, float] = (-10.0, 45.0, 10.0, 60.0)  # min_lon, min_lat, max_lon, max_lat
+    start: str = "2025-07-01T00:00:00Z"
+    seed: int = 42
+
+
+def generate_tracks(config: SyntheticConfig) -> pd.DataFrame:
+    """Simulate true vessel positions at the ping cadence, before gaps and spoofing.
+
+    Each vessel holds a speed and follows a heading random walk from a random
+    start inside ``bbox``; positions use an equirectangular step, which is
+    accurate at ping-interval distances.
+    """
+    rng = np.random.default_rng(config.seed)
+    n_pings = max(2, int(config.days * 86_400 / config.ping_interval_s))
+    n_vessels = config.vessels
+    min_lon, min_lat, max_lon, max_lat = config.bbox
+
+    start_ms = int(pd.Timestamp(config.start).value // 1_000_000)
+    offsets = rng.uniform(0, config.ping_interval_s * 1_000, size=(n_vessels, 1))
+    jitter = rng.normal(0, config.ping_interval_s * 50, size=(n_vessels, n_pings))
+    ts = start_ms + offsets + np.arange(n_pings) * config.ping_interval_s * 1_000 + jitter
+    ts = np.maximum.accumulate(ts.astype(np.int64), axis=1)
+
+    speed = rng.uniform(*config.speed_knots, size=(n_vessels, 1))
+    heading = rng.uniform(0, 2 * np.pi, size=(n_vessels, 1)) + np.cumsum(
+        rng.normal(0, 0.05, size=(n_vessels, n_pings)), axis=1
+    )
+    dt_h = np.diff(ts, axis=1, prepend=ts[:, :1]) / 3_600_000
+    step_km = speed * KNOTS_TO_KMH * dt_h
+    lat0 = rng.uniform(min_lat, max_lat, size=(n_vessels, 1))
+    lon0 = rng.uniform(min_lon, max_lon, size=(n_vessels, 1))
+    lat = lat0 + np.cumsum(step_km * np.cos(heading), axis=1) / KM_PER_DEG_LAT
+    lat = np.clip(lat, -89.9, 89.9)
+    lon_scale = KM_PER_DEG_LAT * np.cos(np.radians(lat))
+    lon = lon0 + np.cumsum(step_km * np.sin(heading) / lon_scale, axis=1)
+    lon = (lon + 180.0) % 360.0 - 180.0
+
+    mmsi = 200_000_000 + rng.choice(700_000_000, size=n_vessels, replace=False)
+    cog = np.degrees(heading) % 360.0
+    return pd.DataFrame(
+        {
+            "mmsi": np.repeat(mmsi, n_pings).astype(np.int64),
+            "ts_utc": ts.ravel(),
+            "lat": lat.ravel(),
+            "lon": lon.ravel(),
+            "sog": (speed + rng.normal(0, 0.3, size=(n_vessels, n_pings))).clip(0).ravel(),
+            "cog": cog.ravel(),
+        }
+    )
+
+
+def generate_ais(config: SyntheticConfig, tracks: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Derive AIS messages from ``tracks`` by dropping silences and displacing spoofed pings.
+
+    Returns:
+        Tuple of AIS records matching ``AISRecord`` (plus ``imo`` and
+        ``call_sign``) and a ground-truth frame with the true position and a
+        ``spoofed`` flag for every retained ping.
+    """
+    rng = np.random.default_rng(config.seed + 1)
+    n_vessels = config.vessels
+    n_pings = len(tracks) // n_vessels
+    per_ping_ms = config.ping_interval_s * 1_000
+
+    silent = _episodes(rng, n_vessels, n_pings, config.gap_rate, config.gap_minutes, per_ping_ms)
+    spoofed = _episodes(rng, n_vessels, n_pings, config.spoof_rate, config.spoof_minutes, per_ping_ms)
+    lat = tracks["lat"].to_numpy().reshape(n_vessels, n_pings).copy()
+    lon = tracks["lon"].to_numpy().reshape(n_vessels, n_pings).copy()
+    if spoofed.any():
+        # One displacement per vessel keeps each episode a coherent jump.
+        distance = rng.uniform(*config.spoof_offset_km, size=(n_vessels, 1))
+        bearing = rng.uniform(0, 2 * np.pi, size=(n_vessels, 1))
+        d_lat = distance * np.cos(bearing) / KM_PER_DEG_LAT
+        d_lon = distance * np.sin(bearing) / (KM_PER_DEG_LAT * np.cos(np.radians(lat)))
+        lat = np.where(spoofed, np.clip(lat + d_lat, -90.0, 90.0), lat)
+        lon = np.where(spoofed, (lon + d_lon + 180.0) % 360.0 - 180.0, lon)
+
+    keep = ~silent.ravel()
+    vessel = np.repeat(np.arange(n_vessels), n_pings)[keep]
+    sog = tracks["sog"].to_numpy()[keep]
+    nav_status = np.where(sog < 0.5, NAV_STATUSES[1], NAV_STATUSES[rng.choice([0, 3], size=n_vessels)[vessel]])
+    ais = pd.DataFrame(
+        {
+            "mmsi": tracks["mmsi"].to_numpy()[keep],
+            "ts_utc": tracks["ts_utc"].to_numpy()[keep],
+            "lat": lat.ravel()[keep],
+            "lon": lon.ravel()[keep],
+            "sog": sog,
+            "cog": tracks["cog"].to_numpy()[keep],
+            "nav_status": nav_status,
+            "position_accuracy": (rng.random(keep.sum()) < 0.8).astype(np.int64),
+            "source_system": SOURCE_SYSTEMS[(rng.random(keep.sum()) < 0.3).astype(np.int64)],
+            "imo": (9_000_000 + np.arange(n_vessels, dtype=np.int64))[vessel],
+            "call_sign": np.array([f"SYN{i:05d}" for i in range(n_vessels)])[vessel],
+        }
+    )
+    truth = pd.DataFrame(
+        {
+            "mmsi": ais["mmsi"].to_numpy(),
+            "ts_utc": ais["ts_utc"].to_numpy(),
+            "true_lat": tracks["lat"].to_numpy()[keep],
+            "true_lon": tracks["lon"].to_numpy()[keep],
+            "spoofed": spoofed.ravel()[keep],
+        }
+    )
+    return ais, truth
+
+
+def generate_rf(config: SyntheticConfig, tracks: pd.DataFrame) -> pd.DataFrame:
+    """Sample RF geolocations of the true tracks, including during AIS silences.
+
+    Each emission yields ``rf_cluster_size`` detections sharing a
+    ``tdoa_cluster_id``, displaced by Gaussian noise whose standard deviation
+    is the detection's lognormally distributed ``geo_uncertainty_m``.
+    """
+    rng = np.random.default_rng(config.seed + 2)
+    emitted = np.flatnonzero(rng.random(len(tracks)) < config.rf_rate)
+    low, high = config.rf_cluster_size
+    cluster_size = rng.integers(low, high + 1, size=len(emitted))
+    source = np.repeat(emitted, cluster_size)
+    cluster = np.repeat(np.arange(len(emitted)), cluster_size)
+    n = len(source)
+
+    uncertainty_m = config.uncertainty_median_m * np.exp(rng.normal(0, config.uncertainty_sigma, size=n))
+    true_lat = tracks["lat"].to_numpy()[source]
+    true_lon = tracks["lon"].to_numpy()[source]
+    noise_km = rng.normal(0, 1, size=(2, n)) * uncertainty_m / 1_000
+    est_lat = np.clip(true_lat + noise_km[0] / KM_PER_DEG_LAT, -90.0, 90.0)
+    est_lon = true_lon + noise_km[1] / (KM_PER_DEG_LAT * np.cos(np.radians(true_lat)))
+    ts = tracks["ts_utc"].to_numpy()[source] + rng.normal(0, 2_000, size=n).astype(np.int64)
+    order = np.argsort(ts, kind="stable")
+    return pd.DataFrame(
+        {
+            "rf_id": np.char.add("rf-", np.arange(n).astype(str))[order],
+            "ts_utc": ts[order],
+            "est_lat": est_lat[order],
+            "est_lon": ((est_lon + 180.0) % 360.0 - 180.0)[order],
+            "freq_band": FREQ_BANDS[rng.integers(0, len(FREQ_BANDS), size=n)][order],
+            "rssi": rng.normal(-90, 8, size=n)[order],
+            "toa": ((ts % 1_000) / 1_000 + rng.normal(0, 1e-6, size=n))[order],
+            "tdoa_cluster_id": np.char.add("c-", cluster.astype(str))[order],
+            "geoloc_method": GEOLOC_METHODS[rng.integers(0, len(GEOLOC_METHODS), size=n)][order],
+            "geo_uncertainty_m": uncertainty_m[order],
+            "mmsi_truth": tracks["mmsi"].to_numpy()[source][order],
+        }
+    )
+
+
+def write_dataset(config: SyntheticConfig, directory: str | Path) -> Dict[str, str]:
+    """Generate a dataset and write ``ais.parquet``, ``rf.parquet`` and truth files.
+
+    Returns:
+        Paths of the written files keyed by ``ais``, ``rf``, ``ais_truth`` and ``rf_truth``.
+    """
+    target = Path(directory)
+    target.mkdir(parents=True, exist_ok=True)
+    tracks = generate_tracks(config)
+    ais, truth = generate_ais(config, tracks)
+    rf = generate_rf(config, tracks)
+    paths = {
+        "ais": target / "ais.parquet",
+        "rf": target / "rf.parquet",
+        "ais_truth": target / "ais_truth.parquet",
+        "rf_truth": target / "rf_truth.parquet",
+    }
+    ais.to_parquet(paths["ais"], index=False)
+    rf.drop(columns="mmsi_truth").to_parquet(paths["rf"], index=False)
+    truth.to_parquet(paths["ais_truth"], index=False)
+    rf[["rf_id", "mmsi_truth"]].to_parquet(paths["rf_truth"], index=False)
+    return {name: str(path) for name, path in paths.items()}
+
+
+def _episodes(
+    rng: np.random.Generator,
+    n_vessels: int,
+    n_pings: int,
+    rate: float,
+    minutes: Tuple[float, float],
+    per_ping_ms: float,
+) -> np.ndarray:
+    """Return a (vessels, pings) mask of episodes starting at ``rate`` per ping."""
+    starts = rng.random((n_vessels, n_pings)) < rate
+    row, col = np.nonzero(starts)
+    length = np.ceil(rng.uniform(*minutes, size=len(row)) * 60_000 / per_ping_ms).astype(np.int64)
+    delta = np.zeros((n_vessels, n_pings + 1), dtype=np.int32)
+    np.add.at(delta, (row, col), 1)
+    np.add.at(delta, (row, np.minimum(col + length, n_pings)), -1)
+    return np.cumsum(delta, axis=1)[:, :n_pings] > 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--vessels", type=int, default=SyntheticConfig.vessels)
+    parser.add_argument("--days", type=float, default=SyntheticConfig.days)
+    parser.add_argument("--ping-interval-s", type=float, default=SyntheticConfig.ping_interval_s)
+    parser.add_argument("--gap-rate", type=float, default=SyntheticConfig.gap_rate)
+    parser.add_argument("--spoof-rate", type=float, default=SyntheticConfig.spoof_rate)
+    parser.add_argument("--rf-rate", type=float, default=SyntheticConfig.rf_rate)
+    parser.add_argument("--uncertainty-median-m", type=float, default=SyntheticConfig.uncertainty_median_m)
+    parser.add_argument("--uncertainty-sigma", type=float, default=SyntheticConfig.uncertainty_sigma)
+    parser.add_argument("--seed", type=int, default=SyntheticConfig.seed)
+    args = parser.parse_args()
+    config = SyntheticConfig(
+        vessels=args.vessels,
+        days=args.days,
+        ping_interval_s=args.ping_interval_s,
+        gap_rate=args.gap_rate,
+        spoof_rate=args.spoof_rate,
+        rf_rate=args.rf_rate,
+        uncertainty_median_m=args.uncertainty_median_m,
+        uncertainty_sigma=args.uncertainty_sigma,
+        seed=args.seed,
+    )
+    for name, path in write_dataset(config, args.out).items():
+        print(f"{name:>10}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,341 @@
 """Entity resolution between AIS tracks and RF detections."""
 from __future__ import annotations
 
-from typing import Any, Dict
+import functools
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from algorithms.gap_fill import KNOTS_TO_KMH
+from schemas.components import EntityResolutionConfig
+from utils.arrow import numeric_view
+from utils.geo import EARTH_RADIUS_KM, haversine_km
 from utils.logging import get_logger
+from utils.time import epoch_ms_array
 
 
 logger = get_logger(__name__)
 
+KM_PER_DEG_LAT = np.pi * EARTH_RADIUS_KM / 180.0
+# Offset that keeps packed grid row/column indices non-negative.
+_CELL_OFFSET = 1 << 30
+
+LINK_COLUMNS = ["rf_id", "mmsi", "ts_utc", "method", "distance_km", "dt_ms", "confidence"]
+# Identifier confidences for links that do not rely on position (README §4).
+IDENTIFIER_CONFIDENCE = {"mmsi": 1.0, "imo": 0.95, "call_sign": 0.85}
+
+
+@dataclass
+class IdentifierMap:
+    """Hash indexes from IMO and call sign to MMSI."""
+
+    imo: pd.Index
+    imo_mmsi: np.ndarray
+    call_sign: pd.Index
+    call_sign_mmsi: np.ndarray
+
+    def lookup(self, kind: str, values: pd.Series) -> np.ndarray:
+        """Return the MMSI for each value (-1 where unknown)."""
+        index, mmsi = (self.imo, self.imo_mmsi) if kind == "imo" else (self.call_sign, self.call_sign_mmsi)
+        positions = index.get_indexer(_normalize_identifier(kind, values))
+        return np.where(positions >= 0, mmsi[positions], -1)
+
 
 def resolve_entities(
     ais_df: pd.DataFrame,
     rf_df: pd.DataFrame,
     config: Dict[str, Any],
 ) -> pd.DataFrame:
-    """Produce resolved entity links between AIS MMSI and RF detections."""
-    # TODO: Implement probabilistic matching using spatial-temporal constraints.
+    """Produce resolved entity links between AIS MMSI and RF detections.
+
+    RF detections carrying ``mmsi`` are linked directly; otherwise ``imo`` or
+    ``call_sign`` are looked up in the mapping table merged with the
+    identifiers seen in AIS. The rest are resolved spatio-temporally:
+    ``resolve_spatiotemporal`` sort-merges RF and AIS on time within each
+    coarse grid cell and gates candidates by RF uncertainty.
+
+    Args:
+        ais_df: AIS pings with ``mmsi``, ``ts_utc``, ``lat``, ``lon`` and
+            optionally ``sog``, ``imo``, ``call_sign``.
+        rf_df: RF detections with ``rf_id``, ``ts_utc``, ``est_lat``,
+            ``est_lon`` and optionally ``geo_uncertainty_m``, ``mmsi``,
+            ``imo``, ``call_sign``.
+        config: Indexing/entity resolution settings; see
+            ``EntityResolutionConfig``.
+
+    Returns:
+        Link table with ``LINK_COLUMNS``, one row per linked RF detection.
+    """
     logger.info("Resolving entities for %s AIS and %s RF records", len(ais_df), len(rf_df))
-    # TODO: Return a DataFrame with resolved identifiers and confidence scores.
-    return pd.DataFrame()
+    settings = EntityResolutionConfig.from_dict(config)
+    if rf_df.empty:
+        return _empty_links()
+
+    links: List[pd.DataFrame] = []
+    unresolved = np.ones(len(rf_df), dtype=bool)
+    identifiers = None
+    for kind in ("mmsi", "imo", "call_sign"):
+        if kind not in rf_df.columns or not unresolved.any():
+            continue
+        if kind == "mmsi":
+            mmsi = pd.to_numeric(rf_df["mmsi"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+        else:
+            identifiers = identifiers or load_identifier_map(settings.mapping_table, ais_df)
+            mmsi = identifiers.lookup(kind, rf_df[kind])
+        matched = unresolved & (mmsi > 0)
+        if matched.any():
+            links.append(_identifier_links(rf_df, matched, mmsi, kind))
+            unresolved &= ~matched
+
+    if unresolved.any() and not ais_df.empty:
+        remaining = rf_df if unresolved.all() else rf_df.loc[unresolved]
+        links.append(resolve_spatiotemporal(ais_df, remaining, settings))
+
+    result = pd.concat(links, ignore_index=True) if links else _empty_links()
+    logger.info(
+        "Linked %s of %s RF detections (%s by identifier)",
+        len(result),
+        len(rf_df),
+        int((result["method"] != "spatiotemporal").sum()),
+    )
+    return result
+
+
+def resolve_spatiotemporal(
+    ais_df: pd.DataFrame,
+    rf_df: pd.DataFrame,
+    config: EntityResolutionConfig,
+) -> pd.DataFrame:
+    """Link RF detections to the AIS vessel whose track best explains them.
+
+    Both inputs are sorted by time once. For each of the 3x3 grid cells
+    around a detection, ``pd.merge_asof`` finds the preceding and following
+    AIS ping in that cell within ``time_bucket_minutes``, so each detection
+    gets at most 18 candidates and cost grows linearly with input size.
+    Candidates are gated at ``gate_sigma`` standard deviations of the RF
+    uncertainty plus the distance the vessel can cover in the time offset.
+    A candidate's score is ``exp(-r**2 / 2 sigma**2) * exp(-|dt| / tolerance)``
+    with ``r`` the residual beyond that movement allowance; the confidence of
+    the best vessel is its score times its share of all candidate vessels'
+    scores, which penalizes ambiguous detections.
+
+    Cells are ``cell_km`` square, so vessels further than ``cell_km`` from a
+    detection are never considered; keep ``cell_km`` above the largest gate.
+    """
+    tolerance_ms = int(config.time_bucket_minutes * 60_000)
+    ais = pd.DataFrame(
+        {
+            "ts_utc": epoch_ms_array(ais_df["ts_utc"]),
+            "cell": _cell_keys(numeric_view(ais_df["lat"]), numeric_view(ais_df["lon"]), config.cell_km),
+            "ais_row": np.arange(len(ais_df), dtype=np.int64),
+        }
+    ).sort_values("ts_utc", kind="stable")
+    rf_lat = numeric_view(rf_df["est_lat"])
+    rf_lon = numeric_view(rf_df["est_lon"])
+    rf_ts = epoch_ms_array(rf_df["ts_utc"])
+    rf_order = np.argsort(rf_ts, kind="stable")
+
+    candidates = []
+    for neighbour_cells in _neighbour_cell_keys(rf_lat[rf_order], rf_lon[rf_order], config.cell_km):
+        left = pd.DataFrame({"ts_utc": rf_ts[rf_order], "cell": neighbour_cells, "rf_row": rf_order})
+        for direction in ("backward", "forward"):
+            matched = pd.merge_asof(
+                left,
+                ais,
+                on="ts_utc",
+                by="cell",
+                direction=direction,
+                tolerance=tolerance_ms,
+                allow_exact_matches=True,
+            )
+            found = matched["ais_row"].notna().to_numpy()
+            candidates.append(
+                np.stack([matched["rf_row"].to_numpy()[found], matched["ais_row"].to_numpy()[found].astype(np.int64)])
+            )
+    pairs = np.unique(np.concatenate(candidates, axis=1), axis=1) if candidates else np.empty((2, 0), np.int64)
+    rf_rows, ais_rows = pairs
+
+    ais_lat = numeric_view(ais_df["lat"])[ais_rows]
+    ais_lon = numeric_view(ais_df["lon"])[ais_rows]
+    distance_km = haversine_km(rf_lat[rf_rows], rf_lon[rf_rows], ais_lat, ais_lon)
+    dt_ms = rf_ts[rf_rows] - epoch_ms_array(ais_df["ts_utc"])[ais_rows]
+    sigma_km = _uncertainty_km(rf_df, config)[rf_rows]
+    speed_kn = _speed_knots(ais_df, config)[ais_rows]
+    allowance_km = speed_kn * KNOTS_TO_KMH * np.abs(dt_ms) / 3_600_000
+    residual_km = np.maximum(distance_km - allowance_km, 0.0)
+    gated = residual_km <= config.gate_sigma * sigma_km
+    score = np.exp(-0.5 * (residual_km / sigma_km) ** 2) * np.exp(-np.abs(dt_ms) / tolerance_ms)
+
+    scored = pd.DataFrame(
+        {
+            "rf_row": rf_rows[gated],
+            "mmsi": ais_df["mmsi"].to_numpy()[ais_rows[gated]],
+            "distance_km": distance_km[gated],
+            "dt_ms": dt_ms[gated],
+            "score": score[gated],
+        }
+    )
+    # Best ping per (detection, vessel), then the best vessel per detection.
+    scored = scored.sort_values(["rf_row", "mmsi", "score"], kind="stable")
+    per_vessel = scored.drop_duplicates(["rf_row", "mmsi"], keep="last")
+    total = per_vessel.groupby("rf_row", sort=False)["score"].transform("sum").to_numpy()
+    per_vessel = per_vessel.assign(confidence=per_vessel["score"].to_numpy() ** 2 / total)
+    best = per_vessel.sort_values(["rf_row", "confidence"], kind="stable").drop_duplicates("rf_row", keep="last")
+    best = best[best["confidence"] >= config.min_confidence]
+
+    rows = best["rf_row"].to_numpy()
+    logger.debug(
+        "Spatio-temporal resolution: %s candidates, %s gated, %s linked", len(rf_rows), int(gated.sum()), len(rows)
+    )
+    return pd.DataFrame(
+        {
+            "rf_id": rf_df["rf_id"].to_numpy()[rows],
+            "mmsi": best["mmsi"].to_numpy(dtype=np.int64),
+            "ts_utc": rf_ts[rows],
+            "method": "spatiotemporal",
+            "distance_km": best["distance_km"].to_numpy(),
+            "dt_ms": best["dt_ms"].to_numpy(dtype=np.int64),
+            "confidence": best["confidence"].to_numpy(),
+        }
+    ).sort_values("ts_utc", kind="stable", ignore_index=True)
+
+
+def load_identifier_map(path: Optional[str], ais_df: Optional[pd.DataFrame] = None) -> IdentifierMap:
+    """Return IMO/call sign -> MMSI hash indexes from the mapping table and AIS.
+
+    The persistent table (parquet or CSV with ``mmsi`` and ``imo`` and/or
+    ``call_sign``) is read once per process and file version; associations
+    observed in ``ais_df`` take precedence over it.
+    """
+    frames = []
+    if path:
+        frames.append(_read_mapping_table(path, os.stat(path).st_mtime_ns))
+    if ais_df is not None:
+        frames.append(ais_df[[c for c in ("mmsi", "imo", "call_sign") if c in ais_df.columns]])
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["mmsi"])
+    indexes = {}
+    for kind in ("imo", "call_sign"):
+        if kind in table.columns:
+            keys = pd.DataFrame({"key": _normalize_identifier(kind, table[kind]), "mmsi": table["mmsi"]}).dropna()
+            keys = keys.drop_duplicates("key", keep="last")
+            indexes[kind] = (pd.Index(keys["key"]), keys["mmsi"].to_numpy(dtype=np.int64))
+        else:
+            indexes[kind] = (pd.Index([]), np.empty(0, dtype=np.int64))
+    return IdentifierMap(*indexes["imo"], *indexes["call_sign"])
+
+
+@functools.lru_cache(maxsize=4)
+def _read_mapping_table(path: str, version: int) -> pd.DataFrame:
+    """Read the persistent vessel identifier table; cached per ``(path, version)``."""
+    logger.info("Loading vessel identifier mapping table from %s", path)
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_parquet(path)
+
+
+def _normalize_identifier(kind: str, values: pd.Series) -> pd.Series:
+    """Canonicalize identifiers: IMO as integer, call sign upper-cased without spaces."""
+    if kind == "imo":
+        return pd.to_numeric(values, errors="coerce").astype("Int64")
+    return values.astype("string").str.upper().str.replace(" ", "", regex=False)
+
+
+def _identifier_links(rf_df: pd.DataFrame, matched: np.ndarray, mmsi: np.ndarray, kind: str) -> pd.DataFrame:
+    """Build links for detections resolved by an identifier."""
+    count = int(matched.sum())
+    return pd.DataFrame(
+        {
+            "rf_id": rf_df["rf_id"].to_numpy()[matched],
+            "mmsi": mmsi[matched],
+            "ts_utc": epoch_ms_array(rf_df["ts_utc"])[matched],
+            "method": kind,
+            "distance_km": np.full(count, np.nan),
+            "dt_ms": np.zeros(count, dtype=np.int64),
+            "confidence": np.full(count, IDENTIFIER_CONFIDENCE[kind]),
+        }
+    )
+
+
+def _cell_rows(lat: np.ndarray, cell_km: float) -> np.ndarray:
+    """Return grid row indices; rows are ``cell_km`` tall."""
+    return np.floor(lat * KM_PER_DEG_LAT / cell_km).astype(np.int64)
+
+
+def _row_columns(rows: np.ndarray, cell_km: float) -> np.ndarray:
+    """Return the number of columns in each grid row.
+
+    Columns are at most ``cell_km`` wide at the row's centre latitude and
+    divide 360 degrees evenly, so column indices wrap at the antimeridian.
+    """
+    centre_lat = np.clip((rows + 0.5) * cell_km / KM_PER_DEG_LAT, -89.9, 89.9)
+    width_deg = cell_km / (KM_PER_DEG_LAT * np.cos(np.radians(centre_lat)))
+    return np.ceil(360.0 / width_deg).astype(np.int64)
+
+
+def _cell_cols(lon: np.ndarray, rows: np.ndarray, cell_km: float) -> np.ndarray:
+    """Return grid column indices of ``lon`` in each row."""
+    n_cols = _row_columns(rows, cell_km)
+    return np.floor((lon + 180.0) * n_cols / 360.0).astype(np.int64) % n_cols
+
+
+def _pack(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Pack grid row/column indices into one int64 key."""
+    return ((rows + _CELL_OFFSET) << 32) | (cols + _CELL_OFFSET)
+
+
+def _cell_keys(lat: np.ndarray, lon: np.ndarray, cell_km: float) -> np.ndarray:
+    """Return the grid cell key of each position."""
+    rows = _cell_rows(lat, cell_km)
+    return _pack(rows, _cell_cols(lon, rows, cell_km))
+
+
+def _neighbour_cell_keys(lat: np.ndarray, lon: np.ndarray, cell_km: float) -> List[np.ndarray]:
+    """Return the keys of the 3x3 cells around each position, one array per neighbour.
+
+    Column widths differ per row, so the neighbouring rows' columns are
+    computed from the position's longitude in those rows.
+    """
+    rows = _cell_rows(lat, cell_km)
+    keys = []
+    for d_row in (-1, 0, 1):
+        neighbour_rows = rows + d_row
+        cols = _cell_cols(lon, neighbour_rows, cell_km)
+        n_cols = _row_columns(neighbour_rows, cell_km)
+        for d_col in (-1, 0, 1):
+            keys.append(_pack(neighbour_rows, (cols + d_col) % n_cols))
+    return keys
+
+
+def _uncertainty_km(rf_df: pd.DataFrame, config: EntityResolutionConfig) -> np.ndarray:
+    """Return each detection's 1-sigma position uncertainty in km."""
+    if "geo_uncertainty_m" not in rf_df.columns:
+        return np.full(len(rf_df), config.default_uncertainty_m / 1_000)
+    values = numeric_view(pd.to_numeric(rf_df["geo_uncertainty_m"], errors="coerce"))
+    values = np.where(np.isfinite(values) & (values > 0), values, config.default_uncertainty_m)
+    return values / 1_000
+
+
+def _speed_knots(ais_df: pd.DataFrame, config: EntityResolutionConfig) -> np.ndarray:
+    """Return reported speed per ping, falling back to ``max_speed_knots`` when absent."""
+    if "sog" not in ais_df.columns:
+        return np.full(len(ais_df), config.max_speed_knots)
+    sog = numeric_view(pd.to_numeric(ais_df["sog"], errors="coerce"))
+    return np.where(np.isfinite(sog), np.clip(sog, 0.0, config.max_speed_knots), config.max_speed_knots)
+
+
+def _empty_links() -> pd.DataFrame:
+    """Return an empty link table with typed columns."""
+    return pd.DataFrame(
+        {
+            "rf_id": pd.Series(dtype=object),
+            "mmsi": pd.Series(dtype=np.int64),
+            "ts_utc": pd.Series(dtype=np.int64),
+            "method": pd.Series(dtype=object),
+            "distance_km": pd.Series(dtype=np.float64),
+            "dt_ms": pd.Series(dtype=np.int64),
+            "confidence": pd.Series(dtype=np.float64),
+        }
+    )
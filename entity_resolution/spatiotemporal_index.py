@@ -1,30 +1,517 @@
 """Spatiotemporal indexing utilities for AIS and RF fusion."""
 from __future__ import annotations
 
-from typing import Any, Dict
+import json
+import math
+import os
+import shutil
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
 
 try:
     import h3
+    import h3.api.basic_int as h3_int
 except ImportError:  # pragma: no cover - optional dependency
     h3 = None
+    h3_int = None
 
+from schemas.components import IndexingConfig
+from utils.arrow import numeric_view, table_to_pandas
+from utils.geo import haversine_km
 from utils.logging import get_logger
+from utils.ranges import chunk_bounds, expand_ranges
+from utils.time import epoch_ms_array
 
 
 logger = get_logger(__name__)
 
+KM_PER_DEGREE_LAT = 111.195
+MAX_PAIRS_PER_CHUNK = 2_000_000
 
-def build_spatiotemporal_index(df: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
-    """Add indexing keys (H3/geohash + temporal buckets) to the DataFrame."""
-    # TODO: Implement H3-based indexing or geohash fallback using config resolution.
+# Array fields of ``SpatiotemporalIndex`` stored as ``.npy`` files by ``save_spatiotemporal_index``.
+STORED_ARRAYS = ("lat", "lon", "ts", "cells", "buckets", "unique_cells", "keys", "offsets", "order")
+INDEX_STORE_VERSION = 1
+
+
+@dataclass
+class SpatiotemporalIndex:
+    """Sorted ``(cell, time_bucket)`` index with CSR offsets into a DataFrame.
+
+    Rows of ``df`` are grouped by composite key ``cell_rank * bucket_span +
+    (bucket - bucket_min)``. ``keys`` holds the sorted distinct composite keys,
+    and rows for ``keys[i]`` are ``order[offsets[i]:offsets[i + 1]]``.
+    """
+
+    df: pd.DataFrame
+    index_type: str
+    resolution: int
+    time_bucket_ms: int
+    lat: np.ndarray
+    lon: np.ndarray
+    ts: np.ndarray
+    cells: np.ndarray
+    buckets: np.ndarray
+    unique_cells: np.ndarray
+    bucket_min: int
+    bucket_span: int
+    keys: np.ndarray
+    offsets: np.ndarray
+    order: np.ndarray
+    _cell_centres: Optional[Tuple[np.ndarray, np.ndarray]] = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def lookup(self, cells: np.ndarray, buckets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(pair_idx, row_positions)`` for every row stored under each key pair."""
+        cells = np.asarray(cells, dtype=np.int64)
+        buckets = np.asarray(buckets, dtype=np.int64)
+        if len(self.keys) == 0 or len(cells) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        rank = np.searchsorted(self.unique_cells, cells)
+        rank_clipped = np.minimum(rank, len(self.unique_cells) - 1)
+        bucket_offset = buckets - self.bucket_min
+        valid = (
+            (self.unique_cells[rank_clipped] == cells)
+            & (bucket_offset >= 0)
+            & (bucket_offset < self.bucket_span)
+        )
+        pair_idx = np.flatnonzero(valid)
+        composite = rank_clipped[pair_idx] * self.bucket_span + bucket_offset[pair_idx]
+        pos = np.minimum(np.searchsorted(self.keys, composite), len(self.keys) - 1)
+        hit = self.keys[pos] == composite
+        pair_idx = pair_idx[hit]
+        pos = pos[hit]
+        starts = self.offsets[pos]
+        counts = self.offsets[pos + 1] - starts
+        owners = np.repeat(pair_idx, counts)
+        return owners, self.order[expand_ranges(starts, counts)]
+
+    def cells_for(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Return the cell id of each coordinate using this index's scheme."""
+        if self.index_type == "h3":
+            return _h3_cells(lat, lon, self.resolution)
+        return _geohash_cells(lat, lon, self.resolution)
+
+    def covering_cells(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Return cell ids that together cover a circle around a point.
+
+        When the ring would enumerate more cells than the index holds, the
+        occupied cells are filtered by centre distance instead.
+        """
+        if self.index_type == "h3":
+            if _h3_disk_size(radius_km, self.resolution) <= len(self.unique_cells):
+                return _h3_disk(lat, lon, radius_km, self.resolution)
+            margin_km = _h3_edge_km(self.resolution)
+        else:
+            if _geohash_disk_size(lat, radius_km, self.resolution) <= len(self.unique_cells):
+                return _geohash_disk(lat, lon, radius_km, self.resolution)
+            margin_km = _geohash_half_diagonal_km(self.resolution)
+        centre_lat, centre_lon = self._centres()
+        near = haversine_km(lat, lon, centre_lat, centre_lon) <= radius_km + margin_km
+        return self.unique_cells[near]
+
+    def _centres(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (and cache) the centre coordinates of every occupied cell."""
+        if self._cell_centres is None:
+            if self.index_type == "h3":
+                self._cell_centres = _h3_centres(self.unique_cells)
+            else:
+                self._cell_centres = _geohash_centres(self.unique_cells, self.resolution)
+        return self._cell_centres
+
+
+def build_spatiotemporal_index(df: pd.DataFrame, config: Dict[str, Any]) -> SpatiotemporalIndex:
+    """Index rows by H3/geohash cell and temporal bucket.
+
+    Args:
+        df: RF detections (``est_lat``/``est_lon``) or AIS pings (``lat``/``lon``)
+            with ``ts_utc`` in epoch ms.
+        config: ``indexing`` block with ``type`` (``h3`` or ``geohash``),
+            ``resolution`` and ``time_bucket_minutes``.
+
+    Returns:
+        SpatiotemporalIndex over ``df``. Falls back to geohash cells when ``h3``
+        is not installed.
+    """
     logger.debug("Building spatiotemporal index with config: %s", config)
-    return df
+    indexing = IndexingConfig.from_dict(config)
+    index_type = indexing.type
+    if index_type == "h3" and h3 is None:
+        logger.warning("h3 is not installed; falling back to geohash indexing")
+        index_type = "geohash"
+    resolution = indexing.resolution
+    time_bucket_ms = int(indexing.time_bucket_minutes * 60_000)
+
+    lat_col, lon_col = _coordinate_columns(df)
+    lat = np.ascontiguousarray(numeric_view(df[lat_col]))
+    lon = np.ascontiguousarray(numeric_view(df[lon_col]))
+    ts = epoch_ms_array(df["ts_utc"]) if len(df) else np.empty(0, dtype=np.int64)
+
+    cells = _h3_cells(lat, lon, resolution) if index_type == "h3" else _geohash_cells(lat, lon, resolution)
+    buckets = ts // time_bucket_ms
+    unique_cells, cell_rank = np.unique(cells, return_inverse=True)
+    bucket_min = int(buckets.min()) if len(buckets) else 0
+    bucket_span = int(buckets.max()) - bucket_min + 1 if len(buckets) else 1
+    composite = cell_rank.astype(np.int64) * bucket_span + (buckets - bucket_min)
+    order = np.argsort(composite, kind="stable")
+    keys, counts = np.unique(composite[order], return_counts=True)
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    logger.info(
+        "Indexed %s rows into %s %s cells and %s (cell, bucket) keys",
+        len(df),
+        len(unique_cells),
+        index_type,
+        len(keys),
+    )
+    return SpatiotemporalIndex(
+        df=df,
+        index_type=index_type,
+        resolution=resolution,
+        time_bucket_ms=time_bucket_ms,
+        lat=lat,
+        lon=lon,
+        ts=ts,
+        cells=cells,
+        buckets=buckets,
+        unique_cells=unique_cells,
+        bucket_min=bucket_min,
+        bucket_span=bucket_span,
+        keys=keys,
+        offsets=offsets,
+        order=order,
+    )
+
 
+def save_spatiotemporal_index(index: SpatiotemporalIndex, directory: str | Path) -> Path:
+    """Persist ``index`` as a file set that other processes can memory-map.
 
-def query_index(indexed_df: pd.DataFrame, query_params: Dict[str, Any]) -> pd.DataFrame:
-    """Filter DataFrame using precomputed spatial and temporal indices."""
-    # TODO: Implement bounding box and time-window filtering for candidates.
+    The indexed frame is written as uncompressed Arrow IPC (``rows.arrow``),
+    each array, including the CSR ``keys``/``offsets``/``order``, as a
+    ``.npy`` file and the scalar fields as ``index.json``. Files are written
+    to a temporary directory and renamed into place, so a reader never sees
+    a partial store.
+
+    Returns:
+        The store directory, to pass to ``open_spatiotemporal_index``.
+    """
+    target = Path(directory)
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    tmp.mkdir(parents=True)
+    try:
+        table = pa.Table.from_pandas(index.df, preserve_index=False)
+        # One record batch: readers can then map each column as a single contiguous buffer.
+        feather.write_feather(
+            table, tmp / "rows.arrow", compression="uncompressed", chunksize=max(table.num_rows, 1)
+        )
+        for name in STORED_ARRAYS:
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(index, name)))
+        meta = {
+            "version": INDEX_STORE_VERSION,
+            "rows": len(index),
+            "index_type": index.index_type,
+            "resolution": index.resolution,
+            "time_bucket_ms": index.time_bucket_ms,
+            "bucket_min": index.bucket_min,
+            "bucket_span": index.bucket_span,
+        }
+        (tmp / "index.json").write_text(json.dumps(meta))
+        shutil.rmtree(target, ignore_errors=True)
+        os.rename(tmp, target)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    logger.info("Stored spatiotemporal index of %s rows in %s", len(index), target)
+    return target
+
+
+def open_spatiotemporal_index(directory: str | Path) -> SpatiotemporalIndex:
+    """Attach to an index written by ``save_spatiotemporal_index`` without reading it into memory.
+
+    Arrays are read-only ``np.memmap`` views and the frame's columns wrap the
+    memory-mapped Arrow buffers (``pd.ArrowDtype``, categoricals aside), so
+    any number of processes share one copy of the pages through the OS
+    page cache.
+    """
+    root = Path(directory)
+    meta = json.loads((root / "index.json").read_text())
+    if meta.get("version") != INDEX_STORE_VERSION:
+        raise ValueError(f"Unsupported spatiotemporal index store version in {root}: {meta.get('version')}")
+    df = table_to_pandas(feather.read_table(root / "rows.arrow", memory_map=True), "pyarrow")
+    arrays = {name: np.load(root / f"{name}.npy", mmap_mode="r") for name in STORED_ARRAYS}
+    return SpatiotemporalIndex(
+        df=df,
+        index_type=meta["index_type"],
+        resolution=int(meta["resolution"]),
+        time_bucket_ms=int(meta["time_bucket_ms"]),
+        bucket_min=int(meta["bucket_min"]),
+        bucket_span=int(meta["bucket_span"]),
+        **arrays,
+    )
+
+
+def query_index(index: SpatiotemporalIndex, query_params: Dict[str, Any]) -> pd.DataFrame:
+    """Return indexed rows inside a bbox or radius and a time window.
+
+    Args:
+        index: Index produced by ``build_spatiotemporal_index``.
+        query_params: ``start_ts``/``end_ts`` (epoch ms) plus either
+            ``lat``/``lon``/``radius_km`` or ``bbox`` as
+            ``(min_lon, min_lat, max_lon, max_lat)``.
+    """
     logger.debug("Querying spatiotemporal index with params: %s", query_params)
-    return indexed_df
+    if "bbox" in query_params:
+        min_lon, min_lat, max_lon, max_lat = query_params["bbox"]
+        query = {"min_lon": min_lon, "min_lat": min_lat, "max_lon": max_lon, "max_lat": max_lat}
+    else:
+        query = {k: query_params[k] for k in ("lat", "lon", "radius_km")}
+    query["start_ts"] = query_params["start_ts"]
+    query["end_ts"] = query_params["end_ts"]
+    matches = query_index_batch(index, pd.DataFrame([query]))
+    return matches.drop(columns=["query_id", "index_row"])
+
+
+def query_index_batch(index: SpatiotemporalIndex, queries: pd.DataFrame) -> pd.DataFrame:
+    """Answer many spatiotemporal window queries in one pass.
+
+    Each query row carries ``start_ts``/``end_ts`` and either
+    ``lat``/``lon``/``radius_km`` or ``min_lon``/``min_lat``/``max_lon``/``max_lat``.
+    Cells are expanded by k-ring (or grid neighbourhood for geohash) and the
+    time window by neighbouring buckets, then candidates are filtered exactly.
+
+    Returns:
+        Flat candidate table with ``query_id`` (the ``query_id`` column when
+        present, else the query's position), ``index_row`` (position in
+        ``index.df``) and the matched rows' columns.
+    """
+    query_pos, rows = match_queries(index, queries)
+    logger.debug("Batched %s index queries returned %s candidates", len(queries), len(rows))
+    return _attach_rows(index, query_pos, rows, queries)
+
+
+def match_queries(index: SpatiotemporalIndex, queries: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(query_positions, index_rows)`` matches for ``query_index_batch`` queries."""
+    n_queries = len(queries)
+    if n_queries == 0 or len(index) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    is_bbox = "min_lat" in queries.columns
+    if is_bbox:
+        min_lat = queries["min_lat"].to_numpy(dtype=np.float64)
+        max_lat = queries["max_lat"].to_numpy(dtype=np.float64)
+        min_lon = queries["min_lon"].to_numpy(dtype=np.float64)
+        max_lon = queries["max_lon"].to_numpy(dtype=np.float64)
+        q_lat = (min_lat + max_lat) * 0.5
+        q_lon = (min_lon + max_lon) * 0.5
+        q_radius = haversine_km(q_lat, q_lon, max_lat, max_lon)
+        q_radius = np.maximum(q_radius, haversine_km(q_lat, q_lon, min_lat, max_lon))
+    else:
+        q_lat = queries["lat"].to_numpy(dtype=np.float64)
+        q_lon = queries["lon"].to_numpy(dtype=np.float64)
+        q_radius = queries["radius_km"].to_numpy(dtype=np.float64)
+    q_start = queries["start_ts"].to_numpy(dtype=np.int64)
+    q_end = queries["end_ts"].to_numpy(dtype=np.int64)
+
+    cell_sets = _covering_cell_sets(index, q_lat, q_lon, q_radius)
+    cell_counts = np.fromiter((len(c) for c in cell_sets), dtype=np.int64, count=n_queries)
+    first_bucket = np.maximum(q_start // index.time_bucket_ms, index.bucket_min)
+    last_bucket = np.minimum(q_end // index.time_bucket_ms, index.bucket_min + index.bucket_span - 1)
+    bucket_counts = np.maximum(last_bucket - first_bucket + 1, 0)
+
+    # Cartesian product of each query's cells with its buckets, vectorized per
+    # chunk of queries so the expanded key pairs stay within MAX_PAIRS_PER_CHUNK.
+    pair_counts = cell_counts * bucket_counts
+    cell_start = np.zeros(n_queries, dtype=np.int64)
+    np.cumsum(cell_counts[:-1], out=cell_start[1:])
+    all_cells = np.concatenate(cell_sets)
+    matched_queries = []
+    matched_rows = []
+    for lo, hi in chunk_bounds(pair_counts, MAX_PAIRS_PER_CHUNK):
+        counts = pair_counts[lo:hi]
+        pair_query = lo + np.repeat(np.arange(hi - lo, dtype=np.int64), counts)
+        within = expand_ranges(np.zeros(hi - lo, dtype=np.int64), counts)
+        per_cell = np.maximum(bucket_counts, 1)[pair_query]
+        pair_cells = all_cells[cell_start[pair_query] + within // per_cell]
+        pair_buckets = first_bucket[pair_query] + within % per_cell
+
+        owners, rows = index.lookup(pair_cells, pair_buckets)
+        query_of_row = pair_query[owners]
+        row_ts = index.ts[rows]
+        keep = (row_ts >= q_start[query_of_row]) & (row_ts <= q_end[query_of_row])
+        if is_bbox:
+            row_lat = index.lat[rows]
+            row_lon = index.lon[rows]
+            keep &= (row_lat >= min_lat[query_of_row]) & (row_lat <= max_lat[query_of_row])
+            keep &= (row_lon >= min_lon[query_of_row]) & (row_lon <= max_lon[query_of_row])
+        else:
+            distance = haversine_km(q_lat[query_of_row], q_lon[query_of_row], index.lat[rows], index.lon[rows])
+            keep &= distance <= q_radius[query_of_row]
+        matched_queries.append(query_of_row[keep])
+        matched_rows.append(rows[keep])
+
+    query_of_row = np.concatenate(matched_queries) if matched_queries else np.empty(0, dtype=np.int64)
+    rows = np.concatenate(matched_rows) if matched_rows else np.empty(0, dtype=np.int64)
+    ordering = np.lexsort((rows, query_of_row))
+    return query_of_row[ordering], rows[ordering]
+
+
+def _attach_rows(
+    index: SpatiotemporalIndex,
+    query_pos: np.ndarray,
+    rows: np.ndarray,
+    queries: pd.DataFrame,
+) -> pd.DataFrame:
+    """Build the flat candidate table from query positions and row positions."""
+    matched = index.df.take(rows).reset_index(drop=True)
+    if "query_id" in queries.columns:
+        query_ids = queries["query_id"].to_numpy()[query_pos]
+    else:
+        query_ids = query_pos
+    matched.insert(0, "index_row", rows)
+    matched.insert(0, "query_id", query_ids)
+    return matched
+
+
+def _covering_cell_sets(
+    index: SpatiotemporalIndex,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    radius_km: np.ndarray,
+) -> list[np.ndarray]:
+    """Return covering cell ids per query, reusing work for repeated centres."""
+    centres = index.cells_for(lat, lon)
+    cache: Dict[Tuple[int, float], np.ndarray] = {}
+    cell_sets = []
+    for i, (centre, radius) in enumerate(zip(centres.tolist(), radius_km.tolist())):
+        key = (centre, radius)
+        if key not in cache:
+            cache[key] = index.covering_cells(float(lat[i]), float(lon[i]), radius)
+        cell_sets.append(cache[key])
+    return cell_sets
+
+
+def _coordinate_columns(df: pd.DataFrame) -> Tuple[str, str]:
+    """Return the latitude/longitude column names for AIS or RF frames."""
+    if "est_lat" in df.columns and "est_lon" in df.columns:
+        return "est_lat", "est_lon"
+    return "lat", "lon"
+
+
+def _h3_cells(lat: np.ndarray, lon: np.ndarray, resolution: int) -> np.ndarray:
+    """Return H3 cell ids for coordinate arrays."""
+    to_cell = getattr(h3_int, "latlng_to_cell", None) or h3_int.geo_to_h3
+    return np.fromiter(
+        (to_cell(a, b, resolution) for a, b in zip(lat.tolist(), lon.tolist())),
+        dtype=np.int64,
+        count=len(lat),
+    )
+
+
+def _h3_edge_km(resolution: int) -> float:
+    """Return the average H3 hexagon edge length at a resolution."""
+    if hasattr(h3, "average_hexagon_edge_length"):
+        return float(h3.average_hexagon_edge_length(resolution, unit="km"))
+    return float(h3.edge_length(resolution, unit="km"))  # pragma: no cover - h3 v3 API
+
+
+def _h3_ring_k(radius_km: float, resolution: int) -> int:
+    """Return the k-ring distance needed to cover ``radius_km``."""
+    # Neighbouring centres are sqrt(3) * edge apart; shrink the edge to allow
+    # for cells smaller than the resolution average.
+    return int(math.ceil(radius_km / (math.sqrt(3.0) * _h3_edge_km(resolution) * 0.7))) + 1
+
+
+def _h3_disk_size(radius_km: float, resolution: int) -> int:
+    """Return the number of cells in the covering k-ring."""
+    k = _h3_ring_k(radius_km, resolution)
+    return 3 * k * (k + 1) + 1
+
+
+def _h3_disk(lat: float, lon: float, radius_km: float, resolution: int) -> np.ndarray:
+    """Return the k-ring of H3 cells covering ``radius_km`` around a point."""
+    to_cell = getattr(h3_int, "latlng_to_cell", None) or h3_int.geo_to_h3
+    disk = getattr(h3_int, "grid_disk", None) or h3_int.k_ring
+    k = _h3_ring_k(radius_km, resolution)
+    return np.asarray(sorted(disk(to_cell(lat, lon, resolution), k)), dtype=np.int64)
+
+
+def _h3_centres(cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return centre latitude/longitude arrays for H3 cells."""
+    to_latlng = getattr(h3_int, "cell_to_latlng", None) or h3_int.h3_to_geo
+    centres = np.array([to_latlng(cell) for cell in cells.tolist()], dtype=np.float64).reshape(-1, 2)
+    return centres[:, 0], centres[:, 1]
+
+
+def _geohash_bits(precision: int) -> Tuple[int, int]:
+    """Return (lon_bits, lat_bits) used by a geohash of the given precision."""
+    total = 5 * precision
+    return (total + 1) // 2, total // 2
+
+
+def _geohash_cells(lat: np.ndarray, lon: np.ndarray, precision: int) -> np.ndarray:
+    """Return geohash-aligned grid cell ids as ``(lat_cell << lon_bits) | lon_cell``."""
+    lon_bits, lat_bits = _geohash_bits(precision)
+    lon_cell = np.clip(((lon + 180.0) / 360.0 * (1 << lon_bits)).astype(np.int64), 0, (1 << lon_bits) - 1)
+    lat_cell = np.clip(((lat + 90.0) / 180.0 * (1 << lat_bits)).astype(np.int64), 0, (1 << lat_bits) - 1)
+    return (lat_cell << lon_bits) | lon_cell
+
+
+def _geohash_centres(cells: np.ndarray, precision: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return centre latitude/longitude arrays for geohash grid cells."""
+    lon_bits, lat_bits = _geohash_bits(precision)
+    lon_cell = cells & ((1 << lon_bits) - 1)
+    lat_cell = cells >> lon_bits
+    lat = (lat_cell + 0.5) * (180.0 / (1 << lat_bits)) - 90.0
+    lon = (lon_cell + 0.5) * (360.0 / (1 << lon_bits)) - 180.0
+    return lat, lon
+
+
+def _geohash_half_diagonal_km(precision: int) -> float:
+    """Return an upper bound on the centre-to-corner distance of a cell."""
+    lon_bits, lat_bits = _geohash_bits(precision)
+    return 0.5 * math.hypot(180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)) * KM_PER_DEGREE_LAT
+
+
+def _geohash_extent(lat: float, radius_km: float) -> Tuple[float, float]:
+    """Return the (dlat, dlon) half-extent in degrees of a circle's bounding square."""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    dlon = dlat / max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 1e-6)
+    return dlat, dlon
+
+
+def _geohash_disk_size(lat: float, radius_km: float, precision: int) -> int:
+    """Return an upper bound on the number of cells ``_geohash_disk`` would emit."""
+    lon_bits, lat_bits = _geohash_bits(precision)
+    dlat, dlon = _geohash_extent(lat, radius_km)
+    rows = int(2 * dlat * (1 << lat_bits) / 180.0) + 2
+    cols = min(int(2 * dlon * (1 << lon_bits) / 360.0) + 2, 1 << lon_bits)
+    return rows * cols
+
+
+def _geohash_disk(lat: float, lon: float, radius_km: float, precision: int) -> np.ndarray:
+    """Return geohash grid cells overlapping the bounding square of a circle."""
+    lon_bits, lat_bits = _geohash_bits(precision)
+    dlat, dlon = _geohash_extent(lat, radius_km)
+    lat_scale = (1 << lat_bits) / 180.0
+    lon_scale = (1 << lon_bits) / 360.0
+    lat_lo = max(int((lat - dlat + 90.0) * lat_scale), 0)
+    lat_hi = min(int((lat + dlat + 90.0) * lat_scale), (1 << lat_bits) - 1)
+    lon_cells_total = 1 << lon_bits
+    lon_lo = int(math.floor((lon - dlon + 180.0) * lon_scale))
+    lon_hi = int(math.floor((lon + dlon + 180.0) * lon_scale))
+    if lon_hi - lon_lo + 1 >= lon_cells_total:
+        lon_range = np.arange(lon_cells_total, dtype=np.int64)
+    else:
+        lon_range = np.arange(lon_lo, lon_hi + 1, dtype=np.int64) % lon_cells_total
+    lat_range = np.arange(lat_lo, lat_hi + 1, dtype=np.int64)
+    grid = (lat_range[:, None] << lon_bits) | lon_range[None, :]
+    return np.unique(grid.ravel())
+
@@ -5,7 +5,12 @@ from typing import Iterator, Optional
 
 import pandas as pd
 
-from utils.io import DataSourceConfig, read_dataframe
+from ingest.scheduler import prefetch
+from schemas.records import AISRecord
+from utils.io import DataSourceConfig, iter_dataframe_batches, read_dataframe
+
+# Fields materialized when projecting AIS inputs; see README §2.1.
+AIS_COLUMNS: list[str] = [*AISRecord.__fields__, "imo", "call_sign"]
 
 
 class AISIngestor:
@@ -25,10 +30,25 @@ class AISIngestor:
         """
         # TODO: Enforce schema validation using schemas.records.AISRecord.
         df = read_dataframe(self.source_config, columns=columns)
-        # TODO: Apply lazy chunked loading if dataset exceeds memory constraints.
         return df
 
-    def iter_batches(self, batch_size: int) -> Iterator[pd.DataFrame]:
-        """Stream AIS data in batches for memory-efficient processing."""
-        # TODO: Implement chunked iteration via pandas read_csv chunksize or parquet row groups.
-        raise NotImplementedError("Batch iteration not yet implemented.")
+    def iter_batches(
+        self,
+        batch_size: int,
+        columns: Optional[list[str]] = None,
+        prefetch_batches: int = 0,
+    ) -> Iterator[pd.DataFrame]:
+        """Stream AIS data in batches for memory-efficient processing.
+
+        Args:
+            batch_size: Maximum number of rows per yielded DataFrame.
+            columns: Optional projection, e.g. ``AIS_COLUMNS``; fields absent
+                from the source are skipped.
+            prefetch_batches: Batches read ahead on a background thread while
+                the caller processes the current one.
+
+        Yields:
+            DataFrames of at most ``batch_size`` AIS observations.
+        """
+        batches = iter_dataframe_batches(self.source_config, batch_size, columns=columns)
+        yield from prefetch(batches, prefetch_batches)
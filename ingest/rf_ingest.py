@@ -5,7 +5,12 @@ from typing import Iterator, Optional
 
 import pandas as pd
 
-from utils.io import DataSourceConfig, read_dataframe
+from ingest.scheduler import prefetch
+from schemas.records import RFRecord
+from utils.io import DataSourceConfig, iter_dataframe_batches, read_dataframe
+
+# Fields materialized when projecting RF inputs; see README §2.2.
+RF_COLUMNS: list[str] = list(RFRecord.__fields__)
 
 
 class RFIngestor:
@@ -21,7 +26,21 @@ class RFIngestor:
         # TODO: Apply RF-specific filtering for frequency bands or platforms.
         return df
 
-    def iter_batches(self, batch_size: int) -> Iterator[pd.DataFrame]:
-        """Stream RF detections in batches for incremental processing."""
-        # TODO: Implement chunked iteration or push-based streaming from RF providers.
-        raise NotImplementedError("Batch iteration not yet implemented.")
+    def iter_batches(
+        self,
+        batch_size: int,
+        columns: Optional[list[str]] = None,
+        prefetch_batches: int = 0,
+    ) -> Iterator[pd.DataFrame]:
+        """Stream RF detections in batches for incremental processing.
+
+        Args:
+            batch_size: Maximum number of rows per yielded DataFrame.
+            columns: Optional projection, e.g. ``RF_COLUMNS``; fields absent
+                from the source are skipped.
+            prefetch_batches: Batches read ahead on a background thread while
+                the caller processes the current one.
+        """
+        # TODO: Push-based streaming from RF providers.
+        batches = iter_dataframe_batches(self.source_config, batch_size, columns=columns)
+        yield from prefetch(batches, prefetch_batches)
@@ -0,0 +1,267 @@
+"""Pluggable record sources for the streaming fusion mode.
+
+Every source yields ``StreamMessage`` objects parsed from JSON lines of the
+form ``{"type": "ais", "mmsi": ..., "ts_utc": ..., ...}`` or
+``{"type": "rf", "rf_id": ..., ...}``, and ``None`` whenever nothing arrived
+for ``idle_timeout_s`` so the consumer can flush buffered records.
+Malformed lines are logged, counted in ``invalid_lines`` and skipped.
+"""
+from __future__ import annotations
+
+import json
+import queue
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from schemas.components import StreamSourceConfig
+from utils.logging import get_logger
+from utils.time import epoch_ms
+
+
+logger = get_logger(__name__)
+
+MESSAGE_KINDS = ("ais", "rf")
+# Sentinel closing a queue-backed stream.
+_CLOSED = object()
+
+
+@dataclass
+class StreamMessage:
+    """One AIS or RF record read from a stream source."""
+
+    kind: str
+    record: Dict[str, Any]
+    received_s: float  # ``time.perf_counter()`` when the source read the record
+
+
+def parse_message(line: Union[str, bytes], received_s: Optional[float] = None) -> StreamMessage:
+    """Parse one JSON line into a ``StreamMessage`` with ``ts_utc`` in epoch ms.
+
+    Raises:
+        ValueError: The line is not a JSON object with a known ``type`` and a ``ts_utc``.
+    """
+    payload = orjson.loads(line) if orjson is not None else json.loads(line)
+    if not isinstance(payload, dict):
+        raise ValueError("Stream message must be a JSON object")
+    return make_message(payload, received_s)
+
+
+def make_message(payload: Dict[str, Any], received_s: Optional[float] = None) -> StreamMessage:
+    """Return a ``StreamMessage`` for a decoded record carrying its ``type``."""
+    record = dict(payload)
+    kind = record.pop("type", None)
+    if kind not in MESSAGE_KINDS:
+        raise ValueError(f"Stream message type must be one of {MESSAGE_KINDS}, got {kind!r}")
+    if record.get("ts_utc") is None:
+        raise ValueError("Stream message has no ts_utc")
+    record["ts_utc"] = epoch_ms(record["ts_utc"])
+    return StreamMessage(kind, record, time.perf_counter() if received_s is None else received_s)
+
+
+class QueueSource:
+    """In-process source fed by ``put``; for embedding, tests and benchmarks without live services."""
+
+    def __init__(self, maxsize: int = 0, idle_timeout_s: float = 1.0) -> None:
+        self.idle_timeout_s = idle_timeout_s
+        self.invalid_lines = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+
+    def put(self, payload: Dict[str, Any]) -> None:
+        """Enqueue one decoded record with its ``type``; receipt is timestamped now."""
+        try:
+            self._queue.put(make_message(payload))
+        except ValueError as exc:
+            self.invalid_lines += 1
+            logger.warning("Skipping invalid stream message: %s", exc)
+
+    def put_line(self, line: Union[str, bytes]) -> None:
+        """Enqueue one JSON line."""
+        try:
+            self._queue.put(parse_message(line))
+        except ValueError as exc:
+            self.invalid_lines += 1
+            logger.warning("Skipping invalid stream message: %s", exc)
+
+    def close(self) -> None:
+        """End the stream once queued messages are consumed."""
+        self._queue.put(_CLOSED)
+
+    def __iter__(self) -> Iterator[Optional[StreamMessage]]:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout_s)
+            except queue.Empty:
+                yield None
+                continue
+            if item is _CLOSED:
+                return
+            yield item
+
+
+class FileTailSource:
+    """JSON-lines file, read to the end or followed for appended lines like ``tail -f``."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        follow: bool = False,
+        poll_interval_s: float = 0.1,
+        idle_timeout_s: float = 1.0,
+    ) -> None:
+        self.path = Path(path)
+        self.follow = follow
+        self.poll_interval_s = poll_interval_s
+        self.idle_timeout_s = idle_timeout_s
+        self.invalid_lines = 0
+        self._stop = threading.Event()
+
+    def close(self) -> None:
+        """Stop following the file."""
+        self._stop.set()
+
+    def __iter__(self) -> Iterator[Optional[StreamMessage]]:
+        with self.path.open("rb") as f:
+            partial = b""
+            idle_since = time.monotonic()
+            while not self._stop.is_set():
+                line = f.readline()
+                if line.endswith(b"\n"):
+                    idle_since = time.monotonic()
+                    message = self._parse(partial + line)
+                    partial = b""
+                    if message is not None:
+                        yield message
+                    continue
+                partial += line  # a writer may not have finished this line yet
+                if not self.follow:
+                    break
+                if time.monotonic() - idle_since >= self.idle_timeout_s:
+                    idle_since = time.monotonic()
+                    yield None
+                time.sleep(self.poll_interval_s)
+            if partial.strip() and not self._stop.is_set():
+                message = self._parse(partial)
+                if message is not None:
+                    yield message
+
+    def _parse(self, line: bytes) -> Optional[StreamMessage]:
+        """Parse a line, counting and skipping blank or malformed ones."""
+        if not line.strip():
+            return None
+        try:
+            return parse_message(line)
+        except ValueError as exc:
+            self.invalid_lines += 1
+            logger.warning("Skipping invalid line in %s: %s", self.path, exc)
+            return None
+
+
+class SocketSource:
+    """TCP server reading JSON lines from any number of concurrent clients.
+
+    The server binds when iteration starts (``port=0`` picks a free port,
+    available from ``address`` afterwards); each client is read on its own
+    thread and messages are merged in arrival order.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5555, idle_timeout_s: float = 1.0) -> None:
+        self.host = host
+        self.port = port
+        self.address: Optional[Tuple[str, int]] = None
+        self._messages = QueueSource(idle_timeout_s=idle_timeout_s)
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._server: Optional[socket.socket] = None
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def invalid_lines(self) -> int:
+        """Malformed lines skipped across all clients."""
+        return self._messages.invalid_lines
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the server is listening; return whether it is."""
+        return self._ready.wait(timeout)
+
+    def close(self) -> None:
+        """Stop accepting clients and end the stream."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._server is not None:
+            self._server.close()
+        self._messages.close()
+
+    def __iter__(self) -> Iterator[Optional[StreamMessage]]:
+        self._server = socket.create_server((self.host, self.port))
+        self._server.settimeout(0.2)
+        self.address = self._server.getsockname()[:2]
+        logger.info("Listening for stream messages on %s:%s", *self.address)
+        acceptor = threading.Thread(target=self._accept, name="stream-accept", daemon=True)
+        acceptor.start()
+        self._ready.set()
+        try:
+            yield from self._messages
+        finally:
+            self.close()
+            acceptor.join()
+
+    def _accept(self) -> None:
+        """Accept clients until closed, reading each on its own thread."""
+        while not self._stop.is_set():
+            try:
+                conn, peer = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            logger.info("Stream client connected from %s:%s", *peer[:2])
+            reader = threading.Thread(target=self._read, args=(conn,), name="stream-client", daemon=True)
+            reader.start()
+            self._threads.append(reader)
+
+    def _read(self, conn: socket.socket) -> None:
+        """Forward a client's complete lines until it disconnects or the source closes."""
+        conn.settimeout(0.2)
+        buffered = b""
+        with conn:
+            while not self._stop.is_set():
+                try:
+                    chunk = conn.recv(65536)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    return
+                if not chunk:
+                    break
+                *lines, buffered = (buffered + chunk).split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        self._messages.put_line(line)
+        if buffered.strip():
+            self._messages.put_line(buffered)
+
+
+StreamSource = Union[QueueSource, FileTailSource, SocketSource]
+
+
+def open_stream_source(config: StreamSourceConfig) -> StreamSource:
+    """Return the source named by ``config.source``."""
+    if config.source == "file":
+        if not config.path:
+            raise ValueError("streaming.path is required for the file source")
+        return FileTailSource(config.path, config.follow, config.poll_interval_s, config.idle_timeout_s)
+    if config.source == "socket":
+        return SocketSource(config.host, int(config.port), config.idle_timeout_s)
+    if config.source == "queue":
+        return QueueSource(idle_timeout_s=config.idle_timeout_s)
+    raise ValueError(f"Unknown streaming source {config.source!r}; expected file, socket or queue")
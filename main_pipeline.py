@@ -1,112 +1,700 @@
 """Main orchestrator for AIS-RF fusion pipeline."""
 from __future__ import annotations
 
+import argparse
+import functools
+import os
+import sys
+import time
+from dataclasses import asdict, fields, replace
 from pathlib import Path
-from typing import Dict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-import pandas as pd
+import yaml
 
-from algorithms.gap_fill import (
+from schemas.components import (
+    AuditConfig,
+    CheckpointConfig,
+    DataSourceConfig,
+    EntityResolutionConfig,
     GapFillConfig,
-    detect_gaps,
-    merge_gap_fill_results,
-    score_candidates,
-    viterbi_reconstruct,
-)
-from algorithms.spoof_detection import (
+    IndexingConfig,
+    IngestConfig,
+    OnlineFusionConfig,
+    OutputConfig,
+    ParallelConfig,
+    PreprocessingConfig,
+    ProfilingConfig,
+    RFQualityConfig,
     SpoofDetectionConfig,
-    compute_residuals,
-    correct_spoofed_tracks,
-    score_spoofing,
-)
-from entity_resolution.resolver import resolve_entities
-from entity_resolution.spatiotemporal_index import build_spatiotemporal_index
-from ingest.ais_ingest import AISIngestor
-from ingest.rf_ingest import RFIngestor
-from output.audit import AuditConfig, record_audit_event
-from output.writer import OutputConfig, write_output
-from preprocessing.cleaning import (
-    apply_domain_rules,
-    deduplicate_records,
-    filter_invalid_positions,
-    normalize_timestamps,
-)
-from preprocessing.feature_engineering import (
-    compute_motion_features,
-    encode_categorical_features,
-    normalize_numeric_features,
+    StreamOutputConfig,
+    StreamSourceConfig,
+    check_dtype_backend,
 )
-from schemas.config import PipelineConfig
-from schemas.output import map_to_n6_schema
-from utils.config import load_config
-from utils.io import DataSourceConfig
+from schemas.config import DataSourceConfigSchema, PipelineConfig
+from utils.config import ENV_CONFIG_PATH, load_config
 from utils.logging import get_logger
 
+# Pipeline modules (pandas, pyarrow, h3, s3fs) are imported inside the functions
+# that use them, so `validate`, `plan` and DAG files importing ``run_pipeline``
+# start without paying for them.
+if TYPE_CHECKING:  # pragma: no cover
+    import pandas as pd
+
+    from ingest.stream_sources import StreamSource
+    from utils.checkpoint import StageCache, StageOutput
+    from utils.profiling import StageProfiler
+
 
 logger = get_logger(__name__)
 
 
-def run_pipeline(config_path: str | Path) -> Dict[str, str]:
-    """Execute the AIS-RF fusion pipeline."""
-    config: PipelineConfig = load_config(config_path)
+# Checkpointed stages in execution order; output mapping and writing always run.
+STAGES = ("preprocess", "entities", "gap_fill", "residuals", "spoof")
+PROFILED_STAGES = (*STAGES, "map_n6", "write_output")
+
+
+def run_pipeline(
+    config_path: str | Path,
+    force_stages: Iterable[str] = (),
+    invalidate_stages: Iterable[str] = (),
+    use_cache: bool = True,
+    profile_stage: Optional[str] = None,
+    overrides: Sequence[str] = (),
+) -> Dict[str, str]:
+    """Execute the AIS-RF fusion pipeline.
+
+    When the config has a ``checkpoint`` block, each stage's output is cached
+    under a key built from the input fingerprints and the config sub-blocks
+    the stage reads, and reruns resume from the first stage whose key changed.
+
+    Args:
+        config_path: Path to the pipeline YAML.
+        force_stages: Stages to recompute even when checkpointed (later stages
+            are recomputed too).
+        invalidate_stages: Stages whose stored checkpoints (and those of later
+            stages) are deleted before the run.
+        use_cache: Set False to neither read nor write checkpoints.
+        profile_stage: Stage to run under a profiler, overriding
+            ``profiling.profile_stage``.
+        overrides: ``dotted.key=value`` config overrides; see ``load_config``.
+    """
+    from algorithms.sharding import (
+        run_gap_fill_stage,
+        run_residual_stage,
+        run_sharded,
+        run_spoof_stage,
+        select_residual_rf_rows,
+        select_shard_rf_rows,
+    )
+    from entity_resolution.resolver import resolve_entities
+    from output.audit import AuditSink, lineage_records
+    from output.writer import write_output, write_rejects
+    from schemas.output import map_to_n6_schema
+    from utils.profiling import StageProfiler
+
+    config: PipelineConfig = load_config(config_path, overrides)
+    stage_configs = build_stage_configs(config)
+
+    ais_source, rf_source = stage_configs["ais_source"], stage_configs["rf_source"]
+    dtype_backend = ais_source.dtype_backend
+    gap_fill_config = stage_configs["gap_fill"]
+    spoof_config = stage_configs["spoof_detection"]
+    rf_quality_config = stage_configs["rf_quality"]
+    ingest_config = stage_configs["ingest"]
+    parallel_config = stage_configs["parallel"]
+    sharded = parallel_config.workers > 1 or bool(parallel_config.shards)
+
+    cache = _stage_cache(config, use_cache, force_stages, dtype_backend)
+    if cache.config.enabled:
+        cache.invalidate(invalidate_stages)
+    keys = _stage_keys(config, cache, ais_source, rf_source)
+    resolver_config = {**config.indexing, **config.entity_resolution}
+
+    @functools.lru_cache(maxsize=None)
+    def gap_rf_rows():
+        return select_shard_rf_rows(
+            preprocess().frame("ais"), preprocess().frame("rf"), gap_fill_config, parallel_config.shard_count
+        )
+
+    @functools.lru_cache(maxsize=None)
+    def residual_rf_rows():
+        return select_residual_rf_rows(
+            gap_fill().frame("fused"), preprocess().frame("rf"), spoof_config, parallel_config.shard_count
+        )
+
+    def run_shardable(stage, df: pd.DataFrame, rf_rows):
+        rf_df = preprocess().frame("rf")
+        if sharded:
+            return run_sharded(
+                df, rf_df, gap_fill_config, spoof_config, parallel_config, stage=stage, rf_rows=rf_rows()
+            )
+        return stage(df, rf_df, gap_fill_config, spoof_config)
+
+    def preprocess():
+        return cache.run(
+            "preprocess",
+            keys["preprocess"],
+            lambda: _preprocess(ais_source, rf_source, config.preprocessing, rf_quality_config, ingest_config),
+        )
+
+    def entities():
+        def compute():
+            frames = preprocess()
+            resolved = resolve_entities(frames.frame("ais"), frames.frame("rf"), resolver_config)
+            return {"links": resolved}, {"entity_links": len(resolved)}
+
+        return cache.run("entities", keys["entities"], compute)
+
+    def gap_fill():
+        def compute():
+            fused_gap_df, gap_metrics, _ = run_shardable(run_gap_fill_stage, preprocess().frame("ais"), gap_rf_rows)
+            return {"fused": fused_gap_df}, {"gap_metrics": gap_metrics}
+
+        return cache.run("gap_fill", keys["gap_fill"], compute)
+
+    def residuals():
+        def compute():
+            residuals_df, _, _ = run_shardable(run_residual_stage, gap_fill().frame("fused"), residual_rf_rows)
+            return {"residuals": residuals_df}, {}
+
+        return cache.run("residuals", keys["residuals"], compute)
+
+    def spoof():
+        def compute():
+            corrected_df, spoof_metrics = run_spoof_stage(
+                gap_fill().frame("fused"),
+                residuals().frame("residuals"),
+                preprocess().frame("rf"),
+                spoof_config,
+            )
+            return {"corrected": corrected_df}, {"spoof_metrics": spoof_metrics}
+
+        return cache.run("spoof", keys["spoof"], compute)
+
+    profiler = StageProfiler(stage_configs["profiling"])
+    if profile_stage:
+        profiler.config.profile_stage = profile_stage
+
+    prepared = _profiled(profiler, "preprocess", preprocess)
+    rows_prepared = sum(prepared.rows.values())
+    links = _profiled(profiler, "entities", entities, rows_in=rows_prepared)
+    logger.info("Resolved %s entity links", links.metadata["entity_links"])
+    fused = _profiled(profiler, "gap_fill", gap_fill, rows_in=prepared.rows.get("ais"))
+    _profiled(profiler, "residuals", residuals, rows_in=fused.rows.get("fused"))
+    corrected = _profiled(profiler, "spoof", spoof, rows_in=fused.rows.get("fused"))
+    gap_metrics = fused.metadata["gap_metrics"]
+    spoof_metrics = corrected.metadata["spoof_metrics"]
+
+    with profiler.stage("map_n6", rows_in=corrected.rows.get("corrected")) as stage_metrics:
+        n6_table, n6_rejects = map_to_n6_schema(corrected.frame("corrected"))
+        stage_metrics.rows_out = n6_table.num_rows
+
+    output_cfg = stage_configs["output"]
+    with profiler.stage("write_output", rows_in=n6_table.num_rows + len(n6_rejects)) as stage_metrics:
+        output_artifacts = write_output(n6_table, output_cfg)
+        rejects_path = write_rejects(n6_rejects, output_cfg)
+        stage_metrics.rows_out = n6_table.num_rows + len(n6_rejects)
+    if rejects_path:
+        output_artifacts["rejects_path"] = rejects_path
+
+    with AuditSink(stage_configs["audit"]) as audit:
+        for stage_metrics in profiler.stages:
+            audit.record({"event": "stage_completed", **asdict(stage_metrics)})
+        for kind, rows in lineage_records(corrected.frame("corrected")).items():
+            audit.record_rows(kind, rows)
+        audit.record(
+            {
+                "event": "pipeline_completed",
+                "rf_quality_metrics": prepared.metadata["rf_quality"],
+                "gap_metrics": gap_metrics,
+                "spoof_metrics": spoof_metrics,
+                "records_written": n6_table.num_rows,
+                "records_rejected": len(n6_rejects),
+            }
+        )
+    logger.info("Stage summary:\n%s", profiler.summary_table())
+    if config.profiling:
+        output_artifacts["stage_metrics_path"] = profiler.write_json()
+
+    return output_artifacts
+
+
+def run_stream(
+    config_path: str | Path,
+    overrides: Sequence[str] = (),
+    source: Optional[StreamSource] = None,
+) -> Dict[str, Any]:
+    """Fuse a live AIS/RF record stream with the online engine until the source ends.
+
+    Fused records are written as JSON lines to ``streaming.output_path``
+    (``-`` for stdout) as soon as the watermark releases them; spoof alerts,
+    closed gaps and periodic engine stats go to the audit log.
+
+    Args:
+        config_path: Path to the pipeline YAML.
+        overrides: ``dotted.key=value`` config overrides; see ``load_config``.
+        source: Source to read instead of the one ``streaming.source`` names,
+            e.g. a ``QueueSource`` fed by an embedding application.
+
+    Returns:
+        The engine's final ``stats()``.
+    """
+    from algorithms.online_fusion import OnlineFusionEngine
+    from ingest.stream_sources import open_stream_source
+    from output.audit import AuditSink, json_dumps
+
+    config: PipelineConfig = load_config(config_path, overrides)
+    stage_configs = build_stage_configs(config)
+    if source is None:
+        source = open_stream_source(stage_configs["stream_source"])
+    stats_interval_s = stage_configs["stream_output"].stats_interval_s
+    output_path = stage_configs["stream_output"].output_path
+
+    with AuditSink(stage_configs["audit"]) as audit:
+        engine = OnlineFusionEngine(
+            stage_configs["gap_fill"],
+            stage_configs["spoof_detection"],
+            stage_configs["entity_resolution"],
+            stage_configs["online_fusion"],
+            on_event=audit.record,
+        )
+        if output_path == "-":
+            sink, close_sink = sys.stdout, False
+        else:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            sink, close_sink = open(output_path, "a", encoding="utf-8"), True
+        logger.info("Streaming fused records to %s", "stdout" if output_path == "-" else output_path)
+
+        emitted = 0
+
+        def emit(records: List[Dict[str, Any]]) -> None:
+            nonlocal emitted
+            if records:
+                emitted += len(records)
+                sink.write("".join(json_dumps(record) + "\n" for record in records))
+                sink.flush()
+
+        next_stats = time.monotonic() + stats_interval_s
+        try:
+            for message in source:
+                emit(engine.flush() if message is None else engine.process(message))
+                if time.monotonic() >= next_stats:
+                    next_stats = time.monotonic() + stats_interval_s
+                    audit.record({"event": "stream_stats", **engine.stats()})
+        except KeyboardInterrupt:
+            logger.info("Stream interrupted; flushing buffered records")
+        finally:
+            emit(engine.flush())
+            if close_sink:
+                sink.close()
+            stats = {**engine.stats(), "emitted": emitted, "invalid_lines": source.invalid_lines}
+            audit.record({"event": "stream_completed", **stats})
+    logger.info(
+        "Stream finished: %s messages, %s records emitted, p50 %.2f ms / p99 %.2f ms latency",
+        stats["messages"],
+        stats["emitted"],
+        stats["latency_p50_ms"] or 0.0,
+        stats["latency_p99_ms"] or 0.0,
+    )
+    return stats
+
+
+def plan_pipeline(
+    config: PipelineConfig,
+    force_stages: Iterable[str] = (),
+    invalidate_stages: Iterable[str] = (),
+    use_cache: bool = True,
+    check_cache: bool = False,
+) -> List[Tuple[str, str]]:
+    """Return ``(stage, action)`` for every stage ``run_pipeline`` would execute, without running any.
 
-    ais_source = DataSourceConfig(**config.ais_source.dict())
-    rf_source = DataSourceConfig(**config.rf_source.dict())
+    Only the config is consulted, so nothing heavier than the config schema
+    is imported. With ``check_cache`` the inputs are fingerprinted as a run
+    would (listing S3 sources) to tell which checkpoints would be reused;
+    that imports the I/O stack.
+    """
+    checkpointing = bool(config.checkpoint) and bool(config.checkpoint.get("enabled", True)) and use_cache
+    forced = _with_downstream(force_stages)
+    invalidated = _with_downstream(invalidate_stages)
+    keys: Dict[str, str] = {}
+    cache = None
+    if checkpointing and check_cache:
+        ais_source, rf_source = _data_sources(config)
+        cache = _stage_cache(config, use_cache, force_stages, ais_source.dtype_backend)
+        keys = _stage_keys(config, cache, ais_source, rf_source)
 
-    ais_df = AISIngestor(ais_source).load()
-    rf_df = RFIngestor(rf_source).load()
+    plan = []
+    for stage in STAGES:
+        if not checkpointing:
+            action = "run (checkpoints disabled)"
+        elif stage in forced:
+            action = "run (forced)"
+        elif stage in invalidated:
+            action = "run (checkpoints invalidated)"
+        elif cache is None:
+            action = "reuse checkpoint if inputs and config are unchanged"
+        elif not cache.is_cached(stage, keys[stage]):
+            action = f"run (no checkpoint {keys[stage][:12]})"
+        else:
+            action = f"reuse checkpoint {keys[stage][:12]}"
+        plan.append((stage, action))
+    plan.extend((stage, "run") for stage in PROFILED_STAGES[len(STAGES) :])
+    return plan
+
+
+def _with_downstream(stages: Iterable[str]) -> set[str]:
+    """Return ``stages`` together with every checkpointed stage after them."""
+    indices = [STAGES.index(stage) for stage in stages]
+    return set(STAGES[min(indices) :]) if indices else set()
+
+
+def build_stage_configs(config: PipelineConfig) -> Dict[str, Any]:
+    """Return the config object of every batch pipeline component, as ``run_pipeline`` builds them.
+
+    ``validate`` calls this too, so a key a component does not accept fails
+    there rather than partway through a run. The configs come from
+    ``schemas.components``, which imports no pipeline module. Blocks shared by
+    several components (``streaming``) or merged into another's config
+    (``indexing`` into ``entity_resolution``) are built with ``from_dict``
+    after checking every key belongs to one of them.
+
+    Raises:
+        ValueError: A block has a key its component does not accept, lacks a
+            required one, or holds an invalid value.
+    """
+    ais_source, rf_source = _data_sources(config)
+    configs: Dict[str, Any] = {"ais_source": ais_source, "rf_source": rf_source}
+    for block, factory in (
+        ("preprocessing", PreprocessingConfig),
+        ("gap_fill", GapFillConfig),
+        ("spoof_detection", SpoofDetectionConfig),
+        ("rf_quality", RFQualityConfig),
+        ("ingest", IngestConfig),
+        ("parallel", ParallelConfig),
+        ("output", OutputConfig),
+        ("audit", AuditConfig),
+        ("profiling", ProfilingConfig),
+        ("checkpoint", CheckpointConfig),
+    ):
+        try:
+            configs[block] = factory(**getattr(config, block))
+        except TypeError as exc:  # unexpected or missing keyword arguments
+            raise ValueError(f"Invalid {block} block: {exc}") from None
+
+    for block, components in (
+        ("indexing", (("indexing", IndexingConfig),)),
+        ("entity_resolution", (("entity_resolution", EntityResolutionConfig),)),
+        (
+            "streaming",
+            (
+                ("stream_source", StreamSourceConfig),
+                ("online_fusion", OnlineFusionConfig),
+                ("stream_output", StreamOutputConfig),
+            ),
+        ),
+    ):
+        values = getattr(config, block)
+        accepted = {field.name for _, factory in components for field in fields(factory)}
+        unknown = sorted(set(values) - accepted)
+        if unknown:
+            raise ValueError(f"Invalid {block} block: unexpected keys {unknown}")
+        if block == "entity_resolution":  # the resolver also reads indexing.time_bucket_minutes
+            values = {**config.indexing, **values}
+        try:
+            for name, factory in components:
+                configs[name] = factory.from_dict(values)
+        except (TypeError, ValueError) as exc:  # TypeError: e.g. a list where a number is expected
+            raise ValueError(f"Invalid {block} block: {exc}") from None
+    return configs
+
+
+def _data_sources(config: PipelineConfig) -> Tuple[DataSourceConfig, DataSourceConfig]:
+    """Return the AIS and RF source configs with the configured dtype backend."""
+    dtype_backend = check_dtype_backend(config.preprocessing.get("dtype_backend", "numpy"))
+    return tuple(
+        replace(DataSourceConfig(**source.dict()), dtype_backend=dtype_backend)
+        for source in (config.ais_source, config.rf_source)
+    )
+
+
+def _stage_cache(
+    config: PipelineConfig,
+    use_cache: bool,
+    force_stages: Iterable[str],
+    dtype_backend: str,
+) -> StageCache:
+    """Return the checkpoint cache for a run, disabled without a ``checkpoint`` block or cache use."""
+    from utils.checkpoint import StageCache
+
+    checkpoint_config = CheckpointConfig(**config.checkpoint)
+    checkpoint_config.enabled = bool(config.checkpoint) and checkpoint_config.enabled and use_cache
+    return StageCache(checkpoint_config, STAGES, force=force_stages, dtype_backend=dtype_backend)
+
+
+def _stage_keys(
+    config: PipelineConfig,
+    cache: StageCache,
+    ais_source: DataSourceConfig,
+    rf_source: DataSourceConfig,
+) -> Dict[str, str]:
+    """Return each checkpointed stage's key, chaining input fingerprints and the config blocks it reads."""
+    from utils.io import source_fingerprint
+
+    inputs = [source_fingerprint(ais_source), source_fingerprint(rf_source)] if cache.config.enabled else []
+    keys = {"preprocess": cache.key("preprocess", inputs, config.preprocessing, config.rf_quality)}
+    resolver_config = {**config.indexing, **config.entity_resolution}
+    mapping_table = resolver_config.get("mapping_table")
+    mapping_version = None
+    if cache.config.enabled and mapping_table:
+        mapping_version = source_fingerprint(DataSourceConfig(type="local", path=mapping_table))
+    keys["entities"] = cache.key("entities", keys["preprocess"], resolver_config, mapping_version)
+    keys["gap_fill"] = cache.key("gap_fill", keys["preprocess"], config.gap_fill)
+    residual_reach = {
+        key: config.spoof_detection.get(key) for key in ("residual_window_minutes", "residual_search_km")
+    }
+    keys["residuals"] = cache.key("residuals", keys["gap_fill"], residual_reach)
+    keys["spoof"] = cache.key("spoof", keys["residuals"], config.spoof_detection)
+    return keys
+
+
+def _profiled(
+    profiler: StageProfiler,
+    name: str,
+    run: Callable[[], StageOutput],
+    rows_in: Optional[int] = None,
+) -> StageOutput:
+    """Run a checkpointed stage under ``profiler`` and record its cache status and output rows."""
+    with profiler.stage(name, rows_in=rows_in) as stage_metrics:
+        output = run()
+        stage_metrics.cached = output.cached
+        stage_metrics.rows_out = sum(output.rows.values())
+        if stage_metrics.rows_in is None:
+            stage_metrics.rows_in = output.metadata.get("rows_in")
+    return output
+
+
+def _preprocess(
+    ais_source: DataSourceConfig,
+    rf_source: DataSourceConfig,
+    options: Dict[str, Any],
+    rf_quality: RFQualityConfig,
+    ingest: IngestConfig,
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+    """Ingest, clean and featurize AIS and RF inputs.
+
+    ``options`` is the ``preprocessing`` config block; ``float32: true``
+    stores sog/cog/rssi as float32. RF clusters are collapsed per
+    ``rf_quality`` before any RF indexing. With ``ingest.concurrent`` both
+    sources download at once and whichever arrives first is cleaned while
+    the other is still loading.
+    """
+    from ingest.ais_ingest import AISIngestor
+    from ingest.rf_ingest import RFIngestor
+    from ingest.scheduler import IngestScheduler
+
+    float32 = bool(options.get("float32", False))
+    scheduler = IngestScheduler(ingest)
+    results = scheduler.run(
+        {
+            "ais": (AISIngestor(ais_source).load, lambda df: (len(df), _clean_ais(df, float32))),
+            "rf": (RFIngestor(rf_source).load, lambda df: (len(df), _clean_rf(df, float32, rf_quality))),
+        }
+    )
+    ais_raw_rows, ais_df = results["ais"]
+    rf_raw_rows, (rf_df, rf_quality_metrics) = results["rf"]
+    metadata = {
+        "rows_in": ais_raw_rows + rf_raw_rows,
+        "ais_raw_rows": ais_raw_rows,
+        "rf_raw_rows": rf_raw_rows,
+        "rf_quality": rf_quality_metrics,
+        "ingest_timings": scheduler.timings,
+    }
+    return {"ais": ais_df, "rf": rf_df}, metadata
+
+
+def _clean_ais(ais_df: pd.DataFrame, float32: bool) -> pd.DataFrame:
+    """Clean and featurize raw AIS messages."""
+    from preprocessing.cleaning import (
+        apply_domain_rules,
+        compact_dtypes,
+        deduplicate_records,
+        filter_invalid_positions,
+        normalize_timestamps,
+    )
+    from preprocessing.feature_engineering import (
+        compute_motion_features,
+        encode_categorical_features,
+        normalize_numeric_features,
+    )
 
     ais_df = normalize_timestamps(ais_df, "ts_utc")
+    ais_df = compact_dtypes(ais_df, float32=float32)
     ais_df = filter_invalid_positions(ais_df, "lat", "lon")
     ais_df = deduplicate_records(ais_df, ["mmsi", "ts_utc"])
     ais_df = apply_domain_rules(ais_df)
+    return compute_motion_features(encode_categorical_features(normalize_numeric_features(ais_df, {}), []))
+
+
+def _clean_rf(
+    rf_df: pd.DataFrame,
+    float32: bool,
+    rf_quality: RFQualityConfig,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Clean raw RF detections and collapse TDOA clusters; return the frame and quality metrics."""
+    from preprocessing.cleaning import (
+        compact_dtypes,
+        deduplicate_records,
+        filter_invalid_positions,
+        normalize_timestamps,
+    )
+    from preprocessing.feature_engineering import compute_motion_features
+    from preprocessing.rf_quality import collapse_tdoa_clusters
 
     rf_df = normalize_timestamps(rf_df, "ts_utc")
+    rf_df = compact_dtypes(rf_df, float32=float32)
     rf_df = filter_invalid_positions(rf_df, "est_lat", "est_lon")
     rf_df = deduplicate_records(rf_df, ["rf_id", "ts_utc"])
+    rf_df, rf_quality_metrics = collapse_tdoa_clusters(rf_df, rf_quality)
+    return compute_motion_features(rf_df), rf_quality_metrics
+
 
-    ais_df = compute_motion_features(
-        encode_categorical_features(normalize_numeric_features(ais_df, {}), [])
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments; without a subcommand, ``run`` is assumed."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--config",
+        default=os.environ.get(ENV_CONFIG_PATH, "config.yaml"),
+        help=f"Path to the pipeline YAML config (default: ${ENV_CONFIG_PATH} or config.yaml).",
+    )
+    common.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Override a config value, e.g. parallel.workers=8 (repeatable; applied after AISRF__* variables).",
+    )
+    stages = argparse.ArgumentParser(add_help=False)
+    stages.add_argument(
+        "--force-stage",
+        action="append",
+        default=[],
+        choices=STAGES,
+        help="Recompute this stage and every later stage even if checkpointed (repeatable).",
     )
-    rf_df = compute_motion_features(rf_df)
+    stages.add_argument(
+        "--invalidate-stage",
+        action="append",
+        default=[],
+        choices=STAGES,
+        help="Delete stored checkpoints for this stage and every later stage (repeatable).",
+    )
+    stages.add_argument("--no-cache", action="store_true", help="Neither read nor write stage checkpoints.")
 
-    indexed_rf_df = build_spatiotemporal_index(rf_df, config.indexing)
-    resolved_entities = resolve_entities(ais_df, indexed_rf_df, config.indexing)
-    logger.info("Resolved %s entity links", len(resolved_entities))
+    parser = argparse.ArgumentParser(description="Run the AIS-RF fusion pipeline.")
+    commands = parser.add_subparsers(dest="command", metavar="{run,validate,plan,stream}")
+    run = commands.add_parser("run", parents=[common, stages], help="Run the pipeline (the default).")
+    run.add_argument(
+        "--profile-stage",
+        choices=PROFILED_STAGES,
+        help="Write a cProfile (or pyinstrument) report for this stage.",
+    )
+    commands.add_parser("validate", parents=[common], help="Validate the config with overrides applied, then exit.")
+    plan = commands.add_parser(
+        "plan", parents=[common, stages], help="Print what a run would execute or reuse, without running it."
+    )
+    plan.add_argument(
+        "--check-cache",
+        action="store_true",
+        help="Fingerprint the inputs to resolve which checkpoints would be reused (lists S3 sources).",
+    )
+    stream = commands.add_parser(
+        "stream", parents=[common], help="Fuse a live record stream with the online engine (see RUN.md)."
+    )
+    stream.add_argument(
+        "--source",
+        choices=("file", "socket"),
+        help="Record source, overriding streaming.source.",
+    )
+    stream.add_argument("--path", help="JSON-lines file for the file source, overriding streaming.path.")
+    stream.add_argument(
+        "--follow",
+        action=argparse.BooleanOptionalAction,
+        help="Keep reading lines appended to the file, overriding streaming.follow.",
+    )
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in (*commands.choices, "-h", "--help"):
+        argv.insert(0, "run")  # ``main_pipeline.py --config ...`` keeps running the pipeline
+    return parser.parse_args(argv)
 
-    gap_fill_config = GapFillConfig(**config.gap_fill)
-    gaps = detect_gaps(ais_df, gap_fill_config)
-    candidate_scores = score_candidates(gaps, rf_df, gap_fill_config)
-    viterbi_paths, gap_metrics = viterbi_reconstruct(candidate_scores, gap_fill_config)
-    fused_gap_df = merge_gap_fill_results(ais_df, viterbi_paths)
 
-    spoof_config = SpoofDetectionConfig(**config.spoof_detection)
-    residuals = compute_residuals(fused_gap_df, rf_df)
-    spoof_scores = score_spoofing(residuals, spoof_config)
-    corrected_df, spoof_metrics = correct_spoofed_tracks(
-        fused_gap_df, spoof_scores, rf_df, spoof_config
-    )
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point of ``python main_pipeline.py``; return the process exit code."""
+    args = parse_args(argv)
+    if args.command == "run":
+        artifacts = run_pipeline(
+            args.config,
+            force_stages=args.force_stage,
+            invalidate_stages=args.invalidate_stage,
+            use_cache=not args.no_cache,
+            profile_stage=args.profile_stage,
+            overrides=args.set,
+        )
+        logger.info("Pipeline finished with artifacts: %s", artifacts)
+        return 0
+    if args.command == "stream":
+        overrides = list(args.set)
+        if args.source:
+            overrides.append(f"streaming.source={args.source}")
+        if args.path:
+            overrides.append(f"streaming.path={args.path}")
+        if args.follow is not None:
+            overrides.append(f"streaming.follow={str(args.follow).lower()}")
+        run_stream(args.config, overrides)
+        return 0
 
-    n6_ready = map_to_n6_schema(corrected_df)
+    try:
+        config = load_config(args.config, args.set)
+        if args.command == "validate":
+            build_stage_configs(config)
+    except (OSError, ValueError, yaml.YAMLError) as exc:  # pydantic's ValidationError is a ValueError
+        print(f"Invalid configuration {args.config}:\n{exc}", file=sys.stderr)
+        return 1
+    if args.command == "validate":
+        print(f"Configuration {args.config} is valid.")
+        return 0
 
-    output_cfg = OutputConfig(**config.output)
-    output_artifacts = write_output(pd.DataFrame(n6_ready), output_cfg)  # type: ignore[arg-type]
+    print(f"Plan for {args.config}")
+    print(f"  ais_source    {_describe_source(config.ais_source)}")
+    print(f"  rf_source     {_describe_source(config.rf_source)}")
+    workers = int(config.parallel.get("workers", 1))
+    shards = int(config.parallel.get("shards") or 0)
+    if workers > 1 or shards:
+        print(f"  parallel      {workers} workers over {shards or 4 * workers} MMSI shards")
+    else:
+        print("  parallel      in-process")
+    print(f"  output        {Path(config.output.get('directory', './outputs')) / 'fused_output'}")
+    for stage, action in plan_pipeline(
+        config,
+        force_stages=args.force_stage,
+        invalidate_stages=args.invalidate_stage,
+        use_cache=not args.no_cache,
+        check_cache=args.check_cache,
+    ):
+        print(f"  {stage:<14}{action}")
+    return 0
 
-    audit_cfg = AuditConfig(**config.audit)
-    record_audit_event(
-        {
-            "event": "pipeline_completed",
-            "gap_metrics": gap_metrics,
-            "spoof_metrics": spoof_metrics,
-            "records_written": len(n6_ready),
-        },
-        audit_cfg,
-    )
 
-    return output_artifacts
+def _describe_source(source: DataSourceConfigSchema) -> str:
+    """Return a one-line description of a data source for ``plan``."""
+    if source.type == "s3" and source.s3 is not None:
+        location = f"s3://{source.s3.bucket}/{source.s3.key}"
+    else:
+        location = str(source.path)
+    filters = [name for name in ("time_range", "bbox", "mmsi", "partitioning") if getattr(source, name) is not None]
+    pushdown = f", pushdown: {', '.join(filters)}" if filters else ""
+    return f"{location} ({source.format}{pushdown})"
 
 
 if __name__ == "__main__":
-    # TODO: Parse CLI arguments for config path and runtime overrides.
-    artifacts = run_pipeline("config.yaml")
-    logger.info("Pipeline finished with artifacts: %s", artifacts)
+    sys.exit(main())
@@ -1,39 +1,245 @@
 """Audit logging utilities for pipeline execution."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from schemas.components import AuditConfig
 from utils.logging import get_logger
 
 
 logger = get_logger(__name__)
 
+# Per-record lineage kept in the parquet sidecar (README §5.2 step 6), where present.
+LINEAGE_COLUMNS = (
+    "mmsi",
+    "ts_utc",
+    "lat",
+    "lon",
+    "orig_lat",
+    "orig_lon",
+    "spoof_score",
+    "source_tag",
+    "fill_method",
+    "fill_confidence",
+    "rf_id",
+)
+
+
+class AuditSink:
+    """Buffered writer for JSON-lines audit events and parquet lineage records.
+
+    Events are encoded as they arrive and appended to ``<directory>/<filename>``
+    in batches, with one open/append/close per flush instead of per event.
+    A flush happens when ``buffer_events`` are buffered, once the oldest
+    buffered event is ``flush_interval_s`` old, and on ``flush``/``close``.
+    The age is watched by a timer thread, so events such as a spoof alert
+    reach the log even when no further event arrives. With ``background``
+    the batches are written in order by a single worker thread. Write errors
+    from that thread or from the timer are raised from ``close``.
+    The log is rotated like ``logging.handlers.RotatingFileHandler``
+    (``audit.log.1`` ... ``audit.log.<backup_count>``).
+
+    High-volume per-record rows go through ``record_rows`` to
+    ``<directory>/<records_dirname>/<kind>/<run_id>-<n>.parquet`` instead.
+    """
+
+    def __init__(self, config: AuditConfig) -> None:
+        self.config = config
+        self.directory = Path(config.directory)
+        self.path = self.directory / config.filename
+        self.run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self._buffer: List[bytes] = []
+        self._oldest: Optional[float] = None
+        self._parts: Dict[str, int] = {}
+        self._lock = threading.Condition()
+        self._closed = False
+        self._timer: Optional[threading.Thread] = None
+        self._timer_error: Optional[BaseException] = None
+        self._pending: List[Future] = []
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit") if config.background else None
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self) -> "AuditSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def record(self, event: Dict[str, Any]) -> None:
+        """Buffer ``event`` with a UTC timestamp and the sink's ``run_id``."""
+        line = _encode({"timestamp": datetime.now(timezone.utc).isoformat(), "run_id": self.run_id, **event}) + b"\n"
+        now = time.monotonic()
+        with self._lock:
+            self._buffer.append(line)
+            if self._oldest is None:
+                self._oldest = now
+                self._start_timer()
+            if len(self._buffer) >= self.config.buffer_events or now - self._oldest >= self.config.flush_interval_s:
+                self._flush_locked()
+
+    def record_rows(self, kind: str, rows: pd.DataFrame) -> Optional[str]:
+        """Write per-record audit ``rows`` of ``kind`` as a parquet file; return its path."""
+        if rows.empty:
+            return None
+        with self._lock:
+            part = self._parts.get(kind, 0)
+            self._parts[kind] = part + 1
+        path = self.directory / self.config.records_dirname / kind / f"{self.run_id}-{part}.parquet"
+        self._submit(_write_parquet, rows, path)
+        logger.info("Recording %s %s audit rows to %s", len(rows), kind, path)
+        return str(path)
+
+    def flush(self) -> None:
+        """Hand buffered events to the writer."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Flush, wait for pending writes and re-raise the first write error."""
+        with self._lock:
+            self._closed = True
+            self._flush_locked()
+            self._lock.notify()
+        if self._timer is not None:
+            self._timer.join()
+        if self._timer_error is not None:
+            raise self._timer_error
+        if self._writer is None:
+            return
+        self._writer.shutdown(wait=True)
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
 
-@dataclass
-class AuditConfig:
-    """Configuration for audit trail persistence."""
+    def _start_timer(self) -> None:
+        """Start the thread flushing aged events, once; the caller holds ``_lock``."""
+        if self._timer is None and not self._closed:
+            self._timer = threading.Thread(target=self._flush_when_due, name="audit-flush", daemon=True)
+            self._timer.start()
+        self._lock.notify()
 
-    directory: str
-    filename: str = "audit.log"
+    def _flush_when_due(self) -> None:
+        """Flush buffered events once the oldest is ``flush_interval_s`` old, until ``close``."""
+        with self._lock:
+            while not self._closed:
+                if self._oldest is None:
+                    self._lock.wait()
+                    continue
+                remaining = self._oldest + self.config.flush_interval_s - time.monotonic()
+                if remaining > 0:
+                    self._lock.wait(remaining)
+                    continue
+                try:
+                    self._flush_locked()
+                except Exception as exc:  # raised from close()
+                    self._timer_error = exc
+                    return
+
+    def _flush_locked(self) -> None:
+        """Write or submit the buffered events; the caller holds ``_lock``."""
+        if not self._buffer:
+            return
+        payload = b"".join(self._buffer)
+        self._buffer = []
+        self._oldest = None
+        self._submit(self._append, payload)
+
+    def _submit(self, fn: Any, *args: Any) -> None:
+        """Run ``fn(*args)`` inline or on the background writer."""
+        if self._writer is None:
+            fn(*args)
+            return
+        self._pending = [future for future in self._pending if not future.done() or future.exception()]
+        self._pending.append(self._writer.submit(fn, *args))
+
+    def _append(self, payload: bytes) -> None:
+        """Append encoded events to the log, rotating it first when it would grow too large."""
+        if self.config.max_bytes > 0:
+            try:
+                size = self.path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if size and size + len(payload) > self.config.max_bytes:
+                self._rotate()
+        with self.path.open("ab") as f:
+            f.write(payload)
+        logger.debug("Wrote %s bytes of audit events to %s", len(payload), self.path)
+
+    def _rotate(self) -> None:
+        """Shift ``<log>.N`` to ``<log>.N+1`` and move the log to ``<log>.1``."""
+        if self.config.backup_count <= 0:
+            self.path.unlink()
+            return
+        for n in range(self.config.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{n}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{n + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        logger.info("Rotated audit log %s", self.path)
 
 
 def record_audit_event(event: Dict[str, Any], config: AuditConfig) -> None:
-    """Append audit event to the configured log destination."""
-    target_dir = Path(config.directory)
-    target_dir.mkdir(parents=True, exist_ok=True)
-    event_with_ts = {"timestamp": datetime.utcnow().isoformat(), **event}
-    log_path = target_dir / config.filename
-    logger.debug("Recording audit event to %s", log_path)
-    with log_path.open("a", encoding="utf-8") as f:
-        f.write(json_dumps(event_with_ts) + "\n")
+    """Append a single audit event to the configured log destination.
+
+    Opens the log for this one event; use ``AuditSink`` to record many.
+    """
+    with AuditSink(replace(config, background=False)) as sink:
+        sink.record(event)
+
+
+def lineage_records(frame: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Return spoof-corrected and gap-filled rows of ``frame`` with their ``LINEAGE_COLUMNS``.
+
+    Corrections are rows with an ``orig_lat``; fills are rows with a
+    ``fill_method``. Kinds whose marker column is absent are omitted.
+    """
+    columns = [c for c in LINEAGE_COLUMNS if c in frame.columns]
+    records = {}
+    for kind, marker in (("spoof_corrections", "orig_lat"), ("gap_fills", "fill_method")):
+        if marker in frame.columns:
+            records[kind] = frame.loc[frame[marker].notna().to_numpy(), columns].reset_index(drop=True)
+    return records
 
 
 def json_dumps(payload: Dict[str, Any]) -> str:
-    """Serialize dictionary to JSON string."""
-    # TODO: Replace with structured logging provider if needed.
-    import json
+    """Serialize dictionary to JSON string, with ``orjson`` when installed."""
+    return _encode(payload).decode("utf-8")
+
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    """Serialize ``payload`` to UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=_json_default).encode("utf-8")
+
+
+def _json_default(value: Any) -> Any:
+    """Convert values the JSON encoders do not handle natively."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return value.isoformat()
+    return str(value)
+
 
-    return json.dumps(payload)
+def _write_parquet(rows: pd.DataFrame, path: Path) -> None:
+    """Write ``rows`` to ``path``, creating parent directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows.to_parquet(path, index=False)
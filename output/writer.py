@@ -1,55 +1,295 @@
 """Output writer for fused AIS-RF datasets."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+import ctypes
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import uuid
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
+from schemas.components import OutputConfig
 from utils.logging import get_logger
 
 
 logger = get_logger(__name__)
 
+# renameat2(2) flag swapping two existing paths in one step (Linux 3.15+, glibc 2.28+).
+RENAME_EXCHANGE = 2
+_AT_FDCWD = -100
 
-@dataclass
-class OutputConfig:
-    """Configuration for writing fused outputs."""
 
-    directory: str
-    format: str = "parquet"
-    partition_cols: Optional[list[str]] = None
-    manifest_name: str = "manifest.json"
+def write_output(df: Union[pd.DataFrame, pa.Table], config: OutputConfig) -> Dict[str, Any]:
+    """Persist fused output dataset to storage.
 
+    The dataset is written hive-partitioned by ``partition_cols`` (``date`` is
+    derived from ``ts_utc`` when not present) into a staging directory next to
+    the target and swapped into place once every file is complete, so
+    consumers never observe a partially written dataset. The manifest is
+    replaced afterwards and only ever lists committed files.
+
+    Returns:
+        Paths of the committed dataset directory and its manifest.
+    """
+    if config.format != "parquet":
+        raise ValueError(f"Unsupported output format: {config.format}")
+    table = df if isinstance(df, pa.Table) else pa.Table.from_pandas(df, preserve_index=False)
+    partition_cols = list(config.partition_cols or [])
+    table = _add_derived_partitions(table, partition_cols)
 
-def write_output(df: pd.DataFrame, config: OutputConfig) -> Dict[str, Any]:
-    """Persist fused output dataset to storage."""
     target_dir = Path(config.directory)
     target_dir.mkdir(parents=True, exist_ok=True)
-    if config.format == "parquet":
-        output_path = target_dir / "fused_output.parquet"
-        logger.info("Writing Parquet output to %s", output_path)
-        # TODO: Add partitioned writes using pyarrow or fastparquet.
-        df.to_parquet(output_path, index=False)
-    else:
-        raise ValueError(f"Unsupported output format: {config.format}")
-    manifest = _write_manifest(df, target_dir / config.manifest_name)
-    return {"output_path": str(output_path), "manifest_path": manifest}
+    final_path = target_dir / config.dataset_name
+    staging_root = target_dir / f".staging-{uuid.uuid4().hex}"
+    staging_path = staging_root / config.dataset_name
+    logger.info("Writing Parquet output to %s (staging in %s)", final_path, staging_root)
+
+    try:
+        written = _write_dataset(table, staging_path, partition_cols, config)
+        manifest = _build_manifest(table, written, staging_path, partition_cols)
+        _commit(staging_path, final_path)
+    finally:
+        shutil.rmtree(staging_root, ignore_errors=True)
+
+    logger.info("Committed %s rows in %s files to %s", table.num_rows, len(written), final_path)
+    manifest_path = _write_manifest(manifest, target_dir / config.manifest_name)
+    return {"output_path": str(final_path), "manifest_path": manifest_path}
+
+
+def write_rejects(rejects: pd.DataFrame, config: OutputConfig, filename: str = "n6_rejects.parquet") -> Optional[str]:
+    """Write rows that failed N6 validation, with their ``reject_reason``, as a sidecar."""
+    if rejects.empty:
+        return None
+    path = Path(config.directory) / filename
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _stringify_mixed_columns(rejects).to_parquet(path, index=False)
+    logger.warning("Wrote %s rejected N6 records to %s", len(rejects), path)
+    return str(path)
+
+
+def _stringify_mixed_columns(frame: pd.DataFrame) -> pd.DataFrame:
+    """Render object columns holding more than one value type as strings so Parquet can store them.
+
+    Rejected rows often carry the mixed-type value that failed validation.
+    """
+    mixed = [
+        column
+        for column in frame.columns
+        if frame[column].dtype == object
+        and pd.api.types.infer_dtype(frame[column], skipna=True) not in ("string", "empty", "bytes")
+        and frame[column].dropna().map(type).nunique() > 1
+    ]
+    if not mixed:
+        return frame
+    return frame.assign(**{column: frame[column].map(str, na_action="ignore") for column in mixed})
+
+
+def _add_derived_partitions(table: pa.Table, partition_cols: List[str]) -> pa.Table:
+    """Add a UTC ``date`` partition column from ``ts_utc`` when requested and absent."""
+    if "date" in partition_cols and "date" not in table.column_names:
+        ts = table.column("ts_utc")
+        if pa.types.is_integer(ts.type):
+            ts = ts.cast(pa.timestamp("ms", tz="UTC"))
+        table = table.append_column("date", pc.cast(ts, pa.date32()))
+    missing = [c for c in partition_cols if c not in table.column_names]
+    if missing:
+        raise ValueError(f"Partition columns not found in output: {missing}")
+    return table
+
+
+def _write_dataset(
+    table: pa.Table,
+    path: Path,
+    partition_cols: List[str],
+    config: OutputConfig,
+) -> List[Dict[str, Any]]:
+    """Write ``table`` as parquet files under ``path``; return per-file metadata."""
+    n_partitions = (
+        max(1, len(table.group_by(partition_cols).aggregate([]))) if partition_cols else 1
+    )
+    data: Any = table
+    if n_partitions > 1:
+        # Contiguous partitions let each file be written in one pass. Rows are
+        # taken in partition order a row group at a time rather than sorting a
+        # full copy of the table; a single partition is already contiguous.
+        order = pc.sort_indices(table, sort_keys=[(c, "ascending") for c in partition_cols])
+        data = _take_batches(table, order, config.row_group_rows)
+    bytes_per_row = max(1, table.nbytes // max(1, table.num_rows))
+    rows_per_file = max(config.row_group_rows, config.target_file_bytes // bytes_per_row)
+    partitioning = (
+        ds.partitioning(table.select(partition_cols).schema, flavor="hive") if partition_cols else None
+    )
+    written: List[Dict[str, Any]] = []
+
+    def visit(written_file: Any) -> None:
+        written.append({"path": written_file.path, "metadata": written_file.metadata})
+
+    ds.write_dataset(
+        data,
+        path,
+        schema=table.schema,
+        format="parquet",
+        partitioning=partitioning,
+        basename_template="part-{i}.parquet",
+        file_options=ds.ParquetFileFormat().make_write_options(compression=config.compression),
+        max_rows_per_file=rows_per_file,
+        max_rows_per_group=config.row_group_rows,
+        min_rows_per_group=min(config.row_group_rows, rows_per_file),
+        max_partitions=n_partitions,
+        use_threads=config.use_threads,
+        existing_data_behavior="error",
+        file_visitor=visit,
+    )
+    return written
 
 
-def _write_manifest(df: pd.DataFrame, path: Path) -> str:
-    """Write a manifest summarizing output dataset metadata."""
-    manifest_data = {
-        "record_count": len(df),
-        "columns": df.columns.tolist(),
-        # TODO: Include schema hashes, data lineage references, etc.
+def _take_batches(table: pa.Table, order: pa.Array, batch_rows: int) -> Iterator[pa.RecordBatch]:
+    """Yield the rows of ``table`` in ``order`` as record batches of at most ``batch_rows``."""
+    for start in range(0, len(order), batch_rows):
+        yield from table.take(order.slice(start, batch_rows)).combine_chunks().to_batches()
+
+
+def _build_manifest(
+    table: pa.Table,
+    written: List[Dict[str, Any]],
+    root: Path,
+    partition_cols: List[str],
+) -> Dict[str, Any]:
+    """Summarize the written dataset, listing every file with its statistics."""
+    data_schema = table.schema
+    for column in partition_cols:
+        data_schema = data_schema.remove(data_schema.get_field_index(column))
+    files = []
+    for entry in sorted(written, key=lambda e: e["path"]):
+        path = Path(entry["path"])
+        metadata: pq.FileMetaData = entry["metadata"]
+        ts_min, ts_max = _column_range(metadata, "ts_utc")
+        files.append(
+            {
+                "path": path.relative_to(root).as_posix(),
+                "row_count": metadata.num_rows,
+                "row_groups": metadata.num_row_groups,
+                "bytes": os.path.getsize(path),
+                "ts_utc_min": ts_min,
+                "ts_utc_max": ts_max,
+            }
+        )
+    return {
+        "dataset": root.name,
+        "record_count": table.num_rows,
+        "file_count": len(files),
+        "total_bytes": sum(f["bytes"] for f in files),
+        "columns": data_schema.names,
+        "partition_cols": partition_cols,
+        "schema_hash": schema_hash(data_schema),
+        "files": files,
     }
-    path.write_text(json_dumps(manifest_data))
+
+
+def _write_manifest(manifest: Dict[str, Any], path: Path) -> str:
+    """Atomically replace the manifest summarizing the output dataset."""
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp.write_text(json_dumps(manifest))
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
     logger.debug("Wrote manifest to %s", path)
     return str(path)
 
 
+def schema_hash(schema: pa.Schema) -> str:
+    """Return a stable SHA-256 of an Arrow schema's field names, types and null-ability."""
+    rendered = schema.to_string(show_field_metadata=False, show_schema_metadata=False)
+    return hashlib.sha256(rendered.encode("utf-8")).hexdigest()
+
+
+def _column_range(metadata: pq.FileMetaData, column: str) -> tuple[Optional[int], Optional[int]]:
+    """Return min/max of ``column`` across row groups as epoch ms, from parquet statistics."""
+    names = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+    if column not in names:
+        return None, None
+    index = names.index(column)
+    lows, highs = [], []
+    for group in range(metadata.num_row_groups):
+        stats = metadata.row_group(group).column(index).statistics
+        if stats is None or not stats.has_min_max:
+            return None, None
+        lows.append(_epoch_ms(stats.min))
+        highs.append(_epoch_ms(stats.max))
+    if not lows:
+        return None, None
+    return min(lows), max(highs)
+
+
+def _epoch_ms(value: Any) -> int:
+    """Convert a parquet statistics value (datetime or integer) to epoch ms."""
+    if isinstance(value, int):
+        return value
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+def _commit(staging_path: Path, final_path: Path) -> None:
+    """Swap the staged dataset into ``final_path``.
+
+    Where ``renameat2(RENAME_EXCHANGE)`` is available the two directories are
+    exchanged in one step, so ``final_path`` always exists and the previous
+    dataset is left at ``staging_path`` for the caller to remove. Otherwise the
+    previous dataset is renamed aside first, leaving a brief window without
+    ``final_path``.
+    """
+    if final_path.exists() and _exchange(staging_path, final_path):
+        return
+    previous = None
+    if final_path.exists():
+        previous = final_path.with_name(f".{final_path.name}.previous-{uuid.uuid4().hex}")
+        os.rename(final_path, previous)
+    try:
+        os.rename(staging_path, final_path)
+    except OSError:
+        if previous is not None:
+            os.rename(previous, final_path)
+        raise
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+def _exchange(first: Path, second: Path) -> bool:
+    """Atomically swap two existing paths; return False where the platform or filesystem cannot."""
+    renameat2 = _renameat2()
+    if renameat2 is None:
+        return False
+    if renameat2(_AT_FDCWD, os.fsencode(first), _AT_FDCWD, os.fsencode(second), RENAME_EXCHANGE) == 0:
+        return True
+    code = ctypes.get_errno()
+    if code in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+        logger.debug("renameat2(RENAME_EXCHANGE) unsupported for %s: %s", second, os.strerror(code))
+        return False
+    raise OSError(code, os.strerror(code), str(second))
+
+
+def _renameat2() -> Optional[Any]:
+    """Return libc's ``renameat2``, or None where it is not available."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        function = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):  # pragma: no cover - libc without renameat2
+        return None
+    function.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    function.restype = ctypes.c_int
+    return function
+
+
 def json_dumps(payload: Dict[str, Any]) -> str:
     """Serialize dictionary to JSON string."""
     # TODO: Replace with orjson if performance requirements demand.
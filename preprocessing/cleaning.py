@@ -1,21 +1,103 @@
 """Data cleaning utilities for AIS and RF datasets."""
 from __future__ import annotations
 
-from typing import Any
+import logging
+from typing import Any, Iterable, Optional
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from utils.logging import get_logger
+from utils.time import epoch_ms_array
 
 
 logger = get_logger(__name__)
 
+# Low-cardinality string columns stored as pandas categoricals (README §2).
+CATEGORICAL_COLUMNS = ("nav_status", "source_system", "freq_band", "geoloc_method", "call_sign")
+# Measurements whose precision survives float32 (opt-in).
+FLOAT32_COLUMNS = ("sog", "cog", "rssi")
+# Integer timestamps below this are epoch seconds (1e11 ms is March 1973).
+EPOCH_SECONDS_LIMIT = 100_000_000_000
+# Rows sampled per object column when estimating memory for the compaction log.
+MEMORY_SAMPLE_ROWS = 10_000
+# Packed (id, timestamp) keys keep the timestamp modulo 2**32 ms (~49.7 days) in
+# their low bits; ids must fit in the remaining 31 bits (MMSIs are 9 digits).
+PACKED_TS_BITS = 32
+PACKED_TS_SPAN_MS = 1 << PACKED_TS_BITS
+_MAX_PACKED_ID = 1 << (63 - PACKED_TS_BITS)
+_HASHED_KEY_BIT = np.uint64(1 << 63)
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
 
 def normalize_timestamps(df: pd.DataFrame, column: str) -> pd.DataFrame:
-    """Ensure timestamps are timezone-aware UTC."""
-    # TODO: Implement timestamp normalization with pandas to_datetime + tz conversion.
-    logger.debug("Normalizing timestamps for column %s", column)
-    return df
+    """Convert ``column`` to int64 epoch milliseconds in UTC (README §3.1).
+
+    Accepts epoch ms (or epoch seconds) as numbers or numeric strings,
+    datetimes, and ISO-8601 strings with or without an offset; naive values
+    are taken as UTC. Uniform columns take a single vectorized conversion
+    (Arrow's string cast for ISO-8601) and only columns mixing formats fall
+    back to per-format parsing.
+    Rows whose timestamp is missing or unparseable are dropped.
+    """
+    values = df[column]
+    if pd.api.types.is_integer_dtype(values.dtype) and not pd.api.types.is_extension_array_dtype(values.dtype):
+        epoch_ms = _scale_epoch(values.to_numpy(dtype=np.int64))
+        valid = None
+    elif pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(numbers)
+        # Scale before casting so fractional epoch seconds keep their milliseconds.
+        epoch_ms = np.rint(_scale_epoch(np.where(valid, numbers, 0.0))).astype(np.int64)
+    elif pd.api.types.is_datetime64_any_dtype(values.dtype):
+        valid = values.notna().to_numpy()
+        epoch_ms = epoch_ms_array(values.fillna(pd.Timestamp(0, tz=getattr(values.dt, "tz", None))))
+    else:
+        epoch_ms, valid = _parse_timestamp_strings(values)
+
+    out = df.copy(deep=False)
+    out[column] = epoch_ms
+    if valid is not None and not valid.all():
+        logger.warning("Dropping %s rows with missing or unparseable %s", int((~valid).sum()), column)
+        out = out.loc[valid]
+    logger.debug("Normalized %s to int64 epoch ms", column)
+    return out
+
+
+def compact_dtypes(df: pd.DataFrame, float32: bool = False) -> pd.DataFrame:
+    """Store AIS/RF columns in compact dtypes before the algorithms run.
+
+    ``mmsi`` becomes int64 (nullable ``Int64`` if it has gaps), the
+    ``CATEGORICAL_COLUMNS`` become categoricals and, with ``float32``, the
+    ``FLOAT32_COLUMNS`` are downcast to float32. Memory before and after is
+    logged at INFO.
+    """
+    measure = logger.isEnabledFor(logging.INFO)
+    before = _memory_bytes(df) if measure else 0
+    out = df.copy(deep=False)
+    if "mmsi" in out.columns and not pd.api.types.is_integer_dtype(out["mmsi"].dtype):
+        mmsi = pd.to_numeric(out["mmsi"], errors="coerce")
+        out["mmsi"] = mmsi.astype("Int64") if mmsi.isna().any() else mmsi.astype(np.int64)
+    elif "mmsi" in out.columns and out["mmsi"].dtype != np.int64:
+        out["mmsi"] = out["mmsi"].astype(np.int64)
+    for column in _present(out, CATEGORICAL_COLUMNS):
+        if not isinstance(out[column].dtype, pd.CategoricalDtype):
+            out[column] = out[column].astype("category")
+    if float32:
+        for column in _present(out, FLOAT32_COLUMNS):
+            out[column] = pd.to_numeric(out[column], errors="coerce").astype(np.float32)
+    if measure:
+        after = _memory_bytes(out)
+        logger.info(
+            "Compacted %s rows from %.1f MB to %.1f MB (%.0f%% saved)",
+            len(out),
+            before / 1e6,
+            after / 1e6,
+            100 * (1 - after / before) if before else 0.0,
+        )
+    return out
 
 
 def filter_invalid_positions(df: pd.DataFrame, lat_col: str, lon_col: str) -> pd.DataFrame:
@@ -25,11 +107,104 @@ def filter_invalid_positions(df: pd.DataFrame, lat_col: str, lon_col: str) -> pd
     return df
 
 
-def deduplicate_records(df: pd.DataFrame, subset: list[str]) -> pd.DataFrame:
-    """Drop duplicate observations while preserving the latest entries."""
-    # TODO: Use DataFrame.drop_duplicates with keep='last'.
-    logger.debug("Deduplicating records on subset %s", subset)
-    return df
+def deduplicate_records(df: pd.DataFrame, subset: list[str], time_column: str = "ts_utc") -> pd.DataFrame:
+    """Drop duplicate observations while preserving the latest entries.
+
+    Rows are compared through ``record_keys`` with a hash-table kernel on
+    int64, which avoids factorizing object columns. If packed keys could wrap
+    (the frame spans 2**32 ms or more) the exact ``DataFrame.duplicated`` is
+    used instead. The order of surviving rows is preserved.
+    """
+    if df.empty:
+        return df
+    if time_column in subset and _ts_span_ms(df[time_column]) >= PACKED_TS_SPAN_MS:
+        duplicated = df.duplicated(subset, keep="last").to_numpy()
+    else:
+        duplicated = pd.Series(record_keys(df, subset, time_column)).duplicated(keep="last").to_numpy()
+    dropped = int(duplicated.sum())
+    logger.debug("Dropped %s duplicate records on subset %s", dropped, subset)
+    return df.loc[~duplicated] if dropped else df
+
+
+def record_keys(df: pd.DataFrame, subset: list[str], time_column: str = "ts_utc") -> np.ndarray:
+    """Return one int64 key per row identifying its ``subset`` values.
+
+    An integer id paired with ``time_column`` (e.g. ``mmsi`` and ``ts_utc``)
+    is packed as ``id << 32 | ts mod 2**32``, which is exact between rows
+    less than ~49.7 days apart. Other subsets (e.g. ``rf_id``) and ids that are
+    missing or do not fit are hashed to 64 bits with the sign bit set, so
+    hashed keys never equal packed ones.
+    """
+    ids = [column for column in subset if column != time_column]
+    if time_column in subset and len(ids) == 1 and df[ids[0]].dtype.kind in "iu":
+        # Missing ids (nullable ``Int64``) become -1, which is never packable.
+        values = df[ids[0]].to_numpy(dtype=np.int64, na_value=-1)
+        ts = epoch_ms_array(df[time_column])
+        keys = (values << PACKED_TS_BITS) | (ts & (PACKED_TS_SPAN_MS - 1))
+        packable = (values >= 0) & (values < _MAX_PACKED_ID)
+        if not packable.all():
+            keys = np.where(packable, keys, _hashed_keys(df, subset))
+        return keys
+    return _hashed_keys(df, subset)
+
+
+class StreamingDeduplicator:
+    """Drop duplicate records across a stream of batches using bounded memory.
+
+    Each batch is deduplicated with ``deduplicate_records`` (keep-last), then
+    checked against the keys and timestamps of records emitted within
+    ``window_ms`` of the latest timestamp seen so far. Rows already emitted in
+    an earlier batch are dropped, so across batches the first arrival wins.
+    Rows older than the window cannot be checked and pass through; they are
+    counted in ``late_rows``.
+
+    Args:
+        subset: Columns identifying a record, e.g. ``["mmsi", "ts_utc"]``.
+        window_ms: How far behind the newest record duplicates are detected;
+            must be below 2**31 ms (~24.8 days) so packed keys stay exact.
+        time_column: Epoch-millisecond timestamp column within ``subset``.
+    """
+
+    def __init__(self, subset: list[str], window_ms: int, time_column: str = "ts_utc") -> None:
+        if time_column not in subset:
+            raise ValueError(f"subset must include the time column {time_column!r}")
+        if not 0 < window_ms < PACKED_TS_SPAN_MS // 2:
+            raise ValueError(f"window_ms must be in (0, {PACKED_TS_SPAN_MS // 2})")
+        self.subset = list(subset)
+        self.window_ms = int(window_ms)
+        self.time_column = time_column
+        self.watermark: Optional[int] = None
+        self.duplicates = 0
+        self.late_rows = 0
+        self._keys = np.empty(0, dtype=np.int64)
+        self._ts = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Number of keys currently remembered."""
+        return len(self._keys)
+
+    def process(self, batch: pd.DataFrame) -> pd.DataFrame:
+        """Return ``batch`` without records seen in this batch or within the window."""
+        if batch.empty:
+            return batch
+        deduped = deduplicate_records(batch, self.subset, self.time_column)
+        keys = record_keys(deduped, self.subset, self.time_column)
+        ts = epoch_ms_array(deduped[self.time_column])
+
+        positions = pd.Index(self._keys).get_indexer(keys)
+        seen = positions >= 0
+        seen[seen] = self._ts[positions[seen]] == ts[seen]
+        if self.watermark is not None:
+            self.late_rows += int((~seen & (ts < self.watermark - self.window_ms)).sum())
+        self.duplicates += len(batch) - len(deduped) + int(seen.sum())
+
+        self.watermark = int(ts.max()) if self.watermark is None else max(self.watermark, int(ts.max()))
+        cutoff = self.watermark - self.window_ms
+        retained = self._ts >= cutoff
+        remember = ~seen & (ts >= cutoff)
+        self._keys = np.concatenate([self._keys[retained], keys[remember]])
+        self._ts = np.concatenate([self._ts[retained], ts[remember]])
+        return deduped.loc[~seen] if seen.any() else deduped
 
 
 def apply_domain_rules(df: pd.DataFrame, **kwargs: Any) -> pd.DataFrame:
@@ -37,3 +212,116 @@ def apply_domain_rules(df: pd.DataFrame, **kwargs: Any) -> pd.DataFrame:
     # TODO: Implement nav_status and sog/cog plausibility checks.
     logger.debug("Applying domain-specific cleaning rules: %s", kwargs)
     return df
+
+
+def _scale_epoch(epoch: np.ndarray) -> np.ndarray:
+    """Return epoch milliseconds, scaling columns that hold epoch seconds."""
+    if len(epoch) and np.abs(epoch).max() < EPOCH_SECONDS_LIMIT:
+        logger.info("Interpreting integer timestamps as epoch seconds")
+        return epoch * 1_000
+    return epoch
+
+
+def _parse_timestamp_strings(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Parse epoch or ISO-8601 strings; return epoch ms and a validity mask."""
+    present = values.notna().to_numpy()
+    sample = values[present].iloc[0] if present.any() else None
+    if isinstance(sample, str) and not _looks_numeric(sample):
+        epoch_ms = _arrow_iso_epoch_ms(values)
+        if epoch_ms is not None:
+            return epoch_ms, present
+        try:
+            parsed = pd.to_datetime(values, utc=True, format="ISO8601")
+            valid = parsed.notna().to_numpy()
+            return epoch_ms_array(parsed.fillna(pd.Timestamp(0, tz="UTC"))), valid
+        except (ValueError, TypeError):
+            logger.debug("Timestamps are not uniformly ISO-8601; parsing per format")
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    numeric = np.isfinite(numbers)
+    epoch_ms = np.zeros(len(values), dtype=np.int64)
+    if numeric.any():
+        epoch_ms[numeric] = _scale_epoch(numbers[numeric].astype(np.int64))
+    rest = present & ~numeric
+    if rest.any():
+        parsed = pd.to_datetime(values[rest], utc=True, format="mixed", errors="coerce")
+        parsed_ok = parsed.notna().to_numpy()
+        epoch_ms[np.flatnonzero(rest)[parsed_ok]] = epoch_ms_array(parsed[parsed_ok])
+        numeric[np.flatnonzero(rest)[parsed_ok]] = True
+    return epoch_ms, numeric
+
+
+def _arrow_iso_epoch_ms(values: pd.Series) -> Optional[np.ndarray]:
+    """Parse uniform ISO-8601 strings with Arrow's cast; return None if any value does not parse.
+
+    Strings with a ``Z`` or ``+hh:mm`` offset are converted to UTC; strings
+    without one are taken as UTC.
+    """
+    try:
+        strings = pa.array(values, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+    for target in (pa.timestamp("ns", tz="UTC"), pa.timestamp("ns")):
+        try:
+            parsed = strings.cast(target)
+        except pa.ArrowInvalid:
+            continue
+        epoch_ns = pc.fill_null(parsed.cast(pa.int64()), 0).to_numpy()
+        return np.floor_divide(epoch_ns, 1_000_000)
+    return None
+
+
+def _looks_numeric(text: str) -> bool:
+    """Return True for strings such as ``"1751328000000"`` or ``"1.7e12"``."""
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _present(df: pd.DataFrame, columns: Iterable[str]) -> list[str]:
+    """Return the subset of ``columns`` present in ``df``."""
+    return [column for column in columns if column in df.columns]
+
+
+def _ts_span_ms(values: pd.Series) -> int:
+    """Return the range of an epoch-millisecond column."""
+    ts = epoch_ms_array(values)
+    return int(ts.max() - ts.min()) if len(ts) else 0
+
+
+def _hashed_keys(df: pd.DataFrame, subset: list[str]) -> np.ndarray:
+    """Hash ``subset`` values row-wise to int64 keys with the sign bit set.
+
+    Object columns are hashed without factorizing first: identifiers such as
+    ``rf_id`` are nearly unique, so categorizing only adds a pass.
+    """
+    hashed = np.zeros(len(df), dtype=np.uint64)
+    for column in subset:
+        values = df[column]
+        if values.dtype == object:
+            column_hash = pd.util.hash_array(values.to_numpy(), categorize=False)
+        else:
+            column_hash = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        hashed = hashed * _HASH_MULTIPLIER ^ column_hash
+    return (hashed | _HASHED_KEY_BIT).view(np.int64)
+
+
+def _memory_bytes(df: pd.DataFrame) -> int:
+    """Estimate the deep memory footprint of ``df`` in bytes.
+
+    Object columns are sized from an evenly spaced sample, since measuring
+    every Python string costs about as much as the conversions being logged.
+    """
+    # Sized from the arrays directly: DataFrame.memory_usage builds a Series per
+    # call, whose warning filters recompile regexes once the ``re`` cache churns.
+    total = int(df.index.nbytes)
+    step = max(1, len(df) // MEMORY_SAMPLE_ROWS)
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object and len(values):
+            sample = values.iloc[::step]
+            total += int(sample.memory_usage(index=False, deep=True) / len(sample) * len(values))
+        else:
+            total += int(values.array.nbytes)
+    return total
@@ -0,0 +1,127 @@
+"""RF geolocation quality pruning: TDOA cluster collapse and uncertainty cut-off."""
+from __future__ import annotations
+
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from schemas.components import RFQualityConfig
+from utils.arrow import numeric_view
+from utils.geo import EARTH_RADIUS_KM
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def collapse_tdoa_clusters(df: pd.DataFrame, config: RFQualityConfig) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Collapse clustered TDOA/MLAT solutions to one centroid row and drop imprecise fixes.
+
+    Members of a cluster are combined with inverse-variance weights
+    ``1 / geo_uncertainty_m**2``; the centroid is the weighted mean of their
+    unit vectors, so clusters straddling the antimeridian average correctly.
+    The centroid's uncertainty is the standard error ``sqrt(1 / sum(w))``,
+    raised to the weighted RMS scatter of the members when they disagree by
+    more than their stated uncertainties. The surviving row keeps the
+    identifiers and attributes of the cluster's most precise member and gains
+    ``cluster_size``. Rows without a cluster id pass through unchanged.
+    Missing uncertainties count as ``default_uncertainty_m``. Finally rows
+    whose uncertainty exceeds ``u_max_m`` are dropped.
+
+    Returns:
+        Tuple of the pruned frame and metrics describing how much it shrank.
+    """
+    rows_in = len(df)
+    metrics: Dict[str, Any] = {"rf_rows_in": rows_in, "clusters": 0, "rows_collapsed": 0, "rows_over_u_max": 0}
+    if df.empty or not config.enabled:
+        metrics.update(rf_rows_out=rows_in, shrink_ratio=0.0)
+        return df, metrics
+
+    uncertainty = _uncertainty_m(df, config)
+    if config.cluster_column in df.columns:
+        codes, uniques = pd.factorize(df[config.cluster_column], sort=False)
+        clustered = codes >= 0
+        if clustered.any():
+            df, uncertainty = _collapse(df, uncertainty, codes, clustered, len(uniques))
+            metrics["clusters"] = len(uniques)
+            metrics["rows_collapsed"] = rows_in - len(df)
+
+    over = uncertainty > config.u_max_m
+    metrics["rows_over_u_max"] = int(over.sum())
+    if over.any():
+        df = df.loc[~over]
+    df = df.reset_index(drop=True)
+
+    metrics["rf_rows_out"] = len(df)
+    metrics["shrink_ratio"] = 1.0 - len(df) / rows_in
+    logger.info(
+        "RF quality: %s -> %s rows (%.1f%% fewer; %s merged into %s clusters, %s above U_MAX %.0f m)",
+        rows_in,
+        len(df),
+        100 * metrics["shrink_ratio"],
+        metrics["rows_collapsed"],
+        metrics["clusters"],
+        metrics["rows_over_u_max"],
+        config.u_max_m,
+    )
+    return df, metrics
+
+
+def _collapse(
+    df: pd.DataFrame,
+    uncertainty: np.ndarray,
+    codes: np.ndarray,
+    clustered: np.ndarray,
+    n_clusters: int,
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Replace each cluster by its inverse-variance centroid using grouped bincount reductions."""
+    group = codes[clustered]
+    weight = 1.0 / (uncertainty[clustered] / 1_000) ** 2
+    lat = np.radians(numeric_view(df["est_lat"])[clustered])
+    lon = np.radians(numeric_view(df["est_lon"])[clustered])
+    xyz = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+    weight_sum = np.bincount(group, weights=weight, minlength=n_clusters)
+    centroid = np.stack([np.bincount(group, weights=weight * axis, minlength=n_clusters) for axis in xyz])
+    centroid /= np.linalg.norm(centroid, axis=0)
+    centroid_lat = np.degrees(np.arcsin(np.clip(centroid[2], -1.0, 1.0)))
+    centroid_lon = np.degrees(np.arctan2(centroid[1], centroid[0]))
+
+    # Chord distance of each member from its centroid, in km (accurate at these scales).
+    offset_km = np.linalg.norm(xyz - centroid[:, group], axis=0) * EARTH_RADIUS_KM
+    scatter_km2 = np.bincount(group, weights=weight * offset_km**2, minlength=n_clusters) / weight_sum
+    centroid_unc_m = np.sqrt(np.maximum(1.0 / weight_sum, scatter_km2)) * 1_000
+
+    # Representative row per cluster: its most precise member.
+    rows = np.flatnonzero(clustered)
+    order = np.lexsort((-weight, group))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = group[order][1:] != group[order][:-1]
+    representative = rows[order[first]]
+    cluster_of = group[order[first]]
+    sizes = np.bincount(group, minlength=n_clusters)
+
+    keep = np.sort(np.concatenate([np.flatnonzero(~clustered), representative]))
+    out = df.iloc[keep].copy()
+    position = np.searchsorted(keep, representative)
+    cluster_size = np.ones(len(keep), dtype=np.int32)
+    cluster_size[position] = sizes[cluster_of]
+    new_uncertainty = uncertainty[keep].copy()
+    new_uncertainty[position] = centroid_unc_m[cluster_of]
+
+    for column, centroid_values in (("est_lat", centroid_lat), ("est_lon", centroid_lon)):
+        values = numeric_view(out[column]).copy()
+        values[position] = centroid_values[cluster_of]
+        out[column] = pd.array(values, dtype=out[column].dtype)
+    out["geo_uncertainty_m"] = new_uncertainty.astype(np.float64)
+    out["cluster_size"] = cluster_size
+    return out, new_uncertainty
+
+
+def _uncertainty_m(df: pd.DataFrame, config: RFQualityConfig) -> np.ndarray:
+    """Return positive per-row uncertainty in metres, using the default where missing."""
+    if "geo_uncertainty_m" not in df.columns:
+        return np.full(len(df), config.default_uncertainty_m)
+    values = numeric_view(pd.to_numeric(df["geo_uncertainty_m"], errors="coerce"))
+    return np.where(np.isfinite(values) & (values > 0), values, config.default_uncertainty_m)
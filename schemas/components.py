@@ -0,0 +1,277 @@
+"""Config dataclasses of the pipeline components.
+
+They depend on the standard library only, so ``main_pipeline.py validate``
+checks every config block without importing pandas, pyarrow or the pipeline
+modules. Each component module re-exports the config it takes.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional, Tuple
+
+DTYPE_BACKENDS = ("numpy", "pyarrow")
+INDEX_TYPES = ("h3", "geohash")
+
+
+def check_dtype_backend(dtype_backend: str) -> str:
+    """Return ``dtype_backend`` if supported, else raise ValueError."""
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(f"Unsupported dtype_backend {dtype_backend!r}; expected one of {DTYPE_BACKENDS}")
+    return dtype_backend
+
+
+@dataclass
+class DataSourceConfig:
+    """Runtime configuration for a data source."""
+
+    type: str  # "local" or "s3"
+    path: Optional[str] = None
+    format: str = "parquet"
+    options: Optional[Dict[str, Any]] = None
+    s3: Optional[Dict[str, Any]] = None
+    # Optional pushdown filters; see ``build_dataset_filter``.
+    time_range: Optional[Tuple[Any, Any]] = None  # [start, end) epoch ms, ISO strings or datetimes
+    bbox: Optional[Tuple[float, float, float, float]] = None  # (min_lon, min_lat, max_lon, max_lat)
+    mmsi: Optional[list[int]] = None
+    partitioning: Optional[str] = None  # "date" for YYYY/MM/DD directories, or "hive"
+    # Multi-object reads (S3 prefixes and ZIP archives).
+    max_workers: int = 8
+    max_retries: int = 3
+    # Optional on-disk cache for remote objects; keys of ``utils.cache.CacheConfig``.
+    cache: Optional[Dict[str, Any]] = None
+    # "numpy" for pandas' default dtypes, "pyarrow" for pd.ArrowDtype columns; see ``utils.arrow``.
+    dtype_backend: str = "numpy"
+
+    @property
+    def is_multi_object(self) -> bool:
+        """Whether the source is a ZIP archive or a prefix of many objects."""
+        if self.format == "zip":
+            return True
+        return self.type == "s3" and str((self.s3 or {}).get("key", "")).endswith("/")
+
+    @property
+    def has_pushdown(self) -> bool:
+        """Whether reads should go through a filtered pyarrow dataset scan."""
+        return any(v is not None for v in (self.time_range, self.bbox, self.mmsi, self.partitioning))
+
+
+@dataclass
+class IngestConfig:
+    """Configuration for overlapped ingestion."""
+
+    concurrent: bool = True
+    max_workers: int = 2
+
+
+@dataclass
+class PreprocessingConfig:
+    """Configuration for input cleaning and the in-memory column layout."""
+
+    float32: bool = False  # store sog/cog/rssi as float32
+    dtype_backend: str = "numpy"  # or "pyarrow"; see ``utils.arrow``
+
+
+@dataclass
+class IndexingConfig:
+    """Configuration for the H3/geohash spatiotemporal index."""
+
+    type: str = "h3"  # or "geohash"; h3 falls back to geohash when not installed
+    resolution: int = 7
+    time_bucket_minutes: float = 5.0
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "IndexingConfig":
+        """Build from the ``indexing`` block, ignoring keys meant for other components.
+
+        Raises:
+            ValueError: ``type`` is neither ``h3`` nor ``geohash``.
+        """
+        index_type = str(config.get("type", cls.type)).lower()
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported index type: {index_type}")
+        return cls(
+            type=index_type,
+            resolution=int(float(config.get("resolution", cls.resolution))),
+            time_bucket_minutes=float(config.get("time_bucket_minutes", cls.time_bucket_minutes)),
+        )
+
+
+@dataclass
+class RFQualityConfig:
+    """Configuration for RF cluster collapse and pruning (README §3.3)."""
+
+    enabled: bool = True
+    cluster_column: str = "tdoa_cluster_id"
+    u_max_m: float = 5_000.0
+    default_uncertainty_m: float = 1_000.0
+
+
+@dataclass
+class EntityResolutionConfig:
+    """Configuration for linking RF detections to AIS vessels."""
+
+    time_bucket_minutes: float = 5.0
+    cell_km: float = 10.0
+    gate_sigma: float = 3.0
+    default_uncertainty_m: float = 1_000.0
+    max_speed_knots: float = 30.0
+    min_confidence: float = 0.05
+    mapping_table: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "EntityResolutionConfig":
+        """Build from a config block, ignoring keys meant for other components."""
+        known = {f.name: f.type for f in fields(cls)}
+        values = {}
+        for key, value in config.items():
+            if key not in known or value is None:
+                continue
+            values[key] = value if key == "mapping_table" else float(value)
+        return cls(**values)
+
+
+@dataclass
+class GapFillConfig:
+    """Configuration for gap fill algorithm."""
+
+    gap_threshold_minutes: int
+    candidate_radius_km: float
+    viterbi_transition_penalty: float
+    min_candidate_score: float
+    max_speed_knots: float = 30.0
+    viterbi_step_minutes: float = 5.0
+    beam_width: Optional[int] = None
+    candidate_slice_minutes: float = 10.0
+    candidate_cell_km: float = 50.0
+    fill_interval_minutes: float = 1.0  # cadence of interpolated fill points; 0 keeps RF anchors only
+
+
+@dataclass
+class SpoofDetectionConfig:
+    """Configuration for spoof detection thresholding and correction."""
+
+    residual_threshold_km: float
+    spoof_score_threshold: float
+    smoothing_window: int
+    # Reach of AIS-RF residual pairing: detections this close to a ping in time and space.
+    residual_window_minutes: float = 5.0
+    residual_search_km: float = 100.0
+
+
+@dataclass
+class ParallelConfig:
+    """Configuration for sharded process-pool execution."""
+
+    workers: int = 1
+    shards: Optional[int] = None  # defaults to 4 shards per worker
+    # Parent directory of the memory-mapped RF index shared with workers
+    # (e.g. /dev/shm or local NVMe); the system temp directory by default.
+    rf_store_dir: Optional[str] = None
+
+    @property
+    def shard_count(self) -> int:
+        return int(self.shards or 4 * max(1, self.workers))
+
+
+@dataclass
+class StreamSourceConfig:
+    """Configuration for the streaming record source."""
+
+    source: str = "file"  # file, socket or queue
+    path: Optional[str] = None  # file source
+    follow: bool = False  # keep reading appended lines, like ``tail -f``
+    poll_interval_s: float = 0.1
+    host: str = "127.0.0.1"  # socket source
+    port: int = 5555
+    idle_timeout_s: float = 1.0
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "StreamSourceConfig":
+        """Build from the ``streaming`` config block, ignoring keys meant for other components."""
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in config.items() if key in known and value is not None})
+
+
+@dataclass
+class OnlineFusionConfig:
+    """Configuration for the streaming fusion engine."""
+
+    allowed_lateness_ms: int = 2_000
+    max_gap_minutes: float = 240.0  # open gaps older than this take no more fills
+    state_ttl_minutes: float = 720.0  # forget vessels silent for this long
+    latency_samples: int = 100_000  # most recent per-record latencies kept for percentiles
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "OnlineFusionConfig":
+        """Build from the ``streaming`` config block, ignoring keys meant for other components."""
+        known = {f.name: f.type for f in fields(cls)}
+        values = {}
+        for key, value in config.items():
+            if key in known and value is not None:
+                values[key] = float(value) if known[key] == "float" else int(value)
+        return cls(**values)
+
+
+@dataclass
+class StreamOutputConfig:
+    """Where the streaming mode writes fused records and how often it reports engine stats."""
+
+    output_path: str = "-"  # JSON lines; - for stdout
+    stats_interval_s: float = 10.0
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "StreamOutputConfig":
+        """Build from the ``streaming`` config block, ignoring keys meant for other components."""
+        output_path, stats_interval_s = config.get("output_path"), config.get("stats_interval_s")
+        return cls(
+            output_path=cls.output_path if output_path is None else str(output_path),
+            stats_interval_s=cls.stats_interval_s if stats_interval_s is None else float(stats_interval_s),
+        )
+
+
+@dataclass
+class OutputConfig:
+    """Configuration for writing fused outputs."""
+
+    directory: str
+    format: str = "parquet"
+    partition_cols: Optional[list[str]] = None
+    manifest_name: str = "manifest.json"
+    dataset_name: str = "fused_output"
+    row_group_rows: int = 250_000
+    target_file_bytes: int = 256 * 1024 * 1024
+    compression: str = "snappy"
+    use_threads: bool = True
+
+
+@dataclass
+class AuditConfig:
+    """Configuration for audit trail persistence."""
+
+    directory: str
+    filename: str = "audit.log"
+    buffer_events: int = 1000  # flush once this many events are buffered
+    flush_interval_s: float = 5.0  # ...or when the oldest buffered event is this old
+    max_bytes: int = 64 * 1024**2  # rotate the log past this size; 0 disables rotation
+    backup_count: int = 5
+    background: bool = False  # write flushed batches on a background thread
+    records_dirname: str = "records"
+
+
+@dataclass
+class CheckpointConfig:
+    """Configuration for the stage checkpoint cache."""
+
+    directory: str = "./outputs/checkpoints"
+    enabled: bool = True
+    keep_per_stage: int = 3
+
+
+@dataclass
+class ProfilingConfig:
+    """Configuration for stage instrumentation and profiler dumps."""
+
+    directory: str = "./outputs/profiles"
+    metrics_name: str = "stage_metrics.json"
+    profile_stage: Optional[str] = None
+    profiler: str = "cprofile"  # or "pyinstrument" when installed
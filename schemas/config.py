@@ -1,7 +1,7 @@
 """Configuration schemas for the AIS-RF fusion pipeline."""
 from __future__ import annotations
 
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import BaseModel, Field, validator
 
@@ -15,14 +15,29 @@ class S3Config(BaseModel):
     profile: Optional[str] = None
 
 
+class CacheConfigSchema(BaseModel):
+    """Configuration for the local cache of remote input objects."""
+
+    directory: str
+    max_bytes: int = 20 * 1024**3
+    store_decoded: bool = True
+
+
 class DataSourceConfigSchema(BaseModel):
     """Generic data source configuration supporting local and S3 inputs."""
 
     type: str = Field(..., regex=r"^(s3|local)$")
     path: Optional[str]
     s3: Optional[S3Config]
-    format: str = Field(..., regex=r"^(csv|parquet)$")
-    options: Dict[str, str] = Field(default_factory=dict)
+    format: str = Field(..., regex=r"^(csv|parquet|zip)$")
+    options: Dict[str, Any] = Field(default_factory=dict)
+    time_range: Optional[Tuple[Union[int, str], Union[int, str]]] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    mmsi: Optional[List[int]] = None
+    partitioning: Optional[str] = Field(None, regex=r"^(date|hive)$")
+    max_workers: int = 8
+    max_retries: int = 3
+    cache: Optional[CacheConfigSchema] = None
 
     @validator("path")
     def validate_path(cls, value: Optional[str], values):  # type: ignore[override]
@@ -38,5 +53,13 @@ class PipelineConfig(BaseModel):
     gap_fill: Dict[str, float]
     spoof_detection: Dict[str, float]
     indexing: Dict[str, str]
-    output: Dict[str, str]
-    audit: Dict[str, str]
+    output: Dict[str, Any]
+    audit: Dict[str, Any]
+    parallel: Dict[str, Any] = Field(default_factory=dict)
+    checkpoint: Dict[str, Any] = Field(default_factory=dict)
+    profiling: Dict[str, Any] = Field(default_factory=dict)
+    preprocessing: Dict[str, Any] = Field(default_factory=dict)
+    entity_resolution: Dict[str, Any] = Field(default_factory=dict)
+    rf_quality: Dict[str, Any] = Field(default_factory=dict)
+    ingest: Dict[str, Any] = Field(default_factory=dict)
+    streaming: Dict[str, Any] = Field(default_factory=dict)
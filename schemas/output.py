@@ -2,9 +2,19 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, Field
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pydantic import BaseModel, Field, ValidationError
+
+from utils.arrow import numeric_view
+from utils.logging import get_logger
+from utils.time import epoch_ms_array
+
+
+logger = get_logger(__name__)
 
 
 class N6Record(BaseModel):
@@ -25,7 +35,189 @@ class N6Record(BaseModel):
     gap_fill_score: Optional[float] = None
 
 
-def map_to_n6_schema(fused_df):
-    """Convert fused DataFrame records into the N6 schema."""
-    # TODO: Implement mapping using N6Record.parse_obj for validation.
-    raise NotImplementedError("N6 mapping logic not yet implemented.")
+N6_SOURCES = ("AIS", "RF", "fused")
+
+# Pipeline column names that feed N6 fields under a different name.
+N6_COLUMN_ALIASES: Dict[str, str] = {
+    "source_tag": "source",
+    "fill_method": "fusion_method",
+    "fill_confidence": "gap_fill_score",
+    "rf_id": "rf_reference_id",
+}
+
+# Inclusive value ranges checked column-wise before conversion.
+N6_VALUE_RANGES: Dict[str, Tuple[float, float]] = {
+    "mmsi": (0, 999_999_999),
+    "lat": (-90.0, 90.0),
+    "lon": (-180.0, 180.0),
+    "sog": (0.0, 102.3),
+    "cog": (0.0, 360.0),
+    "spoof_score": (0.0, 1.0),
+    "gap_fill_score": (0.0, 1.0),
+}
+
+_ARROW_TYPES: Dict[Any, pa.DataType] = {
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+    datetime: pa.timestamp("ms", tz="UTC"),
+}
+
+
+def n6_arrow_schema() -> pa.Schema:
+    """Derive the Arrow schema of N6 output from ``N6Record``."""
+    fields = []
+    for name, model_field in N6Record.__fields__.items():
+        fields.append(pa.field(name, _ARROW_TYPES[model_field.type_], nullable=not model_field.required))
+    return pa.schema(fields)
+
+
+def map_to_n6_schema(fused_df: pd.DataFrame, sample_size: int = 0) -> Tuple[pa.Table, pd.DataFrame]:
+    """Convert fused DataFrame records into the N6 schema.
+
+    Mapping and validation run column-wise: aliases are renamed, each field
+    is cast to its ``N6Record`` type, and null-ability, range and ``source``
+    enum checks are evaluated as boolean masks.
+
+    Args:
+        fused_df: Fused AIS/RF records.
+        sample_size: Number of accepted rows to re-validate through
+            ``N6Record.parse_obj`` as a guard against drift between these
+            vectorized rules and the model.
+
+    Returns:
+        Tuple of the accepted rows as an Arrow table with ``n6_arrow_schema()``
+        and the rejected input rows with a ``reject_reason`` column.
+    """
+    schema = n6_arrow_schema()
+    frame = fused_df.rename(columns={k: v for k, v in N6_COLUMN_ALIASES.items() if v not in fused_df.columns})
+    if "source" not in frame.columns:
+        frame = frame.assign(source="AIS")
+    n_rows = len(frame)
+
+    arrays: List[pa.Array] = []
+    failures: List[Tuple[str, np.ndarray]] = []
+    for field in schema:
+        if field.name not in frame.columns:
+            arrays.append(pa.nulls(n_rows, type=field.type))
+            if not field.nullable:
+                failures.append((f"missing {field.name}", np.ones(n_rows, dtype=bool)))
+            continue
+        raw = frame[field.name]
+        missing = pd.isna(raw).to_numpy()
+        values, invalid = _cast_column(raw, field.type, missing)
+        if invalid.any():
+            failures.append((f"invalid {field.name}", invalid))
+        if not field.nullable:
+            failures.append((f"missing {field.name}", missing))
+        bounds = N6_VALUE_RANGES.get(field.name)
+        if bounds is not None:
+            with np.errstate(invalid="ignore"):
+                out_of_range = (values < bounds[0]) | (values > bounds[1])
+            failures.append((f"{field.name} out of range", out_of_range))
+        arrays.append(_to_arrow(values, missing | invalid, field.type))
+
+    source = frame["source"]
+    failures.append(("unknown source", (~source.isin(N6_SOURCES) & source.notna()).to_numpy()))
+
+    rejected = np.zeros(n_rows, dtype=bool)
+    reasons = pd.Series("", index=frame.index, dtype="object")
+    for label, mask in failures:
+        if mask.any():
+            rejected |= mask
+            reasons = reasons.mask(mask, reasons + label + ";")
+
+    table = pa.Table.from_arrays(arrays, schema=schema)
+    if rejected.any():
+        table = table.filter(pa.array(~rejected))
+    rejects = fused_df.loc[rejected].copy()
+    rejects["reject_reason"] = reasons[rejected].str.rstrip(";").to_numpy()
+    logger.info("Mapped %s records to N6; rejected %s", table.num_rows, len(rejects))
+    if sample_size and table.num_rows:
+        _spot_check(table, sample_size)
+    return table, rejects
+
+
+def _cast_column(raw: pd.Series, arrow_type: pa.DataType, missing: np.ndarray) -> Tuple[Any, np.ndarray]:
+    """Cast a column towards ``arrow_type``; return the values and an uncastable-value mask.
+
+    Numeric and timestamp values come back as numpy arrays (float64 for range
+    checks on numbers, int64 for complete integer columns), strings as an
+    Arrow array. Values of an object column that are not strings are flagged
+    and nulled, so one stray value rejects its row rather than failing the
+    conversion.
+    """
+    no_failures = np.zeros(len(raw), dtype=bool)
+    if pa.types.is_timestamp(arrow_type):
+        if pd.api.types.is_numeric_dtype(raw.dtype) and not missing.any():
+            return epoch_ms_array(raw), no_failures
+        if pd.api.types.is_numeric_dtype(raw.dtype):
+            converted = pd.to_datetime(raw, unit="ms", utc=True, errors="coerce")
+        else:
+            converted = pd.to_datetime(raw, utc=True, errors="coerce")
+        invalid = converted.isna().to_numpy() & ~missing
+        epoch_ms = converted.dt.tz_localize(None).to_numpy(dtype="datetime64[ms]").astype(np.int64)
+        return epoch_ms, invalid
+    if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type):
+        if pa.types.is_integer(arrow_type) and pd.api.types.is_integer_dtype(raw.dtype) and not missing.any():
+            return numeric_view(raw, np.int64), no_failures
+        if pd.api.types.is_numeric_dtype(raw.dtype) and not pd.api.types.is_bool_dtype(raw.dtype):
+            values = numeric_view(raw, np.float64)
+            invalid = no_failures
+        else:
+            values = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            invalid = np.isnan(values) & ~missing
+        if pa.types.is_integer(arrow_type):
+            with np.errstate(invalid="ignore"):
+                invalid = invalid | (~np.isnan(values) & (values != np.round(values)))
+        return values, invalid
+    if isinstance(raw.dtype, (pd.ArrowDtype, pd.CategoricalDtype)):
+        values = pa.array(raw, from_pandas=True)
+        if isinstance(values, pa.ChunkedArray):
+            values = values.combine_chunks()
+        if pa.types.is_dictionary(values.type):
+            values = values.dictionary_decode()
+        return values, no_failures
+    values = raw.to_numpy(dtype=object)
+    try:
+        strings = pa.array(values, from_pandas=True)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        strings = None
+    if strings is not None and (pa.types.is_string(strings.type) or pa.types.is_null(strings.type)):
+        return strings, no_failures
+    invalid = ~missing & np.fromiter((not isinstance(v, str) for v in values), dtype=bool, count=len(values))
+    return np.where(invalid, None, values), invalid
+
+
+def _to_arrow(values: Any, null_mask: np.ndarray, arrow_type: pa.DataType) -> pa.Array:
+    """Build an Arrow array of ``arrow_type`` with nulls where ``null_mask`` is set.
+
+    Arrays already in Arrow carry their own nulls and are only cast.
+    """
+    if isinstance(values, pa.Array):
+        return values if values.type == arrow_type else values.cast(arrow_type)
+    mask = null_mask if null_mask.any() else None
+    if pa.types.is_timestamp(arrow_type):
+        return pa.array(values, type=pa.int64(), mask=mask).cast(arrow_type)
+    if pa.types.is_integer(arrow_type) and mask is None and values.dtype == np.int64:
+        return pa.array(values, type=arrow_type)
+    if pa.types.is_integer(arrow_type):
+        integers = np.where(null_mask, 0, values).astype(np.int64)
+        return pa.array(integers, type=arrow_type, mask=mask)
+    if pa.types.is_floating(arrow_type):
+        return pa.array(values, type=arrow_type, mask=mask)
+    strings = pa.array(values, mask=mask, from_pandas=True)
+    return strings if strings.type == arrow_type else strings.cast(arrow_type)
+
+
+def _spot_check(table: pa.Table, sample_size: int) -> None:
+    """Validate a deterministic sample of mapped rows through ``N6Record``."""
+    rng = np.random.default_rng(0)
+    positions = rng.choice(table.num_rows, size=min(sample_size, table.num_rows), replace=False)
+    sample = table.take(pa.array(np.sort(positions))).to_pylist()
+    for record in sample:
+        try:
+            N6Record.parse_obj(record)
+        except ValidationError as exc:
+            raise ValueError(f"N6 spot check failed for record {record}: {exc}") from exc
+    logger.debug("N6 spot check validated %s sampled records", len(sample))
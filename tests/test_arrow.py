@@ -0,0 +1,48 @@
+"""Zero-copy column access through ``numeric_view``."""
+from __future__ import annotations
+
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from utils.arrow import COPY_COUNTER, numeric_view, table_to_pandas
+
+
+@pytest.fixture
+def arrow_frame() -> Iterator[pd.DataFrame]:
+    table = pa.table(
+        {
+            "ts_utc": pa.array(np.arange(1_000, dtype=np.int64)),
+            "lat": pa.array(np.linspace(-60.0, 60.0, 1_000)),
+            "sog": pa.array([1.5, None] * 500, type=pa.float64()),
+        }
+    )
+    COPY_COUNTER.reset()
+    yield table_to_pandas(table, "pyarrow")
+    COPY_COUNTER.reset()
+
+
+def test_arrow_backed_columns_are_viewed_without_copying(arrow_frame: pd.DataFrame) -> None:
+    ts = numeric_view(arrow_frame["ts_utc"], np.int64)
+    lat = numeric_view(arrow_frame["lat"], np.float64)
+
+    assert COPY_COUNTER.snapshot()["copies"] == 0
+    buffer = arrow_frame["lat"].array.__arrow_array__().chunk(0).buffers()[1]
+    assert lat.__array_interface__["data"][0] == buffer.address
+    assert not lat.flags.writeable
+    assert ts.dtype == np.int64 and ts[-1] == 999
+
+
+def test_dtype_change_and_nulls_are_counted_as_copies(arrow_frame: pd.DataFrame) -> None:
+    ts = numeric_view(arrow_frame["ts_utc"], np.float64)
+    sog = numeric_view(arrow_frame["sog"], np.float64)
+
+    assert ts.dtype == np.float64
+    assert np.isnan(sog[1::2]).all()
+    snapshot = COPY_COUNTER.snapshot()
+    assert snapshot["copies"] == 2
+    assert snapshot["by_column"] == {"ts_utc": 1, "sog": 1}
+    assert snapshot["bytes_copied"] == ts.nbytes + sog.nbytes
@@ -0,0 +1,45 @@
+"""Time-based flushing of ``AuditSink``."""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from output.audit import AuditConfig, AuditSink
+
+
+def wait_for_lines(path: Path, timeout_s: float = 5.0) -> list:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if path.exists() and path.read_text():
+            return path.read_text().splitlines()
+        time.sleep(0.01)
+    return []
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_lone_event_is_flushed_after_the_interval(tmp_path, background: bool) -> None:
+    config = AuditConfig(directory=str(tmp_path), buffer_events=1_000, flush_interval_s=0.05, background=background)
+    with AuditSink(config) as sink:
+        sink.record({"event": "spoof_alert", "mmsi": 111})
+
+        lines = wait_for_lines(tmp_path / config.filename)
+
+        assert [json.loads(line)["event"] for line in lines] == ["spoof_alert"]
+        assert json.loads(lines[0])["timestamp"].endswith("+00:00")
+        sink.record({"event": "stream_stats"})
+    assert len((tmp_path / config.filename).read_text().splitlines()) == 2
+
+
+def test_timer_write_errors_are_raised_from_close(tmp_path) -> None:
+    config = AuditConfig(directory=str(tmp_path), filename="audit.log", flush_interval_s=0.01)
+    sink = AuditSink(config)
+    (tmp_path / "audit.log").mkdir()  # appending to a directory fails
+    sink.record({"event": "spoof_alert"})
+    sink._timer.join(timeout=5.0)  # the timer stops after a failed write
+    (tmp_path / "audit.log").rmdir()
+
+    with pytest.raises(OSError):
+        sink.close()
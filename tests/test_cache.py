@@ -0,0 +1,48 @@
+"""``ObjectCache`` eviction: fetches that race with it and when it scans."""
+from __future__ import annotations
+
+import fsspec
+
+from utils.cache import CacheConfig, ObjectCache
+
+
+def test_fetch_returns_readable_copy_when_entry_is_evicted(tmp_path) -> None:
+    source = tmp_path / "remote.bin"
+    source.write_bytes(b"x" * 4096)
+    fs = fsspec.filesystem("file")
+    cache = ObjectCache(CacheConfig(directory=str(tmp_path / "cache"), max_bytes=1))
+    key = cache.object_key(str(source), fs.info(str(source)))
+
+    handle, downloaded = cache.fetch(fs, str(source), key)
+    with handle:
+        assert handle.read() == source.read_bytes()
+    assert downloaded == 4096
+    assert not (cache.objects_dir / key).exists()
+    assert not (cache.locks_dir / f"{key}.lock").exists()
+
+    handle, downloaded = cache.fetch(fs, str(source), key)
+    with handle:
+        assert handle.read() == source.read_bytes()
+    assert downloaded == 4096
+
+
+def test_directory_is_scanned_only_when_writes_may_exceed_max_bytes(tmp_path, monkeypatch) -> None:
+    fs = fsspec.filesystem("file")
+    cache = ObjectCache(CacheConfig(directory=str(tmp_path / "cache"), max_bytes=10_000))
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or evict())
+
+    keys = []
+    for i in range(6):
+        source = tmp_path / f"remote-{i}.bin"
+        source.write_bytes(b"x" * 3_000)
+        keys.append(cache.object_key(str(source), fs.info(str(source))))
+        handle, _ = cache.fetch(fs, str(source), keys[-1])
+        handle.close()
+        cache.fetch(fs, str(source), keys[-1])[0].close()  # hits write nothing
+
+    # The first download scans, then only the 4th, 5th and 6th, which cross 10 kB.
+    assert len(scans) == 4
+    remaining = [key for key in keys if (cache.objects_dir / key).exists()]
+    assert remaining == keys[-3:]
@@ -0,0 +1,101 @@
+"""RF candidate generation for gaps against a brute-force reachability check."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from algorithms.candidates import CANDIDATE_COLUMNS, generate_candidates
+from algorithms.gap_fill import CANDIDATE_WINDOW_MS, KNOTS_TO_KMH, GapFillConfig
+from utils.geo import haversine_km
+
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+MINUTE_MS = 60_000
+
+
+def wrap(lon: np.ndarray) -> np.ndarray:
+    return (lon + 180.0) % 360.0 - 180.0
+
+
+def brute_force(gaps: pd.DataFrame, rf: pd.DataFrame, config: GapFillConfig) -> set:
+    speed = config.max_speed_knots * KNOTS_TO_KMH / 3_600_000
+    t0 = gaps["start_ts"].to_numpy()[:, None]
+    t1 = gaps["end_ts"].to_numpy()[:, None]
+    ts = rf["ts_utc"].to_numpy()[None, :]
+    lat, lon = rf["est_lat"].to_numpy(), rf["est_lon"].to_numpy()
+    from_start = haversine_km(gaps["start_lat"].to_numpy()[:, None], gaps["start_lon"].to_numpy()[:, None], lat, lon)
+    from_end = haversine_km(gaps["end_lat"].to_numpy()[:, None], gaps["end_lon"].to_numpy()[:, None], lat, lon)
+    keep = (ts >= t0 - CANDIDATE_WINDOW_MS) & (ts <= t1 + CANDIDATE_WINDOW_MS)
+    keep &= from_start <= speed * np.maximum(ts - t0, 0) + config.candidate_radius_km
+    keep &= from_end <= speed * np.maximum(t1 - ts, 0) + config.candidate_radius_km
+    gap_pos, rf_rows = np.nonzero(keep)
+    return set(zip(gaps["gap_id"].to_numpy()[gap_pos].tolist(), rf_rows.tolist()))
+
+
+@pytest.mark.parametrize("cell_km, slice_minutes", [(50.0, 10.0), (7.0, 3.0), (400.0, 60.0)])
+def test_candidates_match_brute_force(cell_km: float, slice_minutes: float) -> None:
+    rng = np.random.default_rng(5)
+    n_gaps, n_rf = 150, 6_000
+    # Gaps cluster near the antimeridian and in the Arctic, where grid columns wrap and narrow.
+    start_lat = np.concatenate([rng.uniform(-10.0, 10.0, 75), rng.uniform(70.0, 88.0, 75)])
+    start_lon = wrap(rng.uniform(170.0, 190.0, n_gaps))
+    start_ts = START_MS + rng.integers(0, 12 * 60, n_gaps) * MINUTE_MS
+    duration = rng.integers(10, 180, n_gaps) * MINUTE_MS
+    gaps = pd.DataFrame(
+        {
+            "gap_id": np.arange(n_gaps) * 3,
+            "mmsi": rng.integers(100, 200, n_gaps),
+            "start_ts": start_ts,
+            "end_ts": start_ts + duration,
+            "start_lat": start_lat,
+            "start_lon": start_lon,
+            "end_lat": np.clip(start_lat + rng.normal(0.0, 0.5, n_gaps), -89.0, 89.0),
+            "end_lon": wrap(start_lon + rng.normal(0.0, 2.0, n_gaps)),
+        }
+    )
+    rf = pd.DataFrame(
+        {
+            "rf_id": [f"rf-{i}" for i in range(n_rf)],
+            "ts_utc": START_MS + rng.integers(-30, 16 * 60, n_rf) * MINUTE_MS,
+            "est_lat": np.concatenate([rng.uniform(-12.0, 12.0, n_rf // 2), rng.uniform(68.0, 90.0, n_rf // 2)]),
+            "est_lon": wrap(rng.uniform(165.0, 195.0, n_rf)),
+            "geo_uncertainty_m": rng.uniform(100.0, 2_000.0, n_rf),
+        }
+    )
+    config = GapFillConfig(
+        gap_threshold_minutes=10,
+        candidate_radius_km=25.0,
+        viterbi_transition_penalty=0.15,
+        min_candidate_score=0.6,
+        candidate_cell_km=cell_km,
+        candidate_slice_minutes=slice_minutes,
+    )
+
+    candidates, metrics = generate_candidates(gaps, rf, config)
+
+    expected = brute_force(gaps, rf, config)
+    assert len(expected) > 100
+    assert list(candidates.columns) == CANDIDATE_COLUMNS
+    assert set(zip(candidates["gap_id"].tolist(), candidates["rf_row"].tolist())) == expected
+    assert len(candidates) == len(expected)
+    assert candidates["rf_id"].tolist() == rf["rf_id"].to_numpy()[candidates["rf_row"]].tolist()
+    assert (candidates.groupby("gap_id")["ts_utc"].diff().dropna() >= 0).all()
+    assert metrics["candidate_pairs"] == len(expected)
+    assert metrics["candidate_pairs"] <= metrics["candidate_pairs_grid"] <= metrics["candidate_pairs_time_window"]
+    assert 0.0 < metrics["candidate_pruning_rate"] < 1.0
+
+
+def test_no_candidates_without_gaps_or_rf() -> None:
+    config = GapFillConfig(
+        gap_threshold_minutes=10,
+        candidate_radius_km=25.0,
+        viterbi_transition_penalty=0.15,
+        min_candidate_score=0.6,
+    )
+    rf = pd.DataFrame({"rf_id": ["a"], "ts_utc": [START_MS], "est_lat": [0.0], "est_lon": [0.0]})
+    gaps = pd.DataFrame(columns=CANDIDATE_COLUMNS[:2] + CANDIDATE_COLUMNS[8:])
+
+    candidates, metrics = generate_candidates(gaps, rf, config)
+
+    assert candidates.empty and list(candidates.columns) == CANDIDATE_COLUMNS
+    assert metrics["candidate_pruning_rate"] is None
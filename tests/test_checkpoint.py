@@ -0,0 +1,96 @@
+"""Stage checkpoint hits and misses as inputs and config blocks change."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+import pytest
+import yaml
+
+from benchmarks.synthetic import SyntheticConfig, write_dataset
+from main_pipeline import STAGES, plan_pipeline, run_pipeline
+from utils.checkpoint import CheckpointConfig, StageCache
+from utils.config import load_config
+
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+
+
+def test_stage_cache_reuses_stored_frames_until_the_key_changes(tmp_path) -> None:
+    config = CheckpointConfig(directory=str(tmp_path))
+    calls: List[str] = []
+
+    def compute() -> tuple:
+        calls.append("compute")
+        frame = pd.DataFrame({"mmsi": [111, 222], "ts_utc": [START_MS, START_MS + 60_000]})
+        return {"fused": frame}, {"gaps": 2}
+
+    key = StageCache(config, STAGES).key("gap_fill", "upstream", {"gap_threshold_minutes": 10})
+    first = StageCache(config, STAGES).run("gap_fill", key, compute)
+    assert not first.cached
+
+    cache = StageCache(config, STAGES)
+    assert cache.is_cached("gap_fill", key)
+    second = cache.run("gap_fill", key, compute)
+    assert second.cached and calls == ["compute"]
+    assert second.metadata == {"gaps": 2} and second.rows == {"fused": 2}
+    pd.testing.assert_frame_equal(second.frame("fused"), first.frame("fused"))
+
+    changed = cache.key("gap_fill", "upstream", {"gap_threshold_minutes": 15})
+    assert changed != key and not cache.is_cached("gap_fill", changed)
+    assert not StageCache(config, STAGES, force=["gap_fill"]).is_cached("gap_fill", key)
+    assert not StageCache(CheckpointConfig(directory=str(tmp_path), enabled=False), STAGES).is_cached("gap_fill", key)
+
+
+@pytest.fixture(scope="module")
+def pipeline_config(tmp_path_factory) -> Path:
+    root = tmp_path_factory.mktemp("checkpoint")
+    data = write_dataset(SyntheticConfig(vessels=6, days=0.1, gap_rate=0.003, spoof_rate=0.001), root)
+    config = {
+        "pipeline": {
+            "ais_source": {"type": "local", "path": data["ais"], "format": "parquet"},
+            "rf_source": {"type": "local", "path": data["rf"], "format": "parquet"},
+            "gap_fill": {
+                "gap_threshold_minutes": 10,
+                "candidate_radius_km": 25.0,
+                "viterbi_transition_penalty": 0.15,
+                "min_candidate_score": 0.6,
+            },
+            "spoof_detection": {"residual_threshold_km": 20.0, "spoof_score_threshold": 0.7, "smoothing_window": 5},
+            "indexing": {"type": "geohash", "resolution": 4, "time_bucket_minutes": 5},
+            "output": {"directory": str(root / "out")},
+            "audit": {"directory": str(root / "audit")},
+            "checkpoint": {"directory": str(root / "checkpoints")},
+        }
+    }
+    path = root / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    run_pipeline(path)
+    return path
+
+
+def reused(path: Path, overrides: List[str]) -> Dict[str, bool]:
+    plan = plan_pipeline(load_config(path, overrides), check_cache=True)
+    return {stage: action.startswith("reuse") for stage, action in plan if stage in STAGES}
+
+
+def test_changing_a_config_block_only_reruns_the_stages_that_read_it(pipeline_config: Path) -> None:
+    assert all(reused(pipeline_config, []).values())
+
+    # Smoothing only feeds spoof scoring; the residuals stage keeps its checkpoint.
+    assert reused(pipeline_config, ["spoof_detection.smoothing_window=7"]) == {
+        "preprocess": True,
+        "entities": True,
+        "gap_fill": True,
+        "residuals": True,
+        "spoof": False,
+    }
+    assert reused(pipeline_config, ["spoof_detection.residual_search_km=80"])["residuals"] is False
+    assert reused(pipeline_config, ["gap_fill.min_candidate_score=0.7"]) == {
+        "preprocess": True,
+        "entities": True,
+        "gap_fill": False,
+        "residuals": False,
+        "spoof": False,
+    }
+    assert not any(reused(pipeline_config, ["rf_quality.u_max_m=4000"]).values())
@@ -0,0 +1,101 @@
+"""Timestamp normalization, dtype compaction and packed-key deduplication."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing.cleaning import (
+    StreamingDeduplicator,
+    compact_dtypes,
+    deduplicate_records,
+    normalize_timestamps,
+    record_keys,
+)
+
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [START_MS, START_MS + 1_500, None],
+        [START_MS // 1_000, START_MS // 1_000 + 1.5, None],
+        ["2025-07-01T00:00:00Z", "2025-07-01T02:00:01.5+02:00", "not a time"],
+        ["2025-07-01 00:00:00", str(START_MS + 1_500), None],
+        pd.to_datetime(["2025-07-01T00:00:00Z", "2025-07-01T00:00:01.5Z", None], format="ISO8601"),
+    ],
+    ids=["epoch-ms", "epoch-s", "iso-offsets", "mixed", "datetime"],
+)
+def test_timestamps_normalize_to_epoch_ms_and_drop_invalid_rows(values) -> None:
+    df = pd.DataFrame({"ts_utc": values, "mmsi": [1, 2, 3]})
+
+    out = normalize_timestamps(df, "ts_utc")
+
+    assert out["ts_utc"].dtype == np.int64
+    assert out["ts_utc"].tolist() == [START_MS, START_MS + 1_500]
+    assert out["mmsi"].tolist() == [1, 2]
+
+
+def test_compact_dtypes_shrinks_columns_without_changing_values() -> None:
+    df = pd.DataFrame(
+        {
+            "mmsi": [111.0, 222.0, 111.0],
+            "nav_status": ["under way", "moored", "under way"],
+            "sog": [10.5, 0.0, 12.25],
+            "lat": [50.123456789, 51.0, 52.0],
+        }
+    )
+
+    out = compact_dtypes(df, float32=True)
+
+    assert out["mmsi"].dtype == np.int64
+    assert isinstance(out["nav_status"].dtype, pd.CategoricalDtype)
+    assert out["sog"].dtype == np.float32 and out["lat"].dtype == np.float64
+    assert out["nav_status"].tolist() == df["nav_status"].tolist()
+    assert out["sog"].tolist() == df["sog"].tolist()
+
+
+def test_packed_keys_match_exact_duplicates() -> None:
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame(
+        {
+            "mmsi": rng.integers(0, 20, 5_000),
+            "ts_utc": START_MS + rng.integers(0, 2_000, 5_000),
+            "lat": rng.uniform(-60.0, 60.0, 5_000),
+        }
+    )
+    # Ids beyond 31 bits fall back to hashed keys.
+    df.loc[::7, "mmsi"] += 2**40
+
+    keys = record_keys(df, ["mmsi", "ts_utc"])
+    deduped = deduplicate_records(df, ["mmsi", "ts_utc"])
+
+    assert (keys[df["mmsi"].to_numpy() >= 2**40] < 0).all()
+    pd.testing.assert_frame_equal(deduped, df.loc[~df.duplicated(["mmsi", "ts_utc"], keep="last")])
+
+
+def test_missing_mmsi_is_deduplicated_without_packing() -> None:
+    df = compact_dtypes(pd.DataFrame({"mmsi": [1.0, None, 1.0, None], "ts_utc": [START_MS] * 3 + [START_MS + 1]}))
+    assert df["mmsi"].dtype == "Int64"
+
+    deduped = deduplicate_records(df, ["mmsi", "ts_utc"])
+
+    assert deduped.index.tolist() == [1, 2, 3]
+
+
+def test_streaming_deduplicator_forgets_keys_outside_the_window() -> None:
+    dedup = StreamingDeduplicator(["mmsi", "ts_utc"], window_ms=10_000)
+
+    def batch(*offsets: int) -> pd.DataFrame:
+        return pd.DataFrame({"mmsi": 111, "ts_utc": [START_MS + offset for offset in offsets]})
+
+    assert len(dedup.process(batch(0, 5_000, 5_000))) == 2
+    assert len(dedup.process(batch(5_000, 8_000))) == 1
+    assert len(dedup) == 3
+    # The watermark moves to 30_000, so 0 and 5_000 are no longer remembered.
+    assert len(dedup.process(batch(30_000))) == 1
+    assert len(dedup) == 1
+    assert len(dedup.process(batch(0, 30_000))) == 1
+    assert dedup.duplicates == 3
+    assert dedup.late_rows == 1
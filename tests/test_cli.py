@@ -0,0 +1,52 @@
+"""Exit codes of the ``validate`` and ``plan`` subcommands."""
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from main_pipeline import main
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CONFIG = str(REPO_ROOT / "config.yaml")
+
+
+@pytest.mark.parametrize("command", ["validate", "plan"])
+def test_valid_config_exits_zero(command: str, capsys) -> None:
+    overrides = ["--set", "parallel.workers=4", "--set", "parallel.rf_store_dir=/dev/shm"]
+    assert main([command, "--config", CONFIG, *overrides]) == 0
+    assert CONFIG in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "override",
+    [
+        "gap_fill.bogus=1",
+        "entity_resolution.bogus=1",
+        "streaming.bogus=1",
+        "indexing.type=xx",
+        "indexing.bogus=1",
+        "preprocessing.dtype_backend=xx",
+        "entity_resolution.cell_km=abc",
+    ],
+)
+def test_validate_rejects_unknown_keys_and_bad_values(override: str, capsys) -> None:
+    assert main(["validate", "--config", CONFIG, "--set", override]) == 1
+    assert "Invalid configuration" in capsys.readouterr().err
+
+
+def test_missing_config_exits_one(tmp_path, capsys) -> None:
+    assert main(["plan", "--config", str(tmp_path / "missing.yaml")]) == 1
+    assert "Invalid configuration" in capsys.readouterr().err
+
+
+def test_validate_does_not_import_pipeline_modules() -> None:
+    script = (
+        "import sys, main_pipeline; "
+        f"assert main_pipeline.main(['validate', '--config', {CONFIG!r}]) == 0; "
+        "print(sorted(m for m in ('pandas', 'pyarrow', 'algorithms.gap_fill') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
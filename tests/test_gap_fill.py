@@ -0,0 +1,188 @@
+"""Gap detection on AIS tracks, Viterbi decoding over gaps of different lattice shapes and fill synthesis."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from algorithms import gap_fill
+from algorithms.gap_fill import (
+    KNOTS_TO_KMH,
+    GapFillConfig,
+    detect_gaps,
+    synthesize_gap_points,
+    viterbi_reconstruct,
+)
+from utils.geo import haversine_km
+
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+MINUTE_MS = 60_000
+
+
+def test_detect_gaps_on_unsorted_tracks() -> None:
+    # Two vessels, shuffled: 222 has gaps of 15 and 30 minutes, 111 only a 10 minute step (not a gap).
+    pings = pd.DataFrame(
+        {
+            "mmsi": [222, 111, 222, 111, 222, 222, 111],
+            "ts_utc": [START_MS + m * MINUTE_MS for m in (20, 0, 0, 10, 5, 50, 15)],
+            "lat": [50.2, 40.0, 50.0, 40.1, 50.1, 50.5, 40.2],
+            "lon": [3.2, 1.0, 3.0, 1.1, 3.1, 3.5, 1.2],
+        }
+    )
+    config = GapFillConfig(
+        gap_threshold_minutes=10,
+        candidate_radius_km=25.0,
+        viterbi_transition_penalty=0.15,
+        min_candidate_score=0.6,
+    )
+
+    gaps = detect_gaps(pings, config)
+
+    assert gaps["gap_id"].tolist() == [0, 1]
+    assert gaps["mmsi"].tolist() == [222, 222]
+    assert gaps["start_idx"].tolist() == [4, 0]
+    assert gaps["end_idx"].tolist() == [0, 5]
+    assert gaps["start_ts"].tolist() == [START_MS + 5 * MINUTE_MS, START_MS + 20 * MINUTE_MS]
+    assert gaps["gap_minutes"].tolist() == [15.0, 30.0]
+    assert gaps[["start_lat", "end_lat"]].to_numpy().tolist() == [[50.1, 50.2], [50.2, 50.5]]
+    assert detect_gaps(pings.iloc[:0], config).empty
+
+
+def test_decode_is_independent_of_batch_size(monkeypatch) -> None:
+    rng = np.random.default_rng(1)
+    gaps = []
+    for gap_id, n in enumerate([1, 2, 5, 5, 40, 3, 5, 120, 6, 7, 38, 44, 110]):
+        gaps.append(
+            pd.DataFrame(
+                {
+                    "gap_id": gap_id * 7,
+                    "ts_utc": START_MS + np.sort(rng.integers(0, 4 * 3_600_000, n)),
+                    "est_lat": 50 + rng.normal(0, 0.2, n),
+                    "est_lon": 3 + rng.normal(0, 0.2, n),
+                    "score": rng.uniform(0.5, 1.0, n),
+                }
+            )
+        )
+    candidates = pd.concat(gaps, ignore_index=True)
+    config = GapFillConfig(
+        gap_threshold_minutes=10,
+        candidate_radius_km=25.0,
+        viterbi_transition_penalty=0.15,
+        min_candidate_score=0.6,
+        beam_width=None,
+    )
+
+    batches = []
+    decode = gap_fill._decode_batch
+    monkeypatch.setattr(gap_fill, "_decode_batch", lambda batch, *args: batches.append(batch) or decode(batch, *args))
+
+    paths, metrics = viterbi_reconstruct(candidates, config)
+    # Gaps of different shapes share a padded batch.
+    assert len(batches) < len(gaps)
+    assert any(len(np.unique(batch["n_steps"])) > 1 for batch in batches)
+    monkeypatch.setattr(gap_fill, "VITERBI_BATCH_BYTES", 1)
+    one_gap_paths, one_gap_metrics = viterbi_reconstruct(candidates, config)
+
+    pd.testing.assert_frame_equal(paths, one_gap_paths)
+    assert metrics["path_confidence"] == one_gap_metrics["path_confidence"]
+    assert paths["gap_id"].is_monotonic_increasing
+    assert paths.groupby("gap_id")["step"].apply(lambda s: s.tolist() == list(range(len(s)))).all()
+
+
+def test_fill_points_follow_great_circles_between_anchors() -> None:
+    # Gap 3 runs along the equator; gap 8 crosses the antimeridian. Rows at a gap's end are not anchors.
+    gap = {
+        3: (START_MS, START_MS + 60 * MINUTE_MS, 0.0, 10.0, 0.0, 11.0),
+        8: (START_MS, START_MS + 30 * MINUTE_MS, 10.0, 179.5, 10.0, -179.5),
+    }
+    anchors = [(3, 30, 0.0, 10.5, 0.8, "rf-a"), (3, 60, 0.0, 11.0, 0.9, "rf-end"), (8, 15, 10.2, 179.99, 0.6, "rf-b")]
+    paths = pd.DataFrame(
+        [
+            {
+                "gap_id": gap_id,
+                "mmsi": 100 + gap_id,
+                "ts_utc": START_MS + minute * MINUTE_MS,
+                "est_lat": lat,
+                "est_lon": lon,
+                "score": score,
+                "rf_id": rf_id,
+                **dict(zip(["start_ts", "end_ts", "start_lat", "start_lon", "end_lat", "end_lon"], gap[gap_id])),
+            }
+            for gap_id, minute, lat, lon, score, rf_id in anchors
+        ]
+    )
+    config = GapFillConfig(
+        gap_threshold_minutes=10,
+        candidate_radius_km=25.0,
+        viterbi_transition_penalty=0.15,
+        min_candidate_score=0.6,
+        fill_interval_minutes=10.0,
+    )
+
+    fills = synthesize_gap_points(paths, config)
+
+    minutes = (fills["ts_utc"] - START_MS) // MINUTE_MS
+    assert list(zip(fills["gap_id"], minutes)) == [
+        (3, 10),
+        (3, 20),
+        (3, 30),
+        (3, 40),
+        (3, 50),
+        (8, 10),
+        (8, 15),
+        (8, 20),
+    ]
+    assert fills["mmsi"].tolist() == [103] * 5 + [108] * 3
+    assert fills["rf_id"].tolist() == [None, None, "rf-a", None, None, None, "rf-b", None]
+    is_anchor = fills["rf_id"].notna()
+    assert fills["fill_method"].tolist() == np.where(is_anchor, "RF", "RF_interpolated").tolist()
+    assert fills["source_tag"].tolist() == np.where(is_anchor, "RF", "fused").tolist()
+
+    equator = fills[fills["gap_id"] == 3]
+    np.testing.assert_allclose(equator["lat"], 0.0, atol=1e-9)
+    np.testing.assert_allclose(equator["lon"], [10.0 + 0.5 / 3, 10.0 + 1.0 / 3, 10.5, 10.5 + 1 / 6, 10.5 + 2 / 6])
+    # Confidence runs linearly from the AIS endpoint (1.0) to the anchor's score and back.
+    expected_confidence = [1 - 0.2 / 3, 1 - 0.4 / 3, 0.8, 0.8 + 0.2 / 3, 0.8 + 0.4 / 3]
+    np.testing.assert_allclose(equator["fill_confidence"], expected_confidence)
+    leg_knots = haversine_km(0.0, 10.0, 0.0, 10.5) / 0.5 / KNOTS_TO_KMH
+    np.testing.assert_allclose(equator["sog"].iloc[:2], leg_knots)
+    np.testing.assert_allclose(equator["cog"], 90.0, atol=1e-6)
+
+    # Across the antimeridian each point sits on its leg's great circle, split in proportion to time.
+    crossing = fills[fills["gap_id"] == 8].reset_index(drop=True)
+    assert (crossing["lon"].abs() > 179.0).all()
+    for row, (lat0, lon0, lat1, lon1, fraction) in enumerate(
+        [(10.0, 179.5, 10.2, 179.99, 10 / 15), (10.2, 179.99, 10.0, -179.5, 5 / 15)]
+    ):
+        point = crossing.loc[2 * row, ["lat", "lon"]].to_numpy(dtype=float)
+        leg = haversine_km(lat0, lon0, lat1, lon1)
+        assert np.isclose(haversine_km(lat0, lon0, *point), fraction * leg, rtol=1e-6)
+        assert np.isclose(haversine_km(*point, lat1, lon1), (1 - fraction) * leg, rtol=1e-6)
+
+
+def test_no_fill_points_without_anchors_inside_gaps() -> None:
+    paths = pd.DataFrame(
+        {
+            "gap_id": [1],
+            "mmsi": [111],
+            "ts_utc": [START_MS],
+            "est_lat": [0.0],
+            "est_lon": [0.0],
+            "score": [0.9],
+            "start_ts": [START_MS],
+            "end_ts": [START_MS + 30 * MINUTE_MS],
+            "start_lat": [0.0],
+            "start_lon": [0.0],
+            "end_lat": [0.0],
+            "end_lon": [1.0],
+        }
+    )
+    config = GapFillConfig(
+        gap_threshold_minutes=10,
+        candidate_radius_km=25.0,
+        viterbi_transition_penalty=0.15,
+        min_candidate_score=0.6,
+    )
+
+    fills = synthesize_gap_points(paths, config)
+
+    assert fills.empty and "fill_confidence" in fills.columns
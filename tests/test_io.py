@@ -0,0 +1,113 @@
+"""Filtered and batched reads through ``utils.io`` against local files."""
+from __future__ import annotations
+
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.io import DataSourceConfig, iter_dataframe_batches, read_dataframe
+
+DAY_MS = 86_400_000
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+
+
+@pytest.fixture
+def pings() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 3_000
+    frame = pd.DataFrame(
+        {
+            "mmsi": rng.choice([111, 222, 333], n),
+            "ts_utc": np.sort(rng.integers(START_MS, START_MS + 3 * DAY_MS, n)),
+            "lat": rng.uniform(50.0, 60.0, n),
+            "lon": rng.uniform(0.0, 10.0, n),
+        }
+    )
+    frame["date"] = pd.to_datetime(frame["ts_utc"], unit="ms").dt.strftime("%Y-%m-%d")
+    return frame
+
+
+def expected(frame: pd.DataFrame, start: int, end: int, bbox, mmsi) -> pd.DataFrame:
+    min_lon, min_lat, max_lon, max_lat = bbox
+    keep = (frame["ts_utc"] >= start) & (frame["ts_utc"] < end) & frame["lat"].between(min_lat, max_lat)
+    keep &= frame["lon"].between(min_lon, max_lon) & frame["mmsi"].isin(mmsi)
+    return frame.loc[keep, ["mmsi", "ts_utc", "lat", "lon"]].reset_index(drop=True)
+
+
+def sort(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame[["mmsi", "ts_utc", "lat", "lon"]].sort_values(["ts_utc", "mmsi"], ignore_index=True)
+
+
+def test_hive_layout_applies_time_bbox_and_mmsi_filters(tmp_path, pings):
+    for date, part in pings.groupby("date"):
+        directory = tmp_path / f"date={date}"
+        directory.mkdir()
+        part.drop(columns="date").to_parquet(directory / "part-0.parquet", index=False)
+    start, end = START_MS + DAY_MS // 2, START_MS + DAY_MS + DAY_MS // 2
+    bbox, mmsi = (2.0, 52.0, 8.0, 58.0), [111, 333]
+    config = DataSourceConfig(type="local", path=str(tmp_path), partitioning="hive")
+
+    result = read_dataframe(
+        config, columns=["mmsi", "ts_utc", "lat", "lon"], time_range=(start, end), bbox=bbox, mmsi=mmsi
+    )
+
+    pd.testing.assert_frame_equal(sort(result), sort(expected(pings, start, end, bbox, mmsi)), check_dtype=False)
+
+
+def test_zip_source_applies_filters_to_each_object(tmp_path, pings):
+    archive = tmp_path / "pings.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for date, part in pings.groupby("date"):
+            zf.writestr(f"{date}.csv", part.drop(columns="date").to_csv(index=False))
+    start, end = START_MS + DAY_MS // 2, START_MS + 2 * DAY_MS
+    bbox, mmsi = (0.0, 50.0, 5.0, 55.0), [222]
+    config = DataSourceConfig(
+        type="local", path=str(archive), format="zip", time_range=(start, end), bbox=bbox, mmsi=mmsi
+    )
+
+    result = read_dataframe(config)
+
+    assert len(result) > 0
+    pd.testing.assert_frame_equal(sort(result), sort(expected(pings, start, end, bbox, mmsi)))
+
+
+def test_time_range_end_is_exclusive_and_skips_the_next_day(tmp_path, pings):
+    pings = pd.concat([pings, pings.iloc[[0]].assign(ts_utc=START_MS + DAY_MS, date="2025-07-02")])
+    for date, part in pings.groupby("date"):
+        directory = tmp_path / f"date={date}"
+        directory.mkdir()
+        part.drop(columns="date").to_parquet(directory / "part-0.parquet", index=False)
+    # Reading the last day's directory would fail.
+    (tmp_path / "date=2025-07-03" / "part-0.parquet").write_bytes(b"not parquet")
+    start, end = START_MS + DAY_MS, START_MS + 2 * DAY_MS
+    config = DataSourceConfig(type="local", path=str(tmp_path), partitioning="hive", time_range=(start, end))
+
+    result = read_dataframe(config, columns=["mmsi", "ts_utc", "lat", "lon"])
+
+    assert result["ts_utc"].min() == start
+    assert result["ts_utc"].max() < end
+    assert len(result) == int(((pings["ts_utc"] >= start) & (pings["ts_utc"] < end)).sum())
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv", "zip"])
+def test_batches_are_bounded_and_cover_the_source(tmp_path, pings, fmt: str) -> None:
+    frame = pings.drop(columns="date")
+    path = tmp_path / f"pings.{fmt}"
+    if fmt == "parquet":
+        frame.to_parquet(path, index=False, row_group_size=500)
+    elif fmt == "csv":
+        frame.to_csv(path, index=False)
+    else:
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("a.csv", frame.iloc[:1_000].to_csv(index=False))
+            zf.writestr("b.csv", frame.iloc[1_000:].to_csv(index=False))
+    config = DataSourceConfig(type="local", path=str(path), format=fmt)
+
+    batches = list(iter_dataframe_batches(config, batch_size=400, columns=["mmsi", "ts_utc", "missing"]))
+
+    assert max(len(batch) for batch in batches) <= 400
+    combined = pd.concat(batches, ignore_index=True)
+    assert combined.columns.tolist() == ["mmsi", "ts_utc"]
+    pd.testing.assert_frame_equal(combined, frame[["mmsi", "ts_utc"]], check_dtype=False)
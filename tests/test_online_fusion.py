@@ -0,0 +1,56 @@
+"""Watermark handling of ``OnlineFusionEngine``."""
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from algorithms.gap_fill import GapFillConfig
+from algorithms.online_fusion import OnlineFusionConfig, OnlineFusionEngine
+from algorithms.spoof_detection import SpoofDetectionConfig
+from entity_resolution.resolver import EntityResolutionConfig
+from ingest.stream_sources import StreamMessage, make_message
+
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+
+
+@pytest.fixture
+def engine() -> OnlineFusionEngine:
+    return OnlineFusionEngine(
+        GapFillConfig(
+            gap_threshold_minutes=10,
+            candidate_radius_km=25.0,
+            viterbi_transition_penalty=0.15,
+            min_candidate_score=0.6,
+        ),
+        SpoofDetectionConfig(residual_threshold_km=20.0, spoof_score_threshold=0.7, smoothing_window=5),
+        EntityResolutionConfig(),
+        OnlineFusionConfig(allowed_lateness_ms=2_000),
+    )
+
+
+def fix(offset_ms: int) -> StreamMessage:
+    payload = {"type": "ais", "mmsi": 111, "ts_utc": START_MS + offset_ms, "lat": 50.0, "lon": 3.0, "sog": 10.0}
+    return make_message(payload, received_s=0.0)
+
+
+def offsets(records: List[dict]) -> List[int]:
+    return [record["ts_utc"] - START_MS for record in records]
+
+
+def test_late_records_are_dropped_and_flush_releases_the_buffer(engine: OnlineFusionEngine) -> None:
+    assert engine.process(fix(0)) == []
+    assert engine.process(fix(1_000)) == []
+    # The watermark moves to 5_000 - 2_000 and releases everything at or before it.
+    assert offsets(engine.process(fix(5_000))) == [0, 1_000]
+    assert engine.process(fix(2_500)) == []
+    assert engine.process(fix(4_000)) == []
+    assert engine.stats()["late"] == 1
+    assert engine.stats()["buffered"] == 2
+
+    assert offsets(engine.flush()) == [4_000, 5_000]
+    assert engine.stats()["buffered"] == 0
+    assert engine.process(fix(4_500)) == []
+    assert engine.stats()["late"] == 2
+    assert engine.stats()["released"] == 4
+    assert engine.flush() == []
@@ -0,0 +1,57 @@
+"""N6 mapping, reject sidecar and committing the output dataset."""
+from __future__ import annotations
+
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from output import writer
+from output.writer import OutputConfig, write_output, write_rejects
+from schemas.output import map_to_n6_schema
+
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+
+
+def test_mixed_type_string_column_rejects_only_offending_rows(tmp_path) -> None:
+    fused = pd.DataFrame(
+        {
+            "mmsi": [111, 222, 333, 444],
+            "ts_utc": [START_MS + i * 60_000 for i in range(4)],
+            "lat": [50.0, 51.0, 52.0, 53.0],
+            "lon": [1.0, 2.0, 3.0, 4.0],
+            "source_tag": ["AIS", "AIS", "RF", "AIS"],
+            "nav_status": ["under way", 5, None, "moored"],
+        }
+    )
+
+    table, rejects = map_to_n6_schema(fused)
+
+    assert table.column("mmsi").to_pylist() == [111, 333, 444]
+    assert table.column("nav_status").to_pylist() == ["under way", None, "moored"]
+    assert rejects["mmsi"].tolist() == [222]
+    assert rejects["reject_reason"].tolist() == ["invalid nav_status"]
+
+    path = write_rejects(rejects, OutputConfig(directory=str(tmp_path)))
+    written = pd.read_parquet(path)
+    assert written["nav_status"].tolist() == [5]
+    assert written["reject_reason"].tolist() == ["invalid nav_status"]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="renameat2 is Linux-only")
+def test_rewrite_swaps_dataset_without_moving_it_aside(tmp_path, monkeypatch) -> None:
+    config = OutputConfig(directory=str(tmp_path))
+    first = pa.table({"mmsi": [111, 222], "ts_utc": [START_MS, START_MS + 60_000]})
+    second = pa.table({"mmsi": [333], "ts_utc": [START_MS + 120_000]})
+    write_output(first, config)
+
+    def no_rename(*args, **kwargs):
+        raise AssertionError("fused_output was renamed aside")
+
+    monkeypatch.setattr(writer.os, "rename", no_rename)
+    result = write_output(second, config)
+
+    assert pd.read_parquet(result["output_path"])["mmsi"].tolist() == [333]
+    assert sorted(os.listdir(tmp_path)) == ["fused_output", "manifest.json"]
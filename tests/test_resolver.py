@@ -0,0 +1,107 @@
+"""Identifier and spatio-temporal linking in ``resolve_entities``."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from entity_resolution.resolver import LINK_COLUMNS, resolve_entities
+
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+MINUTE_MS = 60_000
+
+
+def track(mmsi: int, lat: float, lon: float, minutes: range, **identifiers: object) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "mmsi": mmsi,
+            "ts_utc": [START_MS + m * MINUTE_MS for m in minutes],
+            "lat": lat,
+            "lon": lon,
+            "sog": 0.0,
+            **identifiers,
+        }
+    )
+
+
+def test_detections_link_by_identifier_then_by_nearest_track_in_time(tmp_path) -> None:
+    ais = pd.concat(
+        [
+            track(111, 50.0, 3.0, range(0, 30, 2)),
+            track(222, 50.05, 3.0, range(0, 30, 2)),
+            track(333, 40.0, 1.0, range(0, 30, 2), call_sign="AB 12"),
+        ],
+        ignore_index=True,
+    )
+    mapping = tmp_path / "vessels.csv"
+    pd.DataFrame({"mmsi": [555], "imo": [9000002]}).to_csv(mapping, index=False)
+    rf = pd.DataFrame(
+        {
+            "rf_id": ["near-111", "direct", "by-imo", "by-call-sign", "stale", "open-sea"],
+            "ts_utc": [START_MS + m * MINUTE_MS for m in (11, 12, 13, 14, 60, 15)],
+            "est_lat": [50.002, 10.0, 10.0, 10.0, 50.0, 45.0],
+            "est_lon": [3.0, 10.0, 10.0, 10.0, 3.0, 3.0],
+            "geo_uncertainty_m": [500.0, 500.0, 500.0, 500.0, 500.0, 500.0],
+            "mmsi": [None, 444, None, None, None, None],
+            "imo": [None, None, 9000002, None, None, None],
+            "call_sign": [None, None, None, "ab12", None, None],
+        }
+    )
+
+    links = resolve_entities(ais, rf, {"time_bucket_minutes": 5, "mapping_table": str(mapping)})
+
+    assert list(links.columns) == LINK_COLUMNS
+    by_id = links.set_index("rf_id")
+    assert sorted(by_id.index) == ["by-call-sign", "by-imo", "direct", "near-111"]
+    assert by_id.loc[["direct", "by-imo", "by-call-sign"], "mmsi"].tolist() == [444, 555, 333]
+    assert by_id.loc[["direct", "by-imo", "by-call-sign"], "method"].tolist() == ["mmsi", "imo", "call_sign"]
+    assert by_id.loc[["direct", "by-imo", "by-call-sign"], "confidence"].tolist() == [1.0, 0.95, 0.85]
+
+    near = by_id.loc["near-111"]
+    assert near["method"] == "spatiotemporal" and near["mmsi"] == 111
+    # Pings every two minutes: the nearest one is a minute away either side.
+    assert abs(near["dt_ms"]) == MINUTE_MS
+    assert np.isclose(near["distance_km"], 0.2224, atol=1e-3)
+    # Vessel 222 sits 5.3 km away, outside the 1.5 km gate, so it does not dilute the confidence.
+    assert np.isclose(near["confidence"], np.exp(-0.5 * 0.2224**2 / 0.5**2) * np.exp(-1 / 5), atol=1e-3)
+
+
+def test_ambiguous_detections_lose_confidence(tmp_path) -> None:
+    ais = pd.concat([track(111, 50.0, 3.0, range(0, 10)), track(222, 50.0, 3.01, range(0, 10))], ignore_index=True)
+    rf = pd.DataFrame(
+        {
+            "rf_id": ["between", "on-111"],
+            "ts_utc": [START_MS + 5 * MINUTE_MS, START_MS + 5 * MINUTE_MS],
+            "est_lat": [50.0, 50.0],
+            "est_lon": [3.005, 3.0],
+            "geo_uncertainty_m": [1_000.0, 1_000.0],
+        }
+    )
+
+    links = resolve_entities(ais, rf, {"time_bucket_minutes": 5}).set_index("rf_id")
+
+    # Equidistant from both vessels: the best of two equal scores keeps half its score.
+    assert np.isclose(links.loc["between", "confidence"], 0.5 * np.exp(-0.5 * 0.3575**2), atol=1e-3)
+    assert links.loc["on-111", "mmsi"] == 111
+    assert links.loc["on-111", "confidence"] > links.loc["between", "confidence"]
+    assert resolve_entities(ais, rf.iloc[:0], {}).empty
+
+
+def test_detections_link_across_the_antimeridian() -> None:
+    ais = pd.concat(
+        [track(111, 65.0, 179.99, range(0, 10)), track(222, -20.0, -180.0, range(0, 10))],
+        ignore_index=True,
+    )
+    rf = pd.DataFrame(
+        {
+            "rf_id": ["east-of-111", "west-of-222"],
+            "ts_utc": [START_MS + 5 * MINUTE_MS, START_MS + 5 * MINUTE_MS],
+            "est_lat": [65.0, -20.0],
+            "est_lon": [-179.995, 179.995],
+            "geo_uncertainty_m": [1_000.0, 1_000.0],
+        }
+    )
+
+    links = resolve_entities(ais, rf, {"time_bucket_minutes": 5}).set_index("rf_id")
+
+    assert links["mmsi"].to_dict() == {"east-of-111": 111, "west-of-222": 222}
+    assert (links["distance_km"] < 1.0).all()
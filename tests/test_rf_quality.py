@@ -0,0 +1,76 @@
+"""TDOA cluster collapse and U_MAX pruning in ``collapse_tdoa_clusters``."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.rf_quality import RFQualityConfig, collapse_tdoa_clusters
+from utils.geo import haversine_km
+
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+
+
+def test_clusters_collapse_to_inverse_variance_centroids() -> None:
+    rf = pd.DataFrame(
+        {
+            "rf_id": ["a-east", "b-coarse", "free", "a-west", "b-fine", "c-1", "vague", "c-2"],
+            "ts_utc": [START_MS + i * 1_000 for i in range(8)],
+            "est_lat": [10.0, 40.0, 45.0, 10.0, 40.0, 0.0, 30.0, 0.0],
+            "est_lon": [179.99, 5.0, 6.0, -179.99, 5.0, 0.0, 0.0, 0.1],
+            "geo_uncertainty_m": [100.0, 400.0, 800.0, 200.0, 300.0, 8_000.0, 6_000.0, 8_000.0],
+            "tdoa_cluster_id": ["a", "b", None, "a", "b", "c", None, "c"],
+        }
+    )
+
+    out, metrics = collapse_tdoa_clusters(rf, RFQualityConfig(u_max_m=5_000.0))
+
+    assert metrics == {
+        "rf_rows_in": 8,
+        "clusters": 3,
+        "rows_collapsed": 3,
+        "rows_over_u_max": 2,
+        "rf_rows_out": 3,
+        "shrink_ratio": 0.625,
+    }
+    # The most precise member represents its cluster, at its position in the input.
+    assert out["rf_id"].tolist() == ["a-east", "free", "b-fine"]
+    assert out["cluster_size"].tolist() == [2, 1, 2]
+    assert out.loc[1, ["est_lat", "est_lon", "geo_uncertainty_m"]].tolist() == [45.0, 6.0, 800.0]
+
+    # Weights 1/100**2 and 1/200**2 pull the centroid 4/5 of the way to a-east, across the antimeridian.
+    a = out.loc[0]
+    assert np.isclose(a["est_lat"], 10.0, atol=1e-6)
+    assert np.isclose(a["est_lon"], 179.994, atol=1e-6)
+    # The members disagree by far more than they claim, so the scatter sets the uncertainty.
+    offsets_km = haversine_km(a["est_lat"], a["est_lon"], np.array([10.0, 10.0]), np.array([179.99, -179.99]))
+    scatter_m = np.sqrt(np.average(offsets_km**2, weights=[4, 1])) * 1_000
+    assert np.isclose(a["geo_uncertainty_m"], scatter_m, rtol=1e-3)
+    assert a["geo_uncertainty_m"] > 800.0
+
+    # Co-located members: the standard error of the combined fix.
+    b = out.loc[2]
+    assert np.allclose([b["est_lat"], b["est_lon"]], [40.0, 5.0])
+    assert np.isclose(b["geo_uncertainty_m"], 1 / np.sqrt(1 / 300.0**2 + 1 / 400.0**2))
+
+
+def test_disabled_or_unclustered_input_passes_through() -> None:
+    rf = pd.DataFrame(
+        {
+            "rf_id": ["x", "y"],
+            "ts_utc": [START_MS, START_MS + 1_000],
+            "est_lat": [1.0, 1.001],
+            "est_lon": [3.0, 3.0],
+            "tdoa_cluster_id": ["k", "k"],
+        }
+    )
+
+    same, metrics = collapse_tdoa_clusters(rf, RFQualityConfig(enabled=False))
+    assert same is rf and metrics["shrink_ratio"] == 0.0
+
+    # Without geo_uncertainty_m both members count as default_uncertainty_m.
+    collapsed, metrics = collapse_tdoa_clusters(rf, RFQualityConfig())
+    assert collapsed["rf_id"].tolist() == ["x"] and metrics["rf_rows_out"] == 1
+    assert collapsed.loc[0, "geo_uncertainty_m"] > 1_000.0 / np.sqrt(2)
+
+    unclustered, metrics = collapse_tdoa_clusters(rf.drop(columns="tdoa_cluster_id"), RFQualityConfig())
+    assert unclustered["rf_id"].tolist() == ["x", "y"] and metrics["clusters"] == 0
@@ -0,0 +1,29 @@
+"""Read-ahead bounds of ``ingest.scheduler.prefetch``."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from ingest.scheduler import prefetch
+
+
+@pytest.mark.parametrize("depth", [1, 3])
+def test_prefetch_keeps_at_most_depth_batches_in_flight(depth: int) -> None:
+    read = 0
+
+    def batches():
+        nonlocal read
+        for i in range(10):
+            read += 1
+            yield i
+
+    received = []
+    in_flight = []
+    for batch in prefetch(batches(), depth):
+        received.append(batch)
+        time.sleep(0.05)  # let the producer run as far ahead as it may
+        in_flight.append(read - len(received))
+
+    assert received == list(range(10))
+    assert max(in_flight) == depth
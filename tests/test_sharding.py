@@ -0,0 +1,113 @@
+"""MMSI-sharded execution: RF row selection and shard-count invariance."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from algorithms.sharding import select_residual_rf_rows, shard_of
+from algorithms.spoof_detection import SpoofDetectionConfig
+from benchmarks.synthetic import SyntheticConfig, write_dataset
+from main_pipeline import run_pipeline
+from utils.geo import haversine_km
+
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+HOUR_MS = 3_600_000
+
+
+def wrap(lon: np.ndarray) -> np.ndarray:
+    return np.where(lon >= 180.0, lon - 360.0, lon)
+
+
+def test_residual_selection_covers_rf_near_every_ping() -> None:
+    rng = np.random.default_rng(3)
+    n_ais, n_rf = 2_000, 3_000
+    ais = pd.DataFrame(
+        {
+            "mmsi": rng.integers(100, 140, n_ais),
+            "ts_utc": START_MS + rng.integers(0, 6 * HOUR_MS, n_ais),
+            "lat": rng.uniform(40.0, 75.0, n_ais),
+            "lon": wrap(rng.uniform(170.0, 190.0, n_ais)),
+        }
+    )
+    rf = pd.DataFrame(
+        {
+            "rf_id": [f"rf-{i}" for i in range(n_rf)],
+            "ts_utc": START_MS + rng.integers(0, 6 * HOUR_MS, n_rf),
+            "est_lat": rng.uniform(38.0, 77.0, n_rf),
+            "est_lon": wrap(rng.uniform(160.0, 200.0, n_rf)),
+        }
+    )
+    config = SpoofDetectionConfig(
+        residual_threshold_km=20.0,
+        spoof_score_threshold=0.7,
+        smoothing_window=5,
+        residual_window_minutes=10.0,
+        residual_search_km=150.0,
+    )
+
+    selected = select_residual_rf_rows(ais, rf, config, n_shards=3)
+
+    shards = shard_of(ais["mmsi"].to_numpy(), 3)
+    near_time = np.abs(ais["ts_utc"].to_numpy()[:, None] - rf["ts_utc"].to_numpy()[None, :]) <= 10 * 60_000
+    distance = haversine_km(
+        ais["lat"].to_numpy()[:, None],
+        ais["lon"].to_numpy()[:, None],
+        rf["est_lat"].to_numpy(),
+        rf["est_lon"].to_numpy(),
+    )
+    near = near_time & (distance <= 150.0)
+    for shard in range(3):
+        expected = np.flatnonzero(near[shards == shard].any(axis=0))
+        assert len(expected)
+        assert np.isin(expected, selected[shard]).all()
+        assert np.all(np.diff(selected[shard]) > 0)
+
+
+@pytest.fixture(scope="module")
+def pipeline_config(tmp_path_factory) -> Path:
+    root = tmp_path_factory.mktemp("pipeline")
+    data = write_dataset(SyntheticConfig(vessels=12, days=0.25, gap_rate=0.003, spoof_rate=0.001), root)
+    config = {
+        "pipeline": {
+            "ais_source": {"type": "local", "path": data["ais"], "format": "parquet"},
+            "rf_source": {"type": "local", "path": data["rf"], "format": "parquet"},
+            "gap_fill": {
+                "gap_threshold_minutes": 10,
+                "candidate_radius_km": 25.0,
+                "viterbi_transition_penalty": 0.15,
+                "min_candidate_score": 0.6,
+            },
+            "spoof_detection": {"residual_threshold_km": 20.0, "spoof_score_threshold": 0.7, "smoothing_window": 5},
+            "indexing": {"type": "geohash", "resolution": 4, "time_bucket_minutes": 5},
+            "output": {"directory": str(root / "out")},
+            "audit": {"directory": str(root / "audit")},
+        }
+    }
+    path = root / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return path
+
+
+def test_pipeline_output_is_independent_of_shard_count(pipeline_config: Path) -> None:
+    outputs = []
+    for shards, workers in ((0, 1), (3, 1), (5, 2)):
+        directory = pipeline_config.parent / f"out-{shards}-{workers}"
+        run_pipeline(
+            pipeline_config,
+            use_cache=False,
+            overrides=[
+                f"parallel.shards={shards}",
+                f"parallel.workers={workers}",
+                f"output.directory={directory}",
+            ],
+        )
+        frame = pd.read_parquet(directory / "fused_output")
+        outputs.append(frame.sort_values(["mmsi", "ts_utc"], ignore_index=True))
+
+    assert (outputs[0]["source"] == "fused").any()
+    for frame in outputs[1:]:
+        pd.testing.assert_frame_equal(outputs[0], frame)
@@ -0,0 +1,99 @@
+"""``SpatiotemporalIndex`` window queries against a brute-force scan."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from entity_resolution.spatiotemporal_index import (
+    build_spatiotemporal_index,
+    match_queries,
+    open_spatiotemporal_index,
+    save_spatiotemporal_index,
+)
+from utils.geo import haversine_km
+
+START_MS = 1_751_328_000_000  # 2025-07-01T00:00:00Z
+HOUR_MS = 3_600_000
+
+
+@pytest.fixture(scope="module")
+def detections() -> pd.DataFrame:
+    rng = np.random.default_rng(2)
+    n = 4_000
+    return pd.DataFrame(
+        {
+            "rf_id": [f"rf-{i}" for i in range(n)],
+            "ts_utc": START_MS + rng.integers(0, 6 * HOUR_MS, n),
+            "est_lat": rng.uniform(50.0, 54.0, n),
+            "est_lon": rng.uniform(0.0, 6.0, n),
+        }
+    )
+
+
+@pytest.mark.parametrize("index_type, resolution", [("h3", 6), ("geohash", 4)])
+def test_radius_queries_match_brute_force(detections: pd.DataFrame, index_type: str, resolution: int) -> None:
+    index = build_spatiotemporal_index(
+        detections, {"type": index_type, "resolution": resolution, "time_bucket_minutes": 10}
+    )
+    rng = np.random.default_rng(3)
+    n_queries = 60
+    start = START_MS + rng.integers(0, 5 * HOUR_MS, n_queries)
+    queries = pd.DataFrame(
+        {
+            "lat": rng.uniform(50.5, 53.5, n_queries),
+            "lon": rng.uniform(0.5, 5.5, n_queries),
+            "radius_km": rng.uniform(5.0, 60.0, n_queries),
+            "start_ts": start,
+            "end_ts": start + rng.integers(0, HOUR_MS, n_queries),
+        }
+    )
+
+    query_pos, rows = match_queries(index, queries)
+
+    ts = detections["ts_utc"].to_numpy()
+    distance = haversine_km(
+        queries["lat"].to_numpy()[:, None],
+        queries["lon"].to_numpy()[:, None],
+        detections["est_lat"].to_numpy(),
+        detections["est_lon"].to_numpy(),
+    )
+    inside = (distance <= queries["radius_km"].to_numpy()[:, None]) & (
+        (ts >= queries["start_ts"].to_numpy()[:, None]) & (ts <= queries["end_ts"].to_numpy()[:, None])
+    )
+    expected_pos, expected_rows = np.nonzero(inside)
+    assert len(rows) > 0
+    np.testing.assert_array_equal(query_pos, expected_pos)
+    np.testing.assert_array_equal(index.df["rf_id"].to_numpy()[rows], detections["rf_id"].to_numpy()[expected_rows])
+
+
+def test_stored_index_is_memory_mapped_and_answers_like_the_original(detections: pd.DataFrame, tmp_path) -> None:
+    index = build_spatiotemporal_index(detections, {"type": "geohash", "resolution": 4, "time_bucket_minutes": 10})
+    queries = pd.DataFrame(
+        {
+            "lat": [51.0, 52.5, 53.9],
+            "lon": [1.0, 3.0, 5.9],
+            "radius_km": [20.0, 50.0, 10.0],
+            "start_ts": [START_MS, START_MS + HOUR_MS, START_MS],
+            "end_ts": [START_MS + HOUR_MS, START_MS + 3 * HOUR_MS, START_MS + 6 * HOUR_MS],
+        }
+    )
+
+    store = save_spatiotemporal_index(index, tmp_path / "rf_index")
+    # Saving again replaces the store in place.
+    assert save_spatiotemporal_index(index, store) == store
+    opened = open_spatiotemporal_index(store)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["rf_index"]
+    assert isinstance(opened.keys, np.memmap) and not opened.offsets.flags.writeable
+    assert isinstance(opened.df["est_lat"].dtype, pd.ArrowDtype)
+    expected_pos, expected_rows = match_queries(index, queries)
+    query_pos, rows = match_queries(opened, queries)
+    assert len(rows) > 0
+    np.testing.assert_array_equal(query_pos, expected_pos)
+    np.testing.assert_array_equal(rows, expected_rows)
+    assert opened.df["rf_id"].to_numpy()[rows].tolist() == index.df["rf_id"].to_numpy()[rows].tolist()
+
+    (store / "index.json").write_text('{"version": 0}')
+    with pytest.raises(ValueError, match="store version"):
+        open_spatiotemporal_index(store)
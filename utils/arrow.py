@@ -0,0 +1,125 @@
+"""Arrow-backed frames: pandas conversion, zero-copy column views and copy accounting."""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from schemas.components import check_dtype_backend
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CopyCounter:
+    """Count column materializations that could not be served as zero-copy views."""
+
+    copies: int = 0
+    bytes_copied: int = 0
+    by_column: Counter = field(default_factory=Counter)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, column: Optional[str], nbytes: int) -> None:
+        """Count one copy of ``nbytes`` made for ``column``."""
+        with self.lock:
+            self.copies += 1
+            self.bytes_copied += nbytes
+            self.by_column[column or "<unnamed>"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters as plain JSON-serializable values."""
+        with self.lock:
+            return {"copies": self.copies, "bytes_copied": self.bytes_copied, "by_column": dict(self.by_column)}
+
+    def reset(self) -> None:
+        """Zero all counters."""
+        with self.lock:
+            self.copies = 0
+            self.bytes_copied = 0
+            self.by_column.clear()
+
+
+# Process-wide counter read by the stage profiler.
+COPY_COUNTER = CopyCounter()
+
+
+def table_to_pandas(table: pa.Table, dtype_backend: str = "numpy") -> pd.DataFrame:
+    """Convert an Arrow table to pandas with the requested backend.
+
+    ``"pyarrow"`` combines each column into a single chunk (one copy, only
+    for columns read as several row groups) and wraps the buffers in
+    ``pd.ArrowDtype`` columns without converting them, so ``numeric_view``
+    can later hand kernels NumPy views of the same memory. Dictionary
+    columns stay pandas categoricals. ``"numpy"`` is pandas' default
+    conversion.
+    """
+    if check_dtype_backend(dtype_backend) == "numpy":
+        return table.to_pandas()
+    if any(column.num_chunks > 1 for column in table.columns):
+        table = table.combine_chunks()
+    return table.to_pandas(types_mapper=_arrow_dtype)
+
+
+def _arrow_dtype(arrow_type: pa.DataType) -> Optional[pd.ArrowDtype]:
+    """``types_mapper`` keeping dictionary columns as categoricals and wrapping the rest."""
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+
+def combine_arrow_chunks(df: pd.DataFrame) -> pd.DataFrame:
+    """Return ``df`` with every ``pd.ArrowDtype`` column held in a single chunk.
+
+    Concatenating Arrow-backed frames only stacks chunks; this copies them
+    together once so later ``numeric_view`` calls are views. NumPy columns
+    are passed through unchanged.
+    """
+    arrow_columns = [name for name, dtype in df.dtypes.items() if isinstance(dtype, pd.ArrowDtype)]
+    multi_chunk = [name for name in arrow_columns if df[name].array.__arrow_array__().num_chunks > 1]
+    if not multi_chunk:
+        return df
+    out = df.copy(deep=False)
+    for name in multi_chunk:
+        chunked = out[name].array.__arrow_array__()
+        out[name] = pd.Series(
+            pd.arrays.ArrowExtensionArray(pa.chunked_array([chunked.combine_chunks()])), index=out.index, copy=False
+        )
+    return out
+
+
+def is_arrow_backed(df: pd.DataFrame) -> bool:
+    """Whether any column of ``df`` is stored as ``pd.ArrowDtype``."""
+    return any(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+
+
+def numeric_view(values: Any, dtype: Any = np.float64, name: Optional[str] = None) -> np.ndarray:
+    """Return ``values`` as a NumPy array of ``dtype``, without copying when possible.
+
+    NumPy-backed columns of the right dtype and single-chunk, null-free
+    ``pd.ArrowDtype`` columns of the matching Arrow type are returned as
+    views; views of Arrow memory are read-only, so callers must not write
+    into them. Anything else (a dtype change, nulls becoming NaN, several
+    chunks) is converted and recorded in ``COPY_COUNTER``.
+    """
+    dtype = np.dtype(dtype)
+    name = name if name is not None else getattr(values, "name", None)
+    source_dtype = getattr(values, "dtype", None)
+    if isinstance(source_dtype, pd.ArrowDtype):
+        chunked = values.array.__arrow_array__() if isinstance(values, (pd.Series, pd.Index)) else values.__arrow_array__()
+        if chunked.num_chunks == 1 and chunked.null_count == 0 and chunked.type == pa.from_numpy_dtype(dtype):
+            return chunked.chunk(0).to_numpy(zero_copy_only=True)
+    elif isinstance(source_dtype, np.dtype) or source_dtype is None:
+        array = values.to_numpy() if isinstance(values, (pd.Series, pd.Index)) else np.asarray(values)
+        if array.dtype == dtype:
+            return array
+    if dtype.kind == "f":
+        out = pd.Series(values, copy=False).to_numpy(dtype=dtype, na_value=np.nan)
+    else:
+        out = pd.Series(values, copy=False).to_numpy(dtype=dtype)
+    COPY_COUNTER.record(name, out.nbytes)
+    return out
@@ -0,0 +1,238 @@
+"""Local content-addressed cache for remote input objects."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+from utils.arrow import table_to_pandas
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+COPY_BUFFER_BYTES = 8 * 1024 * 1024
+
+
+@dataclass
+class CacheConfig:
+    """Configuration for the on-disk input cache."""
+
+    directory: str
+    max_bytes: int = 20 * 1024**3
+    store_decoded: bool = True
+
+
+def object_version(info: Dict[str, Any]) -> str:
+    """Return an object's ETag from filesystem ``info``, or its size and modification time."""
+    version = info.get("ETag") or info.get("etag")
+    if not version:
+        version = f"{info.get('size')}-{info.get('mtime') or info.get('LastModified')}"
+    return str(version)
+
+
+class ObjectCache:
+    """Cache remote objects (and optionally their decoded frames) on local disk.
+
+    Entries are keyed by a hash of ``path`` and the object's ETag (or size and
+    modification time when no ETag is available), so a changed object is never
+    served stale. Files are written to a temporary name and renamed into
+    place, and per-key and eviction locks use ``flock``, which makes the cache
+    safe to share between concurrent pipeline processes. Least recently used
+    entries are evicted once the directory exceeds ``max_bytes``. The directory
+    is scanned on the first write and then only when the bytes written since
+    push the last scanned size past ``max_bytes``.
+    """
+
+    def __init__(self, config: CacheConfig) -> None:
+        self.config = config
+        self.root = Path(config.directory)
+        self.objects_dir = self.root / "objects"
+        self.decoded_dir = self.root / "decoded"
+        self.locks_dir = self.root / "locks"
+        for directory in (self.objects_dir, self.decoded_dir, self.locks_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        # Bytes on disk at the last scan plus bytes written since; None until the first scan.
+        self._used_bytes: Optional[int] = None
+        self._used_lock = threading.Lock()
+
+    def object_key(self, path: str, info: Dict[str, Any]) -> str:
+        """Return the content key for an object given its filesystem ``info``."""
+        return hashlib.sha256(f"{path}\0{object_version(info)}".encode("utf-8")).hexdigest()
+
+    def decoded_key(
+        self,
+        object_key: str,
+        fmt: str,
+        columns: Optional[list[str]],
+        options: Dict[str, Any],
+    ) -> str:
+        """Return the key of a decoded frame for an object, format, projection and read options."""
+        params = json.dumps({"format": fmt, "columns": columns, "options": options}, sort_keys=True, default=str)
+        return hashlib.sha256(f"{object_key}\0{params}".encode("utf-8")).hexdigest()
+
+    def fetch(self, fs: Any, path: str, key: str) -> Tuple[BinaryIO, int]:
+        """Return an open local copy of ``path`` and the bytes downloaded (0 on a hit).
+
+        The copy is opened before it is published or looked up, so an entry that
+        another process evicts afterwards is only unlinked; the returned handle
+        stays readable. The caller closes it.
+        """
+        target = self.objects_dir / key
+        handle = self._open(target)
+        if handle is not None:
+            logger.debug("Cache hit for %s", path)
+            return handle, 0
+        with self._lock(key):
+            handle = self._open(target)
+            if handle is not None:
+                return handle, 0
+            logger.debug("Cache miss for %s; downloading", path)
+            tmp = target.with_name(f".{key}.{uuid.uuid4().hex}.tmp")
+            try:
+                with fs.open(path, "rb") as src, tmp.open("wb") as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_BYTES)
+                handle = tmp.open("rb")
+                try:
+                    os.replace(tmp, target)
+                except BaseException:
+                    handle.close()
+                    raise
+            finally:
+                tmp.unlink(missing_ok=True)
+        size = os.fstat(handle.fileno()).st_size
+        self._account(size)
+        return handle, size
+
+    def get_decoded(self, key: str, dtype_backend: str = "numpy") -> Optional[pd.DataFrame]:
+        """Return a cached decoded frame, or None on a miss."""
+        if not self.config.store_decoded:
+            return None
+        target = self.decoded_dir / f"{key}.arrow"
+        if not self._touch(target):
+            return None
+        try:
+            return table_to_pandas(feather.read_table(target, memory_map=True), dtype_backend)
+        except FileNotFoundError:
+            return None
+        except (OSError, pa.ArrowInvalid):
+            logger.warning("Discarding unreadable cache entry %s", target)
+            target.unlink(missing_ok=True)
+            return None
+
+    def put_decoded(self, key: str, df: pd.DataFrame) -> None:
+        """Store a decoded frame as Arrow IPC so reruns skip parsing."""
+        if not self.config.store_decoded:
+            return
+        target = self.decoded_dir / f"{key}.arrow"
+        tmp = target.with_name(f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp)
+            size = tmp.stat().st_size
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._account(size)
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        with self._lock("evict"):
+            entries = []
+            total = 0
+            for directory in (self.objects_dir, self.decoded_dir):
+                for entry in os.scandir(directory):
+                    if entry.name.startswith(".") or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.config.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                if os.path.dirname(path) == str(self.objects_dir):
+                    (self.locks_dir / f"{os.path.basename(path)}.lock").unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            with self._used_lock:
+                self._used_bytes = total
+        if removed:
+            logger.info("Evicted %s cache entries; %.1f MB remain", removed, total / 1e6)
+        return removed
+
+    def _account(self, nbytes: int) -> None:
+        """Add ``nbytes`` just written to the tracked size and evict once it may exceed ``max_bytes``."""
+        with self._used_lock:
+            if self._used_bytes is not None:
+                self._used_bytes += nbytes
+                if self._used_bytes <= self.config.max_bytes:
+                    return
+        self.evict()
+
+    @staticmethod
+    def _touch(path: Path) -> bool:
+        """Mark ``path`` as recently used; return False if it does not exist."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    @staticmethod
+    def _open(path: Path) -> Optional[BinaryIO]:
+        """Open ``path`` for reading and mark it recently used; return None if it does not exist."""
+        try:
+            handle = path.open("rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(handle.fileno())
+        except (NotImplementedError, TypeError):  # pragma: no cover - no utime on descriptors
+            pass
+        return handle
+
+    @contextmanager
+    def _lock(self, name: str) -> Iterator[None]:
+        """Hold an exclusive cross-process lock for ``name`` where supported.
+
+        ``evict`` unlinks an object's lock file with the object, so a lock taken
+        on a file that was unlinked meanwhile is dropped and taken again on the
+        current one.
+        """
+        if fcntl is None:  # pragma: no cover - non-POSIX platforms
+            yield
+            return
+        lock_path = self.locks_dir / f"{name}.lock"
+        while True:
+            with lock_path.open("a") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    if os.stat(lock_path).st_ino != os.fstat(handle.fileno()).st_ino:
+                        continue
+                except FileNotFoundError:
+                    continue
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+                return
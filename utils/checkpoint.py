@@ -0,0 +1,208 @@
+"""On-disk stage checkpoints for incremental pipeline reruns."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from schemas.components import CheckpointConfig
+from utils.arrow import table_to_pandas
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# Bump when a stage's output format or semantics change so old checkpoints are ignored.
+CHECKPOINT_VERSION = 6
+
+
+class StageOutput:
+    """Output of a checkpointed stage: metadata, row counts and lazily loaded frames."""
+
+    def __init__(
+        self,
+        metadata: Dict[str, Any],
+        frames: Dict[str, Any],
+        rows: Dict[str, int],
+        cached: bool,
+        dtype_backend: str = "numpy",
+    ) -> None:
+        self.metadata = metadata
+        self.rows = rows
+        self.cached = cached
+        self.dtype_backend = dtype_backend
+        self._frames = frames
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """Return frame ``name``, reading it from disk on first access for cached outputs.
+
+        With the ``"pyarrow"`` dtype backend the frame's columns wrap the
+        memory-mapped Arrow buffers instead of being converted to NumPy.
+        """
+        value = self._frames[name]
+        if isinstance(value, Path):
+            value = table_to_pandas(feather.read_table(value, memory_map=True), self.dtype_backend)
+            self._frames[name] = value
+        return value
+
+
+class StageCache:
+    """Persist stage outputs as Arrow IPC keyed by a hash of their inputs.
+
+    A stage key chains the key of the upstream stage with the stage's own
+    config sub-block, so changing one block only invalidates the stages at
+    and after the one that reads it. Entries live in
+    ``<directory>/<stage>/<key>/`` and are written to a temporary directory
+    and renamed into place, so an interrupted run never leaves a partial
+    checkpoint behind.
+
+    Args:
+        config: Cache location and retention.
+        stages: All stage names in execution order.
+        force: Stages to recompute even when a checkpoint exists; later
+            stages are recomputed as well.
+        dtype_backend: Backend of frames loaded from checkpoints; see
+            ``utils.arrow.table_to_pandas``.
+    """
+
+    def __init__(
+        self,
+        config: CheckpointConfig,
+        stages: Sequence[str],
+        force: Iterable[str] = (),
+        dtype_backend: str = "numpy",
+    ) -> None:
+        self.config = config
+        self.root = Path(config.directory)
+        self.stages = list(stages)
+        self.forced = _with_downstream(self.stages, force)
+        self.dtype_backend = dtype_backend
+        self._memo: Dict[Tuple[str, str], StageOutput] = {}
+
+    def key(self, stage: str, *parts: Any) -> str:
+        """Return the checkpoint key for ``stage`` given upstream keys and config values."""
+        payload = json.dumps([CHECKPOINT_VERSION, stage, *parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def run(
+        self,
+        stage: str,
+        key: str,
+        compute: Callable[[], Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]],
+    ) -> StageOutput:
+        """Return the checkpoint for ``(stage, key)``, computing and storing it on a miss.
+
+        ``compute`` returns the stage's named frames and JSON-serializable
+        metadata. Results are memoized for the rest of the run.
+        """
+        memo_key = (stage, key)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+        entry = self.root / stage / key
+        output = None
+        if self.config.enabled and stage not in self.forced:
+            output = self._load(entry)
+        if output is not None:
+            logger.info("Stage %s: using checkpoint %s", stage, key[:12])
+        else:
+            frames, metadata = compute()
+            if self.config.enabled:
+                self._store(stage, entry, frames, metadata)
+            rows = {name: len(frame) for name, frame in frames.items()}
+            output = StageOutput(metadata, dict(frames), rows, cached=False)
+        self._memo[memo_key] = output
+        return output
+
+    def is_cached(self, stage: str, key: str) -> bool:
+        """Whether ``run(stage, key)`` would load a stored checkpoint instead of computing."""
+        if not self.config.enabled or stage in self.forced:
+            return False
+        return self._manifest(self.root / stage / key) is not None
+
+    def invalidate(self, stages: Iterable[str]) -> None:
+        """Delete all checkpoints of ``stages`` and of every later stage."""
+        for stage in _with_downstream(self.stages, stages):
+            target = self.root / stage
+            if target.exists():
+                shutil.rmtree(target)
+                logger.info("Invalidated checkpoints for stage %s", stage)
+
+    def _load(self, entry: Path) -> Optional[StageOutput]:
+        """Open a stored checkpoint, or return None when it is absent or unreadable."""
+        manifest = self._manifest(entry)
+        if manifest is None:
+            return None
+        frames: Dict[str, Any] = {name: entry / f"{name}.arrow" for name in manifest["frames"]}
+        os.utime(entry)
+        return StageOutput(
+            manifest["metadata"], frames, manifest.get("rows", {}), cached=True, dtype_backend=self.dtype_backend
+        )
+
+    def _manifest(self, entry: Path) -> Optional[Dict[str, Any]]:
+        """Return a checkpoint's manifest if it and all of its frames exist, else None."""
+        try:
+            manifest = json.loads((entry / "checkpoint.json").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        if not all((entry / f"{name}.arrow").exists() for name in manifest["frames"]):
+            return None
+        return manifest
+
+    def _store(self, stage: str, entry: Path, frames: Dict[str, pd.DataFrame], metadata: Dict[str, Any]) -> None:
+        """Write frames and metadata to a temporary directory and rename it to ``entry``."""
+        tmp = entry.with_name(f".{entry.name}.{uuid.uuid4().hex}.tmp")
+        tmp.mkdir(parents=True)
+        try:
+            # Uncompressed single-batch IPC lets Arrow-backed reruns map the columns
+            # instead of decoding and concatenating them.
+            arrow_backed = self.dtype_backend == "pyarrow"
+            for name, frame in frames.items():
+                table = pa.Table.from_pandas(frame)
+                feather.write_feather(
+                    table,
+                    tmp / f"{name}.arrow",
+                    compression="uncompressed" if arrow_backed else None,
+                    chunksize=max(table.num_rows, 1) if arrow_backed else None,
+                )
+            manifest = {
+                "stage": stage,
+                "frames": sorted(frames),
+                "rows": {name: len(frame) for name, frame in frames.items()},
+                "metadata": metadata,
+            }
+            (tmp / "checkpoint.json").write_text(json.dumps(manifest, default=str))
+            shutil.rmtree(entry, ignore_errors=True)
+            os.rename(tmp, entry)
+        except (pa.ArrowException, TypeError, ValueError) as exc:
+            logger.warning("Not checkpointing stage %s: %s", stage, exc)
+            return
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._prune(entry.parent)
+
+    def _prune(self, stage_dir: Path) -> None:
+        """Keep only the ``keep_per_stage`` most recently used checkpoints of a stage."""
+        entries = [p for p in stage_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        entries.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in entries[self.config.keep_per_stage :]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def _with_downstream(stages: Sequence[str], selected: Iterable[str]) -> set[str]:
+    """Return ``selected`` stages together with every stage after them."""
+    selected = set(selected)
+    unknown = selected - set(stages)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}")
+    if not selected:
+        return set()
+    first = min(stages.index(stage) for stage in selected)
+    return set(stages[first:])
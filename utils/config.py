@@ -1,8 +1,9 @@
 """YAML configuration loader for the pipeline."""
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
 
 import yaml
 
@@ -12,12 +13,67 @@ from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# ``AISRF__GAP_FILL__GAP_THRESHOLD_MINUTES=15`` overrides ``gap_fill.gap_threshold_minutes``.
+ENV_PREFIX = "AISRF__"
+# Default config path for the CLI when ``--config`` is not given.
+ENV_CONFIG_PATH = "AISRF_CONFIG"
 
-def load_config(path: str | Path) -> PipelineConfig:
-    """Load pipeline configuration from YAML."""
+
+def load_config(
+    path: str | Path,
+    overrides: Iterable[str] = (),
+    environ: Optional[Mapping[str, str]] = None,
+) -> PipelineConfig:
+    """Load pipeline configuration from YAML.
+
+    Args:
+        path: Pipeline YAML, optionally nested under a top-level ``pipeline`` key.
+        overrides: ``dotted.key=value`` assignments applied last, e.g.
+            ``parallel.workers=8``. Values are parsed as YAML, so numbers,
+            booleans and lists keep their types.
+        environ: Environment to read ``AISRF__<SECTION>__<KEY>=value``
+            overrides from; ``os.environ`` by default. Names are lowercased
+            and ``__`` separates key levels. Command-line ``overrides`` win.
+    """
     logger.info("Loading configuration from %s", path)
     with open(path, "r", encoding="utf-8") as f:
-        raw_config: Dict[str, Any] = yaml.safe_load(f)
+        raw_config: Dict[str, Any] = yaml.safe_load(f) or {}
     pipeline_cfg = raw_config.get("pipeline", raw_config)
-    # TODO: Apply environment variable overrides if required.
+    environ = os.environ if environ is None else environ
+    assignments = [*env_overrides(environ), *(parse_override(item) for item in overrides)]
+    for dotted, value in assignments:
+        apply_override(pipeline_cfg, dotted, value)
+        logger.info("Config override %s=%r", dotted, value)
     return PipelineConfig(**pipeline_cfg)
+
+
+def parse_override(item: str) -> Tuple[str, Any]:
+    """Split ``dotted.key=value`` into the key path and its YAML-parsed value."""
+    dotted, sep, text = item.partition("=")
+    if not sep or not dotted.strip():
+        raise ValueError(f"Override must look like section.key=value: {item!r}")
+    return dotted.strip(), yaml.safe_load(text)
+
+
+def env_overrides(environ: Mapping[str, str]) -> list[Tuple[str, Any]]:
+    """Return ``(dotted_key, value)`` pairs for every ``AISRF__`` variable, sorted by name."""
+    pairs = []
+    for name in sorted(environ):
+        if name.startswith(ENV_PREFIX) and len(name) > len(ENV_PREFIX):
+            dotted = ".".join(part.lower() for part in name[len(ENV_PREFIX) :].split("__"))
+            pairs.append((dotted, yaml.safe_load(environ[name])))
+    return pairs
+
+
+def apply_override(config: Dict[str, Any], dotted: str, value: Any) -> None:
+    """Set ``config[a][b]...[z] = value`` for ``dotted`` ``a.b...z``, creating missing blocks."""
+    *parents, leaf = dotted.split(".")
+    node = config
+    for i, key in enumerate(parents):
+        child = node.setdefault(key, {})
+        if child is None:
+            child = node[key] = {}
+        if not isinstance(child, dict):
+            raise ValueError(f"Cannot override {dotted}: {'.'.join(parents[: i + 1])} is not a mapping")
+        node = child
+    node[leaf] = value
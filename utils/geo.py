@@ -0,0 +1,56 @@
+"""Geodesy helpers for AIS-RF fusion."""
+from __future__ import annotations
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized great-circle distance in kilometres between degree coordinates."""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lon2) - np.asarray(lon1))
+    a = np.sin(dlat * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon * 0.5) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def initial_bearing_deg(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized initial great-circle bearing in degrees ``[0, 360)`` from point 1 to point 2."""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlon = np.radians(np.asarray(lon2) - np.asarray(lon1))
+    y = np.sin(dlon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+def great_circle_interpolate(lat1, lon1, lat2, lon2, fraction) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized spherical linear interpolation (slerp) between degree coordinates.
+
+    Returns the ``(lat, lon)`` a ``fraction`` of the way along the great circle
+    from point 1 (0) to point 2 (1). Nearly coincident points fall back to
+    normalized linear interpolation of their unit vectors. Arguments
+    broadcast against each other.
+    """
+    x1, y1, z1 = _unit_vectors(lat1, lon1)
+    x2, y2, z2 = _unit_vectors(lat2, lon2)
+    fraction = np.asarray(fraction, dtype=np.float64)
+    omega = np.arccos(np.clip(x1 * x2 + y1 * y2 + z1 * z2, -1.0, 1.0))
+    sin_omega = np.sin(omega)
+    small = sin_omega < 1e-9
+    safe = np.where(small, 1.0, sin_omega)
+    w1 = np.where(small, 1.0 - fraction, np.sin((1.0 - fraction) * omega) / safe)
+    w2 = np.where(small, fraction, np.sin(fraction * omega) / safe)
+    x, y, z = w1 * x1 + w2 * x2, w1 * y1 + w2 * y2, w1 * z1 + w2 * z2
+    norm = np.maximum(np.sqrt(x * x + y * y + z * z), 1e-12)
+    return np.degrees(np.arcsin(np.clip(z / norm, -1.0, 1.0))), np.degrees(np.arctan2(y, x))
+
+
+def _unit_vectors(lat, lon) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the ``(x, y, z)`` components of Earth-centred unit vectors of degree coordinates."""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)
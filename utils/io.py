@@ -1,59 +1,456 @@
 """I/O utilities for reading from local or S3-backed storage."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from datetime import timedelta
+from typing import IO, Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 try:
-    import s3fs  # type: ignore
+    from fsspec.implementations.local import LocalFileSystem  # type: ignore
 except ImportError:  # pragma: no cover - optional dependency
-    s3fs = None
+    LocalFileSystem = None
 
+from schemas.components import DataSourceConfig
+from utils.arrow import combine_arrow_chunks, table_to_pandas
+from utils.cache import CacheConfig, ObjectCache, object_version
 from utils.logging import get_logger
 
 
 logger = get_logger(__name__)
 
 
-@dataclass
-class DataSourceConfig:
-    """Runtime configuration for a data source."""
-
-    type: str  # "local" or "s3"
-    path: Optional[str] = None
-    format: str = "parquet"
-    options: Optional[Dict[str, Any]] = None
-    s3: Optional[Dict[str, Any]] = None
-
+def read_dataframe(
+    config: DataSourceConfig,
+    columns: Optional[list[str]] = None,
+    time_range: Optional[Tuple[Any, Any]] = None,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    mmsi: Optional[Sequence[int]] = None,
+) -> pd.DataFrame:
+    """Generic DataFrame reader supporting CSV and Parquet from local or S3.
 
-def read_dataframe(config: DataSourceConfig, columns: Optional[list[str]] = None) -> pd.DataFrame:
-    """Generic DataFrame reader supporting CSV and Parquet from local or S3."""
+    ``time_range``, ``bbox`` and ``mmsi`` override the matching
+    ``DataSourceConfig`` filters. When any filter or a partitioning scheme is
+    set, the source is scanned as a pyarrow dataset so partition directories
+    and parquet row groups outside the filter are never read. ZIP archives
+    and cached S3 sources are read object by object instead, and the same
+    filters are applied to each decoded object.
+    """
+    config = _with_filters(config, time_range, bbox, mmsi)
     logger.info("Reading %s data from %s", config.format, config.type)
     read_options = config.options or {}
+    cached_remote = bool(config.cache) and config.type == "s3"
+    if config.has_pushdown and config.format != "zip" and not cached_remote:
+        return _read_dataset(config, columns)
+    if config.is_multi_object or cached_remote:
+        fs, root = _filesystem(config)
+        return read_objects(
+            fs,
+            list_objects(fs, root, config.format),
+            config.format,
+            columns=columns,
+            options=read_options,
+            max_workers=config.max_workers,
+            max_retries=config.max_retries,
+            cache=ObjectCache(CacheConfig(**config.cache)) if cached_remote else None,
+            dtype_backend=config.dtype_backend,
+            row_filter=_row_filter(config),
+        )
     if config.type == "local":
         if not config.path:
             raise ValueError("Local data source requires 'path'.")
-        return _read_local(config.path, config.format, columns, read_options)
+        return _read_local(config.path, config.format, columns, read_options, config.dtype_backend)
     if config.type == "s3":
         return _read_s3(config, columns, read_options)
     raise ValueError(f"Unsupported data source type: {config.type}")
 
 
-def _read_local(path: str, fmt: str, columns: Optional[list[str]], options: Dict[str, Any]) -> pd.DataFrame:
+def _read_local(
+    path: str,
+    fmt: str,
+    columns: Optional[list[str]],
+    options: Dict[str, Any],
+    dtype_backend: str = "numpy",
+) -> pd.DataFrame:
     """Read DataFrame from local filesystem."""
     if fmt == "parquet":
+        if dtype_backend == "pyarrow":
+            return table_to_pandas(pq.read_table(path, columns=columns, **options), dtype_backend)
         return pd.read_parquet(path, columns=columns, **options)
     if fmt == "csv":
+        if dtype_backend == "pyarrow":
+            return combine_arrow_chunks(pd.read_csv(path, usecols=columns, dtype_backend="pyarrow", **options))
         return pd.read_csv(path, usecols=columns, **options)
     raise ValueError(f"Unsupported local format: {fmt}")
 
 
 def _read_s3(config: DataSourceConfig, columns: Optional[list[str]], options: Dict[str, Any]) -> pd.DataFrame:
     """Read DataFrame from S3 using s3fs."""
-    if s3fs is None:
-        raise ImportError("s3fs is required for S3 data sources.")
+    fs, s3_path = _s3_target(config)
+    logger.debug("Reading from S3 path %s", s3_path)
+    with fs.open(s3_path) as f:
+        if config.format == "parquet":
+            if config.dtype_backend == "pyarrow":
+                return table_to_pandas(pq.read_table(f, columns=columns, **options), config.dtype_backend)
+            return pd.read_parquet(f, columns=columns, **options)
+        if config.format == "csv":
+            return pd.read_csv(f, usecols=columns, **options)
+        raise ValueError(f"Unsupported S3 format: {config.format}")
+
+
+def iter_dataframe_batches(
+    config: DataSourceConfig,
+    batch_size: int,
+    columns: Optional[list[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream a CSV or Parquet source as DataFrames of at most ``batch_size`` rows.
+
+    Parquet is read row group by row group and CSV through ``chunksize``, so
+    peak memory is bounded by the batch rather than the object. Columns in
+    ``columns`` that the source does not contain are skipped.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+    logger.info("Streaming %s data from %s in batches of %s rows", config.format, config.type, batch_size)
+    read_options = config.options or {}
+    if config.has_pushdown and config.format != "zip":
+        dataset, projected, expression = _scan_plan(config, columns)
+        for batch in dataset.to_batches(columns=projected, filter=expression, batch_size=batch_size):
+            yield table_to_pandas(pa.Table.from_batches([batch]), config.dtype_backend)
+        return
+    if config.is_multi_object:
+        row_filter = _row_filter(config)
+        fs, root = _filesystem(config)
+        for path in list_objects(fs, root, config.format):
+            with fs.open(path, "rb") as f:
+                for batch in _iter_object_batches(
+                    f, path, config.format, batch_size, columns, read_options, config.dtype_backend
+                ):
+                    yield batch if row_filter is None else row_filter(batch)
+        return
+    with _open_source(config) as f:
+        yield from _iter_object_batches(
+            f, config.path or "", config.format, batch_size, columns, read_options, config.dtype_backend
+        )
+
+
+def _iter_object_batches(
+    f: IO[bytes],
+    path: str,
+    fmt: str,
+    batch_size: int,
+    columns: Optional[list[str]],
+    options: Dict[str, Any],
+    dtype_backend: str = "numpy",
+) -> Iterator[pd.DataFrame]:
+    """Yield bounded batches from one open CSV, Parquet or ZIP object."""
+    fmt = _object_format(path, fmt) or fmt
+    if fmt == "parquet":
+        parquet_file = pq.ParquetFile(f)
+        available = parquet_file.schema_arrow.names
+        projected = [c for c in columns if c in available] if columns else None
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=projected):
+            yield table_to_pandas(pa.Table.from_batches([batch]), dtype_backend)
+    elif fmt == "csv":
+        if dtype_backend == "pyarrow":
+            options = {**options, "dtype_backend": "pyarrow"}
+        reader = pd.read_csv(f, usecols=_usecols(columns), chunksize=batch_size, **options)
+        with reader:
+            for chunk in reader:
+                yield chunk
+    elif fmt == "zip":
+        with zipfile.ZipFile(f) as archive:
+            for member in _zip_members(archive):
+                member_format = _object_format(member, "")
+                if member_format == "parquet":
+                    # Parquet needs random access; buffer the member in memory.
+                    buffer = io.BytesIO(archive.read(member))
+                    yield from _iter_object_batches(
+                        buffer, member, "parquet", batch_size, columns, options, dtype_backend
+                    )
+                else:
+                    with archive.open(member) as member_file:
+                        yield from _iter_object_batches(
+                            member_file, member, "csv", batch_size, columns, options, dtype_backend
+                        )
+    else:
+        raise ValueError(f"Unsupported streaming format: {fmt}")
+
+
+@contextmanager
+def _open_source(config: DataSourceConfig) -> Iterator[IO[bytes]]:
+    """Open the configured local path or S3 object as a binary file handle."""
+    if config.type == "local":
+        if not config.path:
+            raise ValueError("Local data source requires 'path'.")
+        with open(config.path, "rb") as f:
+            yield f
+        return
+    if config.type == "s3":
+        fs, s3_path = _s3_target(config)
+        logger.debug("Streaming from S3 path %s", s3_path)
+        with fs.open(s3_path, "rb") as f:
+            yield f
+        return
+    raise ValueError(f"Unsupported data source type: {config.type}")
+
+
+def list_objects(fs: Any, root: str, fmt: str) -> list[str]:
+    """Return the sorted object paths under ``root`` that can be decoded.
+
+    A ``root`` naming a single object is returned as-is. Under a prefix, only
+    ``.csv``, ``.parquet`` and ``.zip`` objects are kept, so markers such as
+    ``_SUCCESS`` are ignored.
+    """
+    if not fs.isdir(root):
+        return [root]
+    paths = sorted(p for p in fs.find(root) if _object_format(p, "") is not None)
+    logger.info("Listed %s objects under %s", len(paths), root)
+    return paths
+
+
+def source_fingerprint(config: DataSourceConfig) -> str:
+    """Return a hash of a source's configuration and the versions of its objects.
+
+    Object versions are ETags where the store provides them and size plus
+    modification time otherwise, so the fingerprint changes whenever an input
+    object is added, removed or rewritten. Settings that only affect read
+    performance or in-memory layout (workers, retries, cache, dtype backend)
+    are excluded.
+    """
+    fs, root = _filesystem(config)
+    if fs.isdir(root):
+        listing = fs.find(root, detail=True)
+        objects = sorted(
+            (path, object_version(info)) for path, info in listing.items() if _object_format(path, "") is not None
+        )
+    else:
+        objects = [(root, object_version(fs.info(root)))]
+    settings = {
+        key: value
+        for key, value in asdict(config).items()
+        if key not in ("max_workers", "max_retries", "cache", "dtype_backend")
+    }
+    payload = json.dumps({"source": settings, "objects": objects}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def read_objects(
+    fs: Any,
+    paths: Sequence[str],
+    fmt: str,
+    columns: Optional[list[str]] = None,
+    options: Optional[Dict[str, Any]] = None,
+    max_workers: int = 8,
+    max_retries: int = 3,
+    cache: Optional[ObjectCache] = None,
+    dtype_backend: str = "numpy",
+    row_filter: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+) -> pd.DataFrame:
+    """Fetch and decode many objects concurrently and concatenate them in path order.
+
+    Args:
+        fs: fsspec-compatible filesystem (``s3fs.S3FileSystem``, a local or
+            in-memory filesystem for tests).
+        paths: Object paths, typically from ``list_objects``.
+        fmt: Default format for objects without a recognised extension.
+        columns: Optional projection; missing columns are skipped.
+        options: Extra keyword arguments for ``pandas.read_csv``.
+        max_workers: Size of the bounded fetch/decode thread pool.
+        max_retries: Attempts per object before the error is raised.
+        cache: Optional local cache; hits skip the download and, when decoded
+            frames are stored, the parse as well.
+        dtype_backend: ``"numpy"`` or ``"pyarrow"``; see ``utils.arrow.table_to_pandas``.
+        row_filter: Optional function applied to each decoded object before
+            concatenation, e.g. from ``_row_filter``; cached frames are stored unfiltered.
+    """
+    stats = _TransferStats()
+    options = options or {}
+
+    def fetch(path: str) -> pd.DataFrame:
+        frame = _read_object_with_retries(fs, path, fmt, columns, options, max_retries, stats, cache, dtype_backend)
+        return frame if row_filter is None or not len(frame.columns) else row_filter(frame)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        frames = list(pool.map(fetch, paths))
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Read %s objects (%.1f MB fetched, %s cache hits, %s retries) in %.2fs: %.1f MB/s",
+        len(paths),
+        stats.bytes_read / 1e6,
+        stats.cache_hits,
+        stats.retries,
+        elapsed,
+        stats.bytes_read / 1e6 / max(elapsed, 1e-9),
+    )
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    combined = pd.concat(frames, ignore_index=True)
+    return combine_arrow_chunks(combined) if dtype_backend == "pyarrow" else combined
+
+
+@dataclass
+class _TransferStats:
+    """Thread-safe byte and retry counters for a multi-object read."""
+
+    bytes_read: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, nbytes: int = 0, retries: int = 0, cache_hits: int = 0) -> None:
+        with self.lock:
+            self.bytes_read += nbytes
+            self.retries += retries
+            self.cache_hits += cache_hits
+
+
+def _read_object_with_retries(
+    fs: Any,
+    path: str,
+    fmt: str,
+    columns: Optional[list[str]],
+    options: Dict[str, Any],
+    max_retries: int,
+    stats: _TransferStats,
+    cache: Optional[ObjectCache] = None,
+    dtype_backend: str = "numpy",
+) -> pd.DataFrame:
+    """Decode one object, retrying transient I/O errors with exponential backoff."""
+    if cache is not None:
+        object_key = cache.object_key(path, fs.info(path))
+        decoded_key = cache.decoded_key(object_key, fmt, columns, options)
+        cached = cache.get_decoded(decoded_key, dtype_backend)
+        if cached is not None:
+            stats.add(cache_hits=1)
+            return cached
+    attempts = max(1, max_retries)
+    for attempt in range(1, attempts + 1):
+        try:
+            if cache is None:
+                with fs.open(path, "rb") as f:
+                    frame = _decode_object(f, path, fmt, columns, options, dtype_backend)
+                stats.add(nbytes=int(fs.size(path) or 0))
+                return frame
+            local_file, downloaded = cache.fetch(fs, path, object_key)
+            stats.add(nbytes=downloaded, cache_hits=int(downloaded == 0))
+            with local_file as f:
+                frame = _decode_object(f, path, fmt, columns, options, dtype_backend)
+            cache.put_decoded(decoded_key, frame)
+            return frame
+        except FileNotFoundError:
+            raise
+        except (OSError, EOFError, zipfile.BadZipFile) as exc:
+            if attempt == attempts:
+                raise
+            delay = 0.5 * 2 ** (attempt - 1)
+            logger.warning("Retrying %s (attempt %s/%s) in %.1fs: %s", path, attempt, attempts, delay, exc)
+            stats.add(retries=1)
+            time.sleep(delay)
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+def _decode_object(
+    f: IO[bytes],
+    path: str,
+    fmt: str,
+    columns: Optional[list[str]],
+    options: Dict[str, Any],
+    dtype_backend: str = "numpy",
+) -> pd.DataFrame:
+    """Decode a CSV, Parquet or ZIP object from an open binary handle."""
+    fmt = _object_format(path, fmt) or fmt
+    if fmt == "parquet":
+        parquet_file = pq.ParquetFile(f)
+        available = parquet_file.schema_arrow.names
+        projected = [c for c in columns if c in available] if columns else None
+        return table_to_pandas(parquet_file.read(columns=projected), dtype_backend)
+    if fmt == "csv":
+        if dtype_backend == "pyarrow":
+            options = {**options, "dtype_backend": "pyarrow"}
+        return pd.read_csv(f, usecols=_usecols(columns), **options)
+    if fmt == "zip":
+        # ZipFile reads the central directory and members through seeks on the
+        # open handle, so nothing is extracted to disk.
+        with zipfile.ZipFile(f) as archive:
+            frames = []
+            for member in _zip_members(archive):
+                if _object_format(member, "") == "parquet":
+                    buffer = io.BytesIO(archive.read(member))
+                    frames.append(_decode_object(buffer, member, "parquet", columns, options, dtype_backend))
+                else:
+                    with archive.open(member) as member_file:
+                        frames.append(_decode_object(member_file, member, "csv", columns, options, dtype_backend))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    raise ValueError(f"Unsupported object format: {fmt}")
+
+
+def _zip_members(archive: zipfile.ZipFile) -> list[str]:
+    """Return the sorted CSV/Parquet member names of a ZIP archive."""
+    return sorted(
+        info.filename
+        for info in archive.infolist()
+        if not info.is_dir() and _object_format(info.filename, "") in ("csv", "parquet")
+    )
+
+
+def _object_format(path: str, default: str) -> Optional[str]:
+    """Infer an object's format from its extension, falling back to ``default``."""
+    name = path.lower()
+    if name.endswith(".zip"):
+        return "zip"
+    if name.endswith((".parquet", ".pq")):
+        return "parquet"
+    if name.endswith((".csv", ".csv.gz", ".txt")):
+        return "csv"
+    return default or None
+
+
+def _usecols(columns: Optional[list[str]]) -> Any:
+    """Return a ``read_csv`` ``usecols`` that tolerates absent columns."""
+    if not columns:
+        return None
+    wanted = set(columns)
+    return lambda name: name in wanted
+
+
+def _filesystem(config: DataSourceConfig) -> tuple[Any, str]:
+    """Return an fsspec filesystem and root path for the configured source."""
+    if config.type == "s3":
+        return _s3_target(config)
+    if config.type == "local":
+        if not config.path:
+            raise ValueError("Local data source requires 'path'.")
+        if LocalFileSystem is None:
+            raise ImportError("fsspec is required for multi-object local sources.")
+        return LocalFileSystem(), os.path.abspath(config.path)
+    raise ValueError(f"Unsupported data source type: {config.type}")
+
+
+def _s3_target(config: DataSourceConfig) -> tuple[Any, str]:
+    """Return an S3 filesystem and ``bucket/key`` path for the configured object."""
+    # Imported on first S3 use: s3fs pulls in aiobotocore and aiohttp, which
+    # cost about half a second of startup for local runs.
+    try:
+        import s3fs  # type: ignore
+    except ImportError:  # pragma: no cover - optional dependency
+        raise ImportError("s3fs is required for S3 data sources.") from None
     if not config.s3:
         raise ValueError("S3 data source requires 's3' configuration block.")
     bucket = config.s3.get("bucket")
@@ -62,11 +459,203 @@ def _read_s3(config: DataSourceConfig, columns: Optional[list[str]], options: Di
     if not bucket or not key:
         raise ValueError("S3 configuration must include 'bucket' and 'key'.")
     fs = s3fs.S3FileSystem(profile=profile) if profile else s3fs.S3FileSystem()
-    s3_path = f"{bucket}/{key}"
-    logger.debug("Reading from S3 path %s", s3_path)
-    with fs.open(s3_path) as f:
-        if config.format == "parquet":
-            return pd.read_parquet(f, columns=columns, **options)
-        if config.format == "csv":
-            return pd.read_csv(f, usecols=columns, **options)
-        raise ValueError(f"Unsupported S3 format: {config.format}")
+    return fs, f"{bucket}/{key}"
+
+
+def build_dataset_filter(
+    schema: pa.Schema,
+    time_range: Optional[Tuple[Any, Any]] = None,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    mmsi: Optional[Sequence[int]] = None,
+    partitioning: Optional[str] = None,
+) -> Optional[ds.Expression]:
+    """Translate time, bounding-box and MMSI filters into a pyarrow expression.
+
+    Column filters let the parquet reader skip row groups using min/max
+    statistics; with ``partitioning`` set, the time range also prunes
+    ``YYYY/MM/DD`` (``date``) or hive ``date=`` directories before any file is
+    opened. The time range is half-open, ``[start, end)``, so consecutive
+    ranges never read a row twice. Filters whose columns are missing from
+    ``schema`` are skipped.
+    """
+    names = set(schema.names)
+    clauses: list[ds.Expression] = []
+    if time_range is not None:
+        start_ms, end_ms = (_to_epoch_ms(value) for value in time_range)
+        ts_clause = _time_clause(schema, "ts_utc", start_ms, end_ms)
+        if ts_clause is not None:
+            clauses.append(ts_clause)
+        partition_clause = _partition_clause(schema, partitioning, start_ms, end_ms)
+        if partition_clause is not None:
+            clauses.append(partition_clause)
+    if bbox is not None:
+        lat_col, lon_col = ("est_lat", "est_lon") if "est_lat" in names else ("lat", "lon")
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox)
+        if lat_col in names and lon_col in names:
+            clauses.append((ds.field(lat_col) >= min_lat) & (ds.field(lat_col) <= max_lat))
+            clauses.append((ds.field(lon_col) >= min_lon) & (ds.field(lon_col) <= max_lon))
+        else:
+            logger.warning("Skipping bbox filter: no lat/lon columns in schema")
+    if mmsi is not None:
+        if "mmsi" in names:
+            values = pa.array(sorted({int(m) for m in mmsi}), type=schema.field("mmsi").type)
+            clauses.append(ds.field("mmsi").isin(values))
+        else:
+            logger.warning("Skipping MMSI filter: no mmsi column in schema")
+    if not clauses:
+        return None
+    expression = clauses[0]
+    for clause in clauses[1:]:
+        expression = expression & clause
+    return expression
+
+
+def _with_filters(
+    config: DataSourceConfig,
+    time_range: Optional[Tuple[Any, Any]],
+    bbox: Optional[Tuple[float, float, float, float]],
+    mmsi: Optional[Sequence[int]],
+) -> DataSourceConfig:
+    """Return ``config`` with any explicitly passed filters applied."""
+    overrides: Dict[str, Any] = {}
+    if time_range is not None:
+        overrides["time_range"] = tuple(time_range)
+    if bbox is not None:
+        overrides["bbox"] = tuple(bbox)
+    if mmsi is not None:
+        overrides["mmsi"] = list(mmsi)
+    return replace(config, **overrides) if overrides else config
+
+
+def _row_filter(config: DataSourceConfig) -> Optional[Callable[[pd.DataFrame], pd.DataFrame]]:
+    """Return a function applying ``config``'s filters to a decoded frame, or None without filters.
+
+    Objects read one by one have no partition directories, so only the
+    ``ts_utc``, bbox and MMSI column predicates of ``build_dataset_filter``
+    apply. They are evaluated on an Arrow view of just the filtered columns.
+    """
+    if not any(v is not None for v in (config.time_range, config.bbox, config.mmsi)):
+        return None
+
+    def apply(frame: pd.DataFrame) -> pd.DataFrame:
+        names = [c for c in ("ts_utc", "lat", "lon", "est_lat", "est_lon", "mmsi") if c in frame.columns]
+        table = pa.Table.from_pandas(frame[names], preserve_index=False)
+        expression = build_dataset_filter(table.schema, config.time_range, config.bbox, config.mmsi)
+        if expression is None:
+            return frame
+        table = table.append_column("__row", pa.array(np.arange(len(frame), dtype=np.int64)))
+        rows = table.filter(expression).column("__row").to_numpy()
+        return frame if len(rows) == len(frame) else frame.take(rows).reset_index(drop=True)
+
+    return apply
+
+
+def _read_dataset(config: DataSourceConfig, columns: Optional[list[str]]) -> pd.DataFrame:
+    """Read a filtered, projected pyarrow dataset scan into pandas."""
+    dataset, projected, expression = _scan_plan(config, columns)
+    logger.debug("Scanning dataset with filter %s", expression)
+    table = dataset.to_table(columns=projected, filter=expression)
+    logger.info("Pushdown scan returned %s rows", table.num_rows)
+    return table_to_pandas(table, config.dtype_backend)
+
+
+def _scan_plan(
+    config: DataSourceConfig,
+    columns: Optional[list[str]],
+) -> Tuple[ds.Dataset, Optional[list[str]], Optional[ds.Expression]]:
+    """Open the source as a dataset and derive its projection and filter."""
+    if config.format not in ("parquet", "csv"):
+        raise ValueError(f"Unsupported dataset format: {config.format}")
+    if config.type == "local":
+        if not config.path:
+            raise ValueError("Local data source requires 'path'.")
+        source, filesystem = config.path, None
+    elif config.type == "s3":
+        filesystem, source = _s3_target(config)
+    else:
+        raise ValueError(f"Unsupported data source type: {config.type}")
+    dataset = ds.dataset(
+        source,
+        format=config.format,
+        filesystem=filesystem,
+        partitioning=_partitioning(config.partitioning),
+    )
+    expression = build_dataset_filter(
+        dataset.schema, config.time_range, config.bbox, config.mmsi, config.partitioning
+    )
+    partition_fields = set(_PARTITION_FIELDS.get(config.partitioning or "", ()))
+    if columns:
+        projected = [c for c in columns if c in dataset.schema.names]
+    else:
+        projected = [c for c in dataset.schema.names if c not in partition_fields]
+    return dataset, projected, expression
+
+
+_PARTITION_FIELDS: Dict[str, Tuple[str, ...]] = {"date": ("year", "month", "day")}
+
+
+def _partitioning(kind: Optional[str]) -> Any:
+    """Return the pyarrow partitioning for a configured directory layout."""
+    if kind is None:
+        return None
+    if kind == "date":
+        return ds.partitioning(pa.schema([("year", pa.int32()), ("month", pa.int32()), ("day", pa.int32())]))
+    if kind == "hive":
+        return "hive"
+    raise ValueError(f"Unsupported partitioning: {kind}")
+
+
+def _to_epoch_ms(value: Any) -> int:
+    """Convert an epoch-ms number, ISO string or datetime to epoch milliseconds."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize("UTC")
+    return int(timestamp.value // 1_000_000)
+
+
+def _time_clause(schema: pa.Schema, column: str, start_ms: int, end_ms: int) -> Optional[ds.Expression]:
+    """Return a ``[start_ms, end_ms)`` predicate on ``column`` typed to match the stored values."""
+    if column not in schema.names:
+        logger.warning("Skipping time filter: no %s column in schema", column)
+        return None
+    field_type = schema.field(column).type
+    if pa.types.is_integer(field_type) or pa.types.is_floating(field_type):
+        low, high = pa.scalar(start_ms, field_type), pa.scalar(end_ms, field_type)
+    elif pa.types.is_timestamp(field_type):
+        low = pa.scalar(start_ms, pa.timestamp("ms", tz=field_type.tz)).cast(field_type)
+        high = pa.scalar(end_ms, pa.timestamp("ms", tz=field_type.tz)).cast(field_type)
+    else:
+        logger.warning("Skipping time filter: unsupported %s type %s", column, field_type)
+        return None
+    return (ds.field(column) >= low) & (ds.field(column) < high)
+
+
+def _partition_clause(
+    schema: pa.Schema,
+    partitioning: Optional[str],
+    start_ms: int,
+    end_ms: int,
+) -> Optional[ds.Expression]:
+    """Return a directory-level predicate covering the days in ``[start_ms, end_ms)``.
+
+    The end is exclusive, so a range ending at midnight does not read the next day.
+    """
+    start_day = pd.Timestamp(start_ms, unit="ms").date()
+    end_day = pd.Timestamp(max(end_ms - 1, start_ms), unit="ms").date()
+    if partitioning == "date":
+        days = [start_day + timedelta(days=i) for i in range((end_day - start_day).days + 1)]
+        clause = None
+        for day in days:
+            match = (ds.field("year") == day.year) & (ds.field("month") == day.month) & (ds.field("day") == day.day)
+            clause = match if clause is None else clause | match
+        return clause
+    if partitioning == "hive" and "date" in schema.names:
+        field_type = schema.field("date").type
+        if pa.types.is_date(field_type):
+            return (ds.field("date") >= pa.scalar(start_day, field_type)) & (
+                ds.field("date") <= pa.scalar(end_day, field_type)
+            )
+        return (ds.field("date") >= start_day.isoformat()) & (ds.field("date") <= end_day.isoformat())
+    return None
@@ -0,0 +1,223 @@
+"""Per-stage resource instrumentation for pipeline runs."""
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import platform
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    resource = None
+
+try:
+    import pyinstrument  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    pyinstrument = None
+
+from schemas.components import ProfilingConfig
+from utils.arrow import COPY_COUNTER
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class StageMetrics:
+    """Resource usage of one pipeline stage."""
+
+    stage: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    bytes_read: Optional[int] = None
+    cached: bool = False
+    column_copies: int = 0
+    copied_mb: float = 0.0
+
+
+@dataclass
+class StageProfiler:
+    """Measure wall time, CPU time, peak RSS, rows and bytes read per stage.
+
+    CPU time includes reaped child processes, so process-pool shard workers
+    are charged to the stage that ran them. Peak RSS is the stage's own
+    high-water mark where Linux allows resetting it through
+    ``/proc/self/clear_refs``, and the process-lifetime peak otherwise. Bytes
+    read come from ``rchar`` in ``/proc/self/io`` and cover files and sockets.
+    Column copies are the ``utils.arrow.COPY_COUNTER`` conversions made in
+    this process while the stage ran.
+    """
+
+    config: ProfilingConfig = field(default_factory=ProfilingConfig)
+    stages: List[StageMetrics] = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageMetrics]:
+        """Instrument the enclosed block; set ``rows_out``/``cached`` on the yielded record."""
+        metrics = StageMetrics(stage=name, rows_in=rows_in)
+        profiler = self._start_profiler(name)
+        _reset_peak_rss()
+        bytes_before = _bytes_read()
+        copies_before = COPY_COUNTER.snapshot()
+        cpu_before = _cpu_seconds()
+        wall_before = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.wall_s = time.perf_counter() - wall_before
+            metrics.cpu_s = _cpu_seconds() - cpu_before
+            bytes_after = _bytes_read()
+            if bytes_before is not None and bytes_after is not None:
+                metrics.bytes_read = bytes_after - bytes_before
+            metrics.peak_rss_mb = _peak_rss_mb()
+            copies_after = COPY_COUNTER.snapshot()
+            metrics.column_copies = copies_after["copies"] - copies_before["copies"]
+            metrics.copied_mb = (copies_after["bytes_copied"] - copies_before["bytes_copied"]) / 1e6
+            if profiler is not None:
+                self._dump_profile(name, profiler)
+            self.stages.append(metrics)
+            logger.info(
+                "Stage %s finished in %.2fs (cpu %.2fs, peak rss %s MB)",
+                name,
+                metrics.wall_s,
+                metrics.cpu_s,
+                _fmt(metrics.peak_rss_mb),
+            )
+
+    def summary_table(self) -> str:
+        """Return a fixed-width table of all recorded stages."""
+        header = (
+            f"{'stage':<14}{'wall_s':>9}{'cpu_s':>9}{'rss_mb':>9}{'rows_in':>12}{'rows_out':>12}"
+            f"{'read_mb':>10}{'copy_mb':>9}  cached"
+        )
+        lines = [header, "-" * len(header)]
+        for m in self.stages:
+            read_mb = m.bytes_read / 1e6 if m.bytes_read is not None else None
+            lines.append(
+                f"{m.stage:<14}{m.wall_s:>9.2f}{m.cpu_s:>9.2f}{_fmt(m.peak_rss_mb):>9}"
+                f"{_fmt(m.rows_in):>12}{_fmt(m.rows_out):>12}{_fmt(read_mb):>10}{_fmt(m.copied_mb):>9}"
+                f"  {'yes' if m.cached else 'no'}"
+            )
+        total_wall = sum(m.wall_s for m in self.stages)
+        total_cpu = sum(m.cpu_s for m in self.stages)
+        lines.append("-" * len(header))
+        lines.append(f"{'total':<14}{total_wall:>9.2f}{total_cpu:>9.2f}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a machine-readable report of the run for tracking across releases."""
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "total_wall_s": sum(m.wall_s for m in self.stages),
+            "total_cpu_s": sum(m.cpu_s for m in self.stages),
+            "stages": [asdict(m) for m in self.stages],
+        }
+
+    def write_json(self) -> str:
+        """Write ``to_dict()`` to ``<directory>/<metrics_name>``; return its path."""
+        path = Path(self.config.directory) / self.config.metrics_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return str(path)
+
+    def _start_profiler(self, name: str) -> Any:
+        """Start a profiler if ``name`` is the configured ``profile_stage``."""
+        if name != self.config.profile_stage:
+            return None
+        if self.config.profiler == "pyinstrument":
+            if pyinstrument is None:
+                logger.warning("pyinstrument is not installed; falling back to cProfile")
+            else:
+                profiler = pyinstrument.Profiler()
+                profiler.start()
+                return profiler
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _dump_profile(self, name: str, profiler: Any) -> None:
+        """Stop ``profiler`` and write its report next to the metrics JSON."""
+        directory = Path(self.config.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            path = directory / f"{name}.prof"
+            profiler.dump_stats(path)
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(30)
+            (directory / f"{name}.txt").write_text(text.getvalue())
+        else:
+            profiler.stop()
+            path = directory / f"{name}.html"
+            path.write_text(profiler.output_html())
+        logger.info("Wrote %s profile to %s", name, path)
+
+
+def _cpu_seconds() -> float:
+    """Return user+system CPU seconds of this process and its reaped children."""
+    if resource is None:  # pragma: no cover - non-POSIX platforms
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _reset_peak_rss() -> None:
+    """Reset the kernel's RSS high-water mark for this process where supported."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Return peak RSS in MB since the last reset (Linux) or process start."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:  # pragma: no cover - non-POSIX platforms
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere.
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def _bytes_read() -> Optional[int]:
+    """Return bytes read by this process so far, or None when ``/proc`` is unavailable."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _fmt(value: Optional[float]) -> str:
+    """Format an optional number for the summary table."""
+    if value is None:
+        return "-"
+    if isinstance(value, int):
+        return str(value)
+    return f"{value:.1f}"
@@ -0,0 +1,32 @@
+"""Vectorized helpers for working with many integer ranges at once."""
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+
+def chunk_bounds(counts: np.ndarray, limit: int) -> List[Tuple[int, int]]:
+    """Split ``counts`` into consecutive ``[lo, hi)`` runs whose sums stay near ``limit``."""
+    cumulative = np.cumsum(counts)
+    total = int(cumulative[-1]) if len(cumulative) else 0
+    if total == 0:
+        return []
+    cuts = np.searchsorted(cumulative, np.arange(limit, total, limit), side="right")
+    bounds = np.unique(np.concatenate(([0], cuts, [len(counts)])))
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+def expand_ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenate ``arange(start, start + count)`` for every range without a loop."""
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    nonzero = counts > 0
+    starts = starts[nonzero]
+    counts = counts[nonzero]
+    ends = np.cumsum(counts)
+    steps = np.ones(total, dtype=np.int64)
+    steps[0] = starts[0]
+    steps[ends[:-1]] = starts[1:] - (starts[:-1] + counts[:-1] - 1)
+    return np.cumsum(steps)
@@ -2,6 +2,12 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from utils.arrow import numeric_view
 
 
 def to_utc(dt: datetime) -> datetime:
@@ -9,3 +15,37 @@ def to_utc(dt: datetime) -> datetime:
     if dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
+
+
+def epoch_ms(value: Any) -> int:
+    """Return one timestamp as epoch milliseconds.
+
+    Numbers (and numeric strings) are epoch ms; ISO-8601 strings and naive
+    datetimes are taken as UTC.
+    """
+    if isinstance(value, datetime):
+        return round(to_utc(value).timestamp() * 1_000)
+    if isinstance(value, str):
+        try:
+            return int(float(value))
+        except ValueError:
+            return epoch_ms(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    return int(value)
+
+
+def epoch_ms_array(values: pd.Series) -> np.ndarray:
+    """Return timestamps as a contiguous int64 array of epoch milliseconds.
+
+    Integer columns are assumed to already hold epoch ms and are returned
+    without copying where possible (including Arrow-backed columns); datetime
+    columns are converted to UTC.
+    """
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return np.ascontiguousarray(numeric_view(values, np.int64))
+    if pd.api.types.is_float_dtype(values.dtype):
+        return numeric_view(values).astype(np.int64)
+    if not pd.api.types.is_datetime64_any_dtype(values.dtype):
+        values = pd.to_datetime(values, utc=True)
+    if getattr(values.dt, "tz", None) is not None:
+        values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+    return values.to_numpy(dtype="datetime64[ms]").astype(np.int64)